@@ -0,0 +1,291 @@
+"""Append-only archive of fetched pages, compressed per record.
+
+Every page the scraper fetches is appended to one archive file, so parsers
+can be re-run over everything ever downloaded without touching the network.
+Each record is compressed on its own (zstd, or zlib when the ``zstandard``
+package is missing), which keeps random access cheap: a lookup seeks to the
+record and decompresses just that page.
+
+Record layout (integers little-endian)::
+
+    magic "PGA1" | codec u8 ("z" zstd, "d" zlib) | length u32 | compressed payload
+    payload: JSON header line {"url", "status", "fetched_at", "encoding", "complete"} "\\n" body
+
+``complete`` is false for a page whose download was stopped early (a player
+page read only as far as ``#meta``); such a body parses for meta fields only.
+
+The URL -> offset index is an append-only JSON-lines sidecar
+(``<archive>.idx``) of ``[url, offset, end]`` entries. A URL fetched more
+than once points at its latest record.
+
+Several commands append at once (scrape, the daemon, ``hof``,
+``career-stats``, ``link --verify``), so an append holds an exclusive
+``fcntl.flock`` on ``<archive>.lock`` while it catches the index up with
+other processes' appends, writes the record at the end of the file and
+indexes it. Only that locked appender repairs the files. Records a crashed
+writer left unindexed are indexed, and a torn index line or a short archive
+tail is cut off. Readers take no lock and never modify either file, because
+what looks torn to them may be an append in progress.
+
+A record that is all there but does not decode (bad payload or codec) is
+logged and skipped using its length. After bad magic or an impossible
+length, the scan resumes at the next record marker. One bad record therefore
+never hides or deletes the records after it.
+"""
+
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; records fall back to zlib
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; appends are not locked there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PGA1"
+_HEADER = struct.Struct("<4scI")
+ZSTD_LEVEL = 10
+_RESYNC_CHUNK = 1 << 20
+
+# Raised by a payload that will not decompress or parse (json and unpacking errors are ValueErrors)
+_DECODE_ERRORS = (zlib.error, ValueError) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+class CorruptRecordError(ValueError):
+    """
+    An archive record that does not decode. ``end`` is where the next record
+    starts when the record's length can be trusted (its payload is all there
+    but fails to decompress), else None (bad magic).
+    """
+
+    def __init__(self, message: str, end: Optional[int] = None):
+        super().__init__(message)
+        self.end = end
+
+
+def _compress(data: bytes) -> Tuple[bytes, bytes]:
+    if zstandard is not None:
+        return b"z", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return b"d", zlib.compress(data, 9)
+
+
+def _decompress(codec: bytes, data: bytes) -> bytes:
+    if codec == b"z":
+        if zstandard is None:
+            raise RuntimeError("Archive record is zstd-compressed; pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == b"d":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown archive codec {codec!r}")
+
+
+class PageArchive:
+    """An append-only page archive with a URL -> offset index."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._index: Optional[Dict[str, int]] = None
+        self._covered = 0  # archive bytes reflected in the index file
+        self._index_read = 0  # index file bytes read so far
+
+    @property
+    def index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._sync()
+        return self._index
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the exclusive archive lock across processes (no-op without fcntl)."""
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_index(self):
+        """Add index lines written since the last read; a torn final line is left unread."""
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_read)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    url, offset, end = json.loads(line)
+                except ValueError:
+                    break
+                self._index[url] = offset
+                self._covered = max(self._covered, end)
+                self._index_read += len(line)
+
+    def _sync(self, repair: bool = False):
+        """
+        Catch the in-memory index up with the index and archive files. Only
+        ``repair`` (an appender holding the archive lock) writes to the files.
+        """
+        if self._index is None:
+            self._index, self._covered, self._index_read = {}, 0, 0
+        if self.index_path.exists():
+            self._read_index()
+            if repair and self._index_read < self.index_path.stat().st_size:
+                # Torn final line from a crashed writer; the scan below re-adds that record
+                os.truncate(self.index_path, self._index_read)
+
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if self._covered > size:
+            logger.warning(f"Archive index {self.index_path} is ahead of the archive; rebuilding")
+            self._index, self._covered = {}, 0
+            if repair:
+                self.index_path.unlink()
+                self._index_read = 0
+        if self._covered >= size:
+            return
+
+        # Records past the index: a crash between the two writes, or (for a
+        # reader) an append still in progress
+        scanned = self._covered
+        for offset, header, end in self._scan(self._covered):
+            scanned = end
+            if header is None:
+                continue
+            self._index[header["url"]] = offset
+            if repair:
+                self._record_offset(header["url"], offset, end)
+        if repair and scanned < size:
+            # No readable record starts past here; a crash mid-append left it
+            logger.warning(f"Truncating {size - scanned} bytes of partial archive record "
+                           f"at offset {scanned}")
+            os.truncate(self.path, scanned)
+        if repair:
+            self._covered = scanned
+
+    def _record_offset(self, url: str, offset: int, end: int):
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps([url, offset, end]) + "\n")
+            self._index_read = f.tell()  # the caller synced under the lock, so nothing was skipped
+        self._covered = max(self._covered, end)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def append(self, url: str, body: bytes, status: int = 200,
+               encoding: Optional[str] = None, complete: bool = True) -> int:
+        """Add a page and return its offset. Later appends of a URL supersede earlier ones."""
+        header = {"url": url, "status": status, "fetched_at": time.time(),
+                  "encoding": encoding or "utf-8", "complete": complete}
+        codec, payload = _compress(json.dumps(header).encode() + b"\n" + body)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            # Other processes may have appended since this one read the index
+            self._sync(repair=True)
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(_HEADER.pack(MAGIC, codec, len(payload)) + payload)
+            self._index[url] = offset
+            self._record_offset(url, offset, offset + _HEADER.size + len(payload))
+        return offset
+
+    def _read_at(self, f, offset: int) -> Tuple[dict, bytes, int]:
+        f.seek(offset)
+        raw = f.read(_HEADER.size)
+        if len(raw) < _HEADER.size:
+            raise EOFError(offset)
+        magic, codec, length = _HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise CorruptRecordError(f"Bad magic in archive record at offset {offset}")
+        payload = f.read(length)
+        if len(payload) < length:
+            raise EOFError(offset)
+        end = offset + _HEADER.size + length
+        try:
+            header_line, body = _decompress(codec, payload).split(b"\n", 1)
+            header = json.loads(header_line)
+        except _DECODE_ERRORS as e:
+            raise CorruptRecordError(f"Undecodable archive record at offset {offset}: {e}", end) from e
+        return header, body, end
+
+    def read(self, offset: int) -> Tuple[dict, bytes]:
+        """The record header and raw body at ``offset``."""
+        with open(self.path, "rb") as f:
+            header, body, _ = self._read_at(f, offset)
+        return header, body
+
+    def get(self, url: str) -> Optional[str]:
+        """Latest archived body for ``url`` as text, or None if never archived."""
+        offset = self.index.get(url)
+        if offset is None:
+            return None
+        header, body = self.read(offset)
+        return body.decode(header.get("encoding") or "utf-8", errors="replace")
+
+    @staticmethod
+    def _next_magic(f, start: int) -> Optional[int]:
+        """Offset of the next record marker at or after ``start``, or None."""
+        f.seek(start)
+        base, tail = start, b""
+        while True:
+            chunk = f.read(_RESYNC_CHUNK)
+            if not chunk:
+                return None
+            data = tail + chunk
+            found = data.find(MAGIC)
+            if found >= 0:
+                return base - len(tail) + found
+            tail = data[-(len(MAGIC) - 1):]
+            base += len(chunk)
+
+    def _scan(self, start: int = 0) -> Iterator[Tuple[int, Optional[dict], int]]:
+        """
+        (offset, header, end offset) of each whole record from ``start``;
+        header is None for a record that is all there but does not decode.
+        """
+        with open(self.path, "rb") as f:
+            offset = start
+            while True:
+                try:
+                    header, _, end = self._read_at(f, offset)
+                except CorruptRecordError as e:
+                    logger.warning(f"Skipping {e}")
+                    if e.end is not None:
+                        yield offset, None, e.end
+                        offset = e.end
+                        continue
+                    header = None
+                except EOFError:
+                    header = None
+                if header is None:
+                    # Bad magic, or a length running past the end: the real
+                    # tail, or a corrupt length with records after it
+                    offset = self._next_magic(f, offset + 1)
+                    if offset is None:
+                        return
+                    continue
+                yield offset, header, end
+                offset = end
+
+    def latest(self) -> Dict[str, int]:
+        """URL -> offset of its latest record (a copy of the index)."""
+        return dict(self.index)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Benchmarks for the NFL scraper tooling."""
+
+import argparse
+import gzip
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from compact import encode_players, decode_players
+from config import PFR_BASE_URL
+from replay_server import ReplayConfig, ReplayServer, generate_fixtures
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def time_call(fn: Callable, repeat: int) -> float:
+    """Median wall time of ``fn()`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def print_table(title: str, header: List[str], rows: List[list]):
+    """Print a fixed-width results table."""
+    widths = [max(len(str(r[i])) for r in [header] + rows) for i in range(len(header))]
+    print("\n" + "=" * 50)
+    print(title)
+    print("=" * 50)
+    print("  ".join(str(h).ljust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+    print("=" * 50)
+
+
+def bench_compact(args):
+    """Compare size and decode time of JSON against the compact formats."""
+    for path in args.files:
+        path = Path(path)
+        raw = path.read_bytes()
+        players = json.loads(raw)
+
+        candidates = {
+            "json (indent=2)": (raw, json.loads),
+            "json (compact)": (
+                json.dumps(players, separators=(",", ":")).encode("utf-8"), json.loads
+            ),
+            "columnar": (encode_players(players), decode_players),
+        }
+        if msgpack is not None:
+            candidates["msgpack"] = (msgpack.packb(players), msgpack.unpackb)
+
+        rows = []
+        for name, (data, decode) in candidates.items():
+            assert decode(data) == players, f"{name} does not round-trip"
+            gz_size = len(gzip.compress(data, compresslevel=9))
+            br_size = len(brotli.compress(data, quality=11)) if brotli else "-"
+            decode_ms = time_call(lambda: decode(data), args.repeat)
+            gz_data = gzip.compress(data, compresslevel=9)
+            gz_decode_ms = time_call(lambda: decode(gzip.decompress(gz_data)), args.repeat)
+            rows.append([
+                name, f"{len(data):,}", f"{gz_size:,}",
+                f"{br_size:,}" if brotli else br_size,
+                f"{decode_ms:.1f}", f"{gz_decode_ms:.1f}",
+            ])
+
+        print_table(
+            f"{path.name}: {len(players):,} players",
+            ["format", "bytes", "gzip", "brotli", "decode ms", "gunzip+decode ms"],
+            rows,
+        )
+    if msgpack is None:
+        print("(msgpack not installed, skipped)")
+
+
+def bench_replay(args):
+    """End-to-end scrape throughput and retry behavior against the replay server."""
+    import cloudscraper
+    from scraper import ProBowlScraper
+    from fetch import FetchError, FetchPolicy
+    from scrape_hof_photos import extract_photo_url
+
+    logging.getLogger().setLevel(logging.WARNING)
+    config = ReplayConfig(
+        latency=args.latency, jitter=args.jitter,
+        rate_429=args.rate_429, rate_5xx=args.rate_5xx, seed=0,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        fixtures = Path(args.fixtures) if args.fixtures else tmp / "fixtures"
+        if not args.fixtures:
+            generate_fixtures(fixtures, players_per_year=args.players_per_year)
+        project_root = tmp / "project"
+        (project_root / "scripts/scrapers/nfl").mkdir(parents=True)
+
+        rows = []
+        with ReplayServer(fixtures, config) as server:
+            scraper = ProBowlScraper(project_root, base_url=server.base_url, request_delay=0)
+            if args.skip_backoff:
+                scraper.fetcher.sleep = lambda seconds: None
+            start = time.perf_counter()
+            players = scraper.scrape_all(resume=False)
+            elapsed = time.perf_counter() - start
+            stats = server.get_stats()
+            rows.append(["year pages", stats["unique_paths"], stats["requests"],
+                         stats["requests"] - stats["unique_paths"],
+                         f"{elapsed:.2f}", f"{stats['unique_paths'] / elapsed:.1f}",
+                         scraper.fetcher.get_stats()["sleep_seconds"], stats["by_status"]])
+
+            urls = [p["url"].replace(PFR_BASE_URL, server.base_url, 1)
+                    for p in players[:args.player_pages]]
+            fetcher = FetchPolicy(cloudscraper.create_scraper())
+            if args.skip_backoff:
+                fetcher.sleep = lambda seconds: None
+            before = server.get_stats()
+            start = time.perf_counter()
+            for url in urls:
+                try:
+                    extract_photo_url(fetcher.get(url).text)
+                except FetchError:
+                    pass
+            elapsed = time.perf_counter() - start
+            after = server.get_stats()
+            requests_made = after["requests"] - before["requests"]
+            by_status = {k: v - before["by_status"].get(k, 0)
+                         for k, v in after["by_status"].items()}
+            rows.append(["player pages", len(urls), requests_made, requests_made - len(urls),
+                         f"{elapsed:.2f}", f"{len(urls) / elapsed:.1f}" if elapsed else "-",
+                         fetcher.get_stats()["sleep_seconds"], by_status])
+
+    print_table(
+        f"Replay scrape (latency {args.latency}s, 429 {args.rate_429}, 5xx {args.rate_5xx})",
+        ["stage", "pages", "requests", "retries", "seconds", "pages/sec", "backoff s", "statuses"],
+        rows,
+    )
+
+
+def bench_meta(args):
+    """Player page photo lookup: full download + parse vs. streaming only up to #meta."""
+    import cloudscraper
+    from bs4 import BeautifulSoup
+    from fetch import FetchPolicy, read_until
+    from parser import meta_span, parse_player_meta
+    from replay_server import _player_href, _player_page
+
+    def full_page(url):
+        # The previous approach: read the whole page, then parse all of it
+        response = fetcher.get(url)
+        meta = BeautifulSoup(response.text, "html.parser").find("div", id="meta")
+        img = meta.find("div", class_="media-item").find("img")
+        return img.get("src"), len(response.content)
+
+    def meta_only(url):
+        response = fetcher.get(url, stream=True)
+        body, _ = read_until(response, lambda data: meta_span(data) is not None)
+        return parse_player_meta(body)["photo_url"], len(body)
+
+    config = ReplayConfig(latency=args.latency, seed=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = Path(tmp)
+        for n in range(args.players):
+            path = fixtures / _player_href(n).lstrip("/")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(_player_page(n, seasons=args.seasons))
+
+        with ReplayServer(fixtures, config) as server:
+            fetcher = FetchPolicy(cloudscraper.create_scraper())
+            urls = [server.base_url + _player_href(n) for n in range(args.players)]
+            results, rows = {}, []
+            for name, fn in [("full page, html.parser (baseline)", full_page),
+                             ("streamed to end of #meta, lxml", meta_only)]:
+                start = time.perf_counter()
+                results[name] = [fn(url) for url in urls]
+                elapsed = time.perf_counter() - start
+                read = sum(size for _, size in results[name])
+                rows.append([name, f"{read / len(urls) / 1024:.1f}",
+                             f"{elapsed * 1000 / len(urls):.2f}"])
+
+    photos = [[photo for photo, _ in found] for found in results.values()]
+    assert all(p == photos[0] for p in photos), "photo URLs differ"
+    print_table(f"{args.players} player pages x {args.seasons} seasons (latency {args.latency}s)",
+                ["method", "KiB read per page", "ms per page"], rows)
+
+
+def bench_comments(args):
+    """Comment-wrapped table extraction: lazy scan vs. re-parsing every comment."""
+    from bs4 import BeautifulSoup, Comment
+    from parser import CommentedTables
+
+    html = Path(args.page).read_text()
+    wanted = args.tables or list(CommentedTables(html))[:1]
+
+    def double_parse():
+        # Common approach: parse the page, then parse every comment holding a table
+        soup = BeautifulSoup(html, "lxml")
+        found = {}
+        for comment in soup.find_all(string=lambda t: isinstance(t, Comment)):
+            if "<table" in comment:
+                inner = BeautifulSoup(comment, "lxml")
+                for table_id in wanted:
+                    table = inner.find("table", id=table_id)
+                    if table is not None:
+                        found[table_id] = table
+        return found
+
+    def lazy():
+        BeautifulSoup(html, "lxml")
+        commented = CommentedTables(html)
+        return {table_id: commented[table_id] for table_id in wanted if table_id in commented}
+
+    assert set(double_parse()) == set(lazy()) == set(wanted), "table sets differ"
+    rows = [
+        ["double parse (baseline)", f"{time_call(double_parse, args.repeat):.2f}"],
+        ["page parse + lazy tables", f"{time_call(lazy, args.repeat):.2f}"],
+        ["comment scan only", f"{time_call(lambda: CommentedTables(html), args.repeat):.3f}"],
+    ]
+    print_table(f"{Path(args.page).name} ({len(html):,} chars), tables: {', '.join(wanted)}",
+                ["method", "ms per page"], rows)
+
+
+def bench_stats(args):
+    """Career stat totals: per-row dicts vs. columnar NumPy extraction and reduction."""
+    from bs4 import BeautifulSoup
+    from parser import CommentedTables, find_table, table_rows
+    from replay_server import _player_page
+    import stats_table
+
+    pages = [_player_page(n, seasons=args.seasons) for n in range(args.players)]
+    table_ids = list(dict.fromkeys(t for s in stats_table.STAT_SOURCES.values() for t, _ in s))
+    # HTML parsing is the same either way; time only what happens after it
+    tags = []
+    for html in pages:
+        soup, commented = BeautifulSoup(html, "lxml"), CommentedTables(html)
+        tags.append({t: find_table(soup, commented, t) for t in table_ids})
+
+    def rows_baseline():
+        result = []
+        for player in tags:
+            totals = dict.fromkeys(stats_table.STAT_SOURCES, 0)
+            rows = {t: table_rows(player[t]) for t in table_ids}
+            for field, sources in stats_table.STAT_SOURCES.items():
+                for table_id, stat in sources:
+                    for row in rows[table_id]:
+                        value = row.get(stat, "").strip("*+%").replace(",", "")
+                        totals[field] += int(float(value)) if value else 0
+            result.append(totals)
+        return result
+
+    stacked = {t: stats_table.extract_many([p[t] for p in tags]) for t in table_ids}
+
+    def reduce_only():
+        totals = {field: 0 for field in stats_table.STAT_SOURCES}
+        for field, sources in stats_table.STAT_SOURCES.items():
+            for table_id, stat in sources:
+                totals[field] = totals[field] + stats_table.career_totals(
+                    stacked[table_id], [stat], owners=len(tags))[:, 0]
+        return totals
+
+    def columnar():
+        tables = {t: stats_table.extract_many([p[t] for p in tags]) for t in table_ids}
+        for field, sources in stats_table.STAT_SOURCES.items():
+            for table_id, stat in sources:
+                stats_table.career_totals(tables[table_id], [stat], owners=len(tags))
+
+    baseline = rows_baseline()
+    batched = reduce_only()
+    assert all(int(batched[f][i]) == row[f] for i, row in enumerate(baseline)
+               for f in stats_table.STAT_SOURCES), "totals differ"
+
+    rows = [
+        ["per-row dicts (baseline)", f"{time_call(rows_baseline, args.repeat):.1f}"],
+        ["columnar extract + reduce", f"{time_call(columnar, args.repeat):.1f}"],
+        ["reduce only (stacked)", f"{time_call(reduce_only, args.repeat):.2f}"],
+    ]
+    print_table(f"{args.players} players x {args.seasons} seasons, tables: {', '.join(table_ids)}",
+                ["method", "ms"], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the NFL scraper tooling")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    subparsers = parser.add_subparsers(dest="command", help="Benchmark to run")
+
+    compact_parser = subparsers.add_parser(
+        "compact", help="Size and decode time of JSON vs compact binary formats"
+    )
+    compact_parser.add_argument("files", nargs="+", help="Player JSON files")
+    compact_parser.set_defaults(func=bench_compact)
+
+    replay_parser = subparsers.add_parser(
+        "replay", help="Scrape throughput and retries against the local replay server"
+    )
+    replay_parser.add_argument("--fixtures", help="Recorded pages (default: synthetic)")
+    replay_parser.add_argument("--players-per-year", type=int, default=88)
+    replay_parser.add_argument("--player-pages", type=int, default=200,
+                               help="Player pages to fetch after the year pages")
+    replay_parser.add_argument("--latency", type=float, default=0.0)
+    replay_parser.add_argument("--jitter", type=float, default=0.0)
+    replay_parser.add_argument("--rate-429", type=float, default=0.0)
+    replay_parser.add_argument("--rate-5xx", type=float, default=0.0)
+    replay_parser.add_argument("--skip-backoff", action="store_true",
+                               help="Count retry waits without sleeping through them")
+    replay_parser.set_defaults(func=bench_replay)
+
+    meta_parser = subparsers.add_parser(
+        "meta", help="Photo lookup: full player page vs. streaming only up to #meta"
+    )
+    meta_parser.add_argument("--players", type=int, default=100)
+    meta_parser.add_argument("--seasons", type=int, default=20,
+                             help="Seasons per stats table (page size)")
+    meta_parser.add_argument("--latency", type=float, default=0.0)
+    meta_parser.set_defaults(func=bench_meta)
+
+    comments_parser = subparsers.add_parser(
+        "comments", help="Comment-wrapped table extraction vs. a double-parse baseline"
+    )
+    comments_parser.add_argument(
+        "--page", default=str(Path(__file__).parent / "fixtures/pfr/players/P/Plyr000000.htm"),
+        help="Player page to parse (default: bundled fixture)")
+    comments_parser.add_argument("--tables", nargs="*", help="Table IDs to extract (default: first)")
+    comments_parser.set_defaults(func=bench_comments)
+
+    stats_parser = subparsers.add_parser(
+        "stats", help="Career totals from stats tables: per-row dicts vs. NumPy columns"
+    )
+    stats_parser.add_argument("--players", type=int, default=500)
+    stats_parser.add_argument("--seasons", type=int, default=12)
+    stats_parser.set_defaults(func=bench_stats)
+
+    args = parser.parse_args()
+    if not args.command:
+        parser.print_help()
+        return
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
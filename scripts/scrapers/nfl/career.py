@@ -0,0 +1,117 @@
+"""Fill career ``NFLPlayerStats`` in the player DB from full player pages.
+
+Records are created with zeroed stats. ``fill_career_stats`` reads each
+player's page from the page archive when a complete copy is there, and
+otherwise fetches it in full (which archives it, so a rerun after a parser
+fix is offline). Pages are summed a batch at a time with
+``stats_table.career_stats``, and every batch is patched into the DB with
+``transaction.patch_players``, so an interrupted run keeps the batches it
+finished and the next run skips them. Players whose totals really are zero
+(linemen, most defenders) are picked up again by every run, but from the
+archive rather than the network.
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import PFR_BASE_URL, MOBILE_JSON_PATH, REQUEST_DELAY_SECONDS, CAREER_STATS_BATCH_SIZE
+from archive import PageArchive
+from fetch import FetchError, CircuitOpenError
+import player_db
+from profiling import profiled, stage
+from scraper import ProBowlScraper
+from stats_table import career_stats
+from transaction import patch_players
+
+logger = logging.getLogger(__name__)
+
+
+def archived_page(archive: PageArchive, url: str) -> Optional[str]:
+    """The archived page for ``url`` if it was downloaded in full, else None."""
+    offset = archive.index.get(url)
+    if offset is None:
+        return None
+    header, body = archive.read(offset)
+    # Photo lookups stop reading at #meta, before the stats tables
+    if not header.get("complete", True) or header.get("status", 200) != 200:
+        return None
+    return body.decode(header.get("encoding") or "utf-8", errors="replace")
+
+
+@profiled("career_stats", memory=True)
+def fill_career_stats(
+    project_root: Path,
+    base_url: str = PFR_BASE_URL,
+    limit: Optional[int] = None,
+    refresh: bool = False,
+    offline: bool = False,
+    batch_size: int = CAREER_STATS_BATCH_SIZE,
+    request_delay: float = REQUEST_DELAY_SECONDS,
+) -> dict:
+    """
+    Fill ``stats`` for players whose stats are all zero and return run stats.
+
+    Args:
+        project_root: Repository root used to resolve data paths
+        base_url: Site to fetch from; point at a replay server for offline runs
+        limit: Process at most this many players
+        refresh: Recompute every player, not just those with zeroed stats
+        offline: Use archived pages only; players without one are skipped
+        batch_size: Pages summed and patched into the DB together
+        request_delay: Seconds to sleep between fetched pages
+    """
+    start = time.perf_counter()
+    with stage("load_existing", memory=True):
+        players = player_db.load(project_root / MOBILE_JSON_PATH, "records")
+    todo = [p["sportsReferenceUrl"] for p in players
+            if p.get("sportsReferenceUrl") and (refresh or not any((p.get("stats") or {}).values()))]
+    todo = list(dict.fromkeys(todo))[:limit]
+    logger.info(f"Career stats for {len(todo)} players")
+
+    scraper = ProBowlScraper(project_root, base_url=base_url, request_delay=request_delay)
+    stats = {"players": len(todo), "archived": 0, "fetched": 0, "not_archived": 0,
+             "failed": 0, "updated": 0, "stopped": ""}
+    pages: Dict[str, str] = {}
+
+    def flush():
+        if not pages:
+            return
+        with stage("career_stats"):
+            results = career_stats(pages)
+        stats["updated"] += patch_players(
+            project_root, {url: {"stats": result.to_dict()} for url, result in results.items()})
+        pages.clear()
+
+    for url in todo:
+        html = archived_page(scraper.archive, url)
+        if html is not None:
+            stats["archived"] += 1
+        elif offline:
+            stats["not_archived"] += 1
+            continue
+        else:
+            try:
+                html = scraper.fetch_page(url.replace(PFR_BASE_URL, scraper.base_url, 1))
+                stats["fetched"] += 1
+            except CircuitOpenError as e:
+                # Keep what is already fetched; a rerun picks up from here
+                logger.warning(f"Stopping: {e}")
+                stats["stopped"] = str(e)
+                break
+            except FetchError as e:
+                logger.warning(f"Error fetching player page {url}: {e}")
+                stats["failed"] += 1
+                html = None
+            time.sleep(scraper.request_delay)
+            if html is None:
+                continue
+        pages[url] = html
+        if len(pages) >= batch_size:
+            flush()
+    flush()
+
+    stats["requests"] = scraper.fetcher.get_stats()["requests"]
+    stats["seconds"] = round(time.perf_counter() - start, 2)
+    return stats
@@ -0,0 +1,308 @@
+"""Compact columnar binary format for app-facing player databases.
+
+The pretty-printed JSON files repeat every key for every player and spend a
+large share of their bytes on indentation. This module packs a list of player
+dicts into a columnar layout instead:
+
+- every string value goes through one shared string table, so repeated teams,
+  positions and sports are stored once
+- ``*Url`` fields are split into a prefix (everything up to the last ``/``) and
+  a tail, so URL prefixes are shared in the string table too
+- nested dicts (``stats``) are flattened one level into ``stats.<key>`` columns
+- ints, floats and bools are stored as fixed-width arrays
+
+Layout (all integers little-endian)::
+
+    magic "SCPK" | version u8 | pad 3 | records u32 | columns u32
+    string table: byte length u32 | NUL-joined UTF-8 strings
+    per column:   name length u16 | name | kind u8 | flags u8 | payload length u32 | payload
+
+Column kinds: ``s`` string index, ``u`` URL prefix+tail indices, ``i`` int64,
+``f`` float64, ``b`` bool and ``j`` JSON-encoded fallback for mixed columns.
+Decoding restores the original records exactly; keys come back in the order
+they were first seen across the file, which for player files is record order.
+"""
+
+import gzip
+import json
+import logging
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only the .br variant needs it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SCPK"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sB3xII")
+_COLUMN = struct.Struct("<BBI")
+
+# Index 0 in the string table marks a missing key
+_ABSENT = 0
+
+# Column flag: payload starts with one presence byte per record
+_HAS_PRESENCE = 0x01
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _to_bytes(values: array) -> bytes:
+    if _BIG_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+
+class _Missing:
+    """Placeholder for a key that a record does not have."""
+
+
+def _nested_keys(records: List[dict]) -> set:
+    """Keys whose value is a non-empty dict in every record that has them."""
+    nested = {}
+    for record in records:
+        for key, value in record.items():
+            flat = isinstance(value, dict) and value and all("." not in k for k in value)
+            nested[key] = nested.get(key, True) and bool(flat)
+    return {key for key, flat in nested.items() if flat}
+
+
+def _flatten_columns(records: List[dict]) -> Tuple[List[str], Dict[str, list]]:
+    """Split records into columns keyed by path, in first-seen key order."""
+    nested = _nested_keys(records)
+    order: List[str] = []
+    columns: Dict[str, list] = {}
+
+    def append(path: str, n: int, value: Any):
+        col = columns.get(path)
+        if col is None:
+            order.append(path)
+            col = columns[path] = []
+        col.extend([_Missing] * (n - len(col)))
+        col.append(value)
+
+    for n, record in enumerate(records):
+        for key, value in record.items():
+            if "." in key:
+                raise ValueError(f"Cannot pack key containing '.': {key!r}")
+            if key in nested:
+                for sub_key, sub_value in value.items():
+                    append(f"{key}.{sub_key}", n, sub_value)
+            else:
+                append(key, n, value)
+
+    for col in columns.values():
+        col.extend([_Missing] * (len(records) - len(col)))
+    return order, columns
+
+
+def _column_kind(path: str, values: list) -> str:
+    present = [v for v in values if v is not _Missing]
+    if all(type(v) is str for v in present):
+        if any("\x00" in v for v in present):
+            return "j"
+        return "u" if path.endswith("Url") else "s"
+    if all(type(v) is bool for v in present):
+        return "b"
+    if all(type(v) is int and -(2 ** 63) <= v < 2 ** 63 for v in present):
+        return "i"
+    if all(type(v) is float for v in present):
+        return "f"
+    return "j"
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = ["\x00"]  # index 0 = absent
+        self.index: Dict[str, int] = {}
+
+    def add(self, value: str) -> int:
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            self.strings.append(value)
+            self.index[value] = idx
+        return idx
+
+    def to_bytes(self) -> bytes:
+        return "\x00".join(self.strings[1:]).encode("utf-8")
+
+
+def encode_players(players: List[dict]) -> bytes:
+    """Pack a list of player dicts into the columnar binary format."""
+    order, columns = _flatten_columns(players)
+    table = _StringTable()
+    blocks = []
+
+    for path in order:
+        values = columns[path]
+        kind = _column_kind(path, values)
+        has_missing = any(v is _Missing for v in values)
+        flags = _HAS_PRESENCE if has_missing and kind not in ("s", "u", "j") else 0
+        payload = b""
+        if flags & _HAS_PRESENCE:
+            payload = bytes(0 if v is _Missing else 1 for v in values)
+
+        if kind == "s":
+            payload += _to_bytes(array("I", (
+                _ABSENT if v is _Missing else table.add(v) for v in values
+            )))
+        elif kind == "u":
+            prefixes = array("I")
+            tails = array("I")
+            for v in values:
+                if v is _Missing:
+                    prefixes.append(_ABSENT)
+                    tails.append(_ABSENT)
+                    continue
+                cut = v.rfind("/") + 1
+                prefixes.append(table.add(v[:cut]))
+                tails.append(table.add(v[cut:]))
+            payload += _to_bytes(prefixes) + _to_bytes(tails)
+        elif kind == "j":
+            payload += _to_bytes(array("I", (
+                _ABSENT if v is _Missing else table.add(json.dumps(v, ensure_ascii=False))
+                for v in values
+            )))
+        elif kind == "b":
+            payload += bytes(1 if v is True else 0 for v in values)
+        elif kind == "i":
+            payload += _to_bytes(array("q", (0 if v is _Missing else v for v in values)))
+        else:
+            payload += _to_bytes(array("d", (0.0 if v is _Missing else v for v in values)))
+
+        name = path.encode("utf-8")
+        blocks.append(struct.pack("<H", len(name)) + name
+                      + _COLUMN.pack(ord(kind), flags, len(payload)) + payload)
+
+    strings = table.to_bytes()
+    return b"".join([
+        _HEADER.pack(MAGIC, VERSION, len(players), len(order)),
+        struct.pack("<I", len(strings)),
+        strings,
+        *blocks,
+    ])
+
+
+def decode_players(data: bytes) -> List[dict]:
+    """Unpack bytes produced by ``encode_players`` back into player dicts."""
+    magic, version, count, n_columns = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a compact player file (bad magic)")
+    if version != VERSION:
+        raise ValueError(f"Unsupported compact player file version: {version}")
+
+    offset = _HEADER.size
+    (strings_len,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    strings = [None] + data[offset:offset + strings_len].decode("utf-8").split("\x00")
+    offset += strings_len
+
+    decoded = []  # (key, sub_key, values, presence)
+    for _ in range(n_columns):
+        (name_len,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        path = data[offset:offset + name_len].decode("utf-8")
+        offset += name_len
+        kind, flags, payload_len = _COLUMN.unpack_from(data, offset)
+        offset += _COLUMN.size
+        payload = data[offset:offset + payload_len]
+        offset += payload_len
+
+        kind = chr(kind)
+        presence = None
+        if flags & _HAS_PRESENCE:
+            presence = payload[:count]
+            payload = payload[count:]
+
+        if kind == "s":
+            values = [strings[i] for i in _from_bytes("I", payload)]
+        elif kind == "u":
+            half = len(payload) // 2
+            prefixes = _from_bytes("I", payload[:half])
+            tails = _from_bytes("I", payload[half:])
+            values = [None if p == _ABSENT else strings[p] + strings[t]
+                      for p, t in zip(prefixes, tails)]
+        elif kind == "j":
+            indices = _from_bytes("I", payload)
+            values = [None if i == _ABSENT else json.loads(strings[i]) for i in indices]
+            # A JSON null is a real value, so absence is tracked separately
+            presence = bytes(0 if i == _ABSENT else 1 for i in indices)
+        elif kind == "b":
+            values = [b == 1 for b in payload]
+        elif kind == "i":
+            values = _from_bytes("q", payload).tolist()
+        elif kind == "f":
+            values = _from_bytes("d", payload).tolist()
+        else:
+            raise ValueError(f"Unknown column kind {kind!r} for {path}")
+
+        if kind in ("s", "u") and presence is None:
+            presence = bytes(0 if v is None else 1 for v in values)
+
+        key, _, sub_key = path.partition(".")
+        decoded.append((key, sub_key, values, presence))
+
+    players: List[dict] = [{} for _ in range(count)]
+    for key, sub_key, values, presence in decoded:
+        for i, (player, value) in enumerate(zip(players, values)):
+            if presence is not None and not presence[i]:
+                continue
+            if sub_key:
+                player.setdefault(key, {})[sub_key] = value
+            else:
+                player[key] = value
+    return players
+
+
+def compact_paths(json_path: Path) -> Dict[str, Path]:
+    """Output paths for the compact variants of a JSON file."""
+    binary = json_path.with_suffix(".bin")
+    return {
+        "bin": binary,
+        "gz": binary.with_name(binary.name + ".gz"),
+        "br": binary.with_name(binary.name + ".br"),
+    }
+
+
+def write_compact(json_path: Path, players: List[dict]) -> Dict[str, int]:
+    """
+    Write the binary file plus gzip/brotli-precompressed variants next to
+    ``json_path``. Returns a mapping of variant -> size in bytes.
+    """
+    data = encode_players(players)
+    paths = compact_paths(json_path)
+    sizes = {}
+
+    paths["bin"].write_bytes(data)
+    sizes["bin"] = len(data)
+
+    gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+    paths["gz"].write_bytes(gz_data)
+    sizes["gz"] = len(gz_data)
+
+    if brotli is not None:
+        br_data = brotli.compress(data, quality=11)
+        paths["br"].write_bytes(br_data)
+        sizes["br"] = len(br_data)
+    else:
+        logger.info("brotli not installed, skipping .br variant")
+
+    logger.info(f"Wrote compact variants for {json_path.name}: {sizes}")
+    return sizes
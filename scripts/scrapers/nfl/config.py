@@ -3,6 +3,7 @@
 # Base URL for Pro Football Reference
 PFR_BASE_URL = "https://www.pro-football-reference.com"
 PFR_PROBOWL_INDEX = f"{PFR_BASE_URL}/probowl/"
+PFR_HOF_INDEX = f"{PFR_BASE_URL}/hof/"
 
 # Pro Bowl years to scrape (1950-2024)
 PROBOWL_START_YEAR = 1950
@@ -12,6 +13,24 @@ PROBOWL_END_YEAR = 2024
 REQUEST_DELAY_SECONDS = 3  # Respectful delay between requests
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 10
+RETRY_BACKOFF_MAX_SECONDS = 60  # Cap for exponential backoff on 5xx/timeouts
+MAX_RETRY_AFTER_SECONDS = 300  # Longest Retry-After we honor before giving up
+
+# Circuit breaker: stop hitting a host after this many consecutive failures
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN_SECONDS = 300
+
+# Seasons scraped before anything else (newest first) in a budgeted run
+RECENT_SEASONS = 5
+
+# Daemon mode: how often to poll the current season, and the local status port
+DAEMON_POLL_INTERVAL_SECONDS = 900
+DAEMON_HEALTH_PORT = 8787
+
+# Headshot thumbnails: square, this many pixels per side
+THUMBNAIL_SIZE = 128
+THUMBNAIL_FORMAT = "webp"  # or "jpeg"
+THUMBNAIL_QUALITY = 80
 
 # Checkpoint frequency
 CHECKPOINT_EVERY = 50  # Save progress every N players
@@ -21,6 +40,51 @@ MOBILE_JSON_PATH = "apps/mobile/data/nfl_players.json"
 WEB_JSON_PATH = "apps/web/src/data/nfl_players.json"
 CHECKPOINT_PATH = "scripts/scrapers/nfl/checkpoint.json"
 SCRAPED_DATA_PATH = "scripts/scrapers/nfl/scraped_players.json"
+SCRAPED_PHOTOS_PATH = "scripts/scrapers/nfl/scraped_photos.json"
+PRO_BOWL_YEARS_PATH = "scripts/scrapers/nfl/pro_bowl_years.json"
+RAW_FIELDS_PATH = "scripts/scrapers/nfl/raw_fields.json"  # URL -> raw roster strings, see normalize.py
+HOF_INDUCTEES_PATH = "scripts/scrapers/nfl/hof_inductees.json"  # last Hall of Fame sync
+PAGE_ARCHIVE_PATH = "scripts/scrapers/nfl/page_archive.pga"  # every fetched page, see archive.py
+PHOTO_STORE_DIR = "scripts/scrapers/nfl/photo_store"  # originals, named by content hash
+PHOTO_MANIFEST_PATH = "scripts/scrapers/nfl/photo_manifest.json"
+THUMBNAIL_DIR = "apps/web/public/thumbs/nfl"
+THUMBNAIL_URL_PREFIX = "/thumbs/nfl"  # where THUMBNAIL_DIR is served from
+# Absolute host or CDN serving THUMBNAIL_DIR (e.g. "https://cdn.example.com").
+# The mobile app cannot resolve site-relative URLs, so it only gets thumbnails
+# when this is set; left empty, thumbnailUrl is relative and web-only.
+THUMBNAIL_BASE_URL = ""
+
+# Advisory lock every player DB writer holds while it reads, patches and saves
+PLAYER_DB_LOCK_PATH = "scripts/scrapers/nfl/player_db.lock"
+LOCK_TIMEOUT_SECONDS = 300
+
+# Player pages summed and patched into the DB together by career-stats
+CAREER_STATS_BATCH_SIZE = 200
+
+# Player databases searched by the cross-sport linker, and its output table
+SPORT_JSON_PATHS = {
+    "NFL": MOBILE_JSON_PATH,
+    "MLB": "apps/mobile/data/mlb_players.json",
+    "NBA": "apps/mobile/data/nba_playersv2.json",
+}
+ATHLETE_LINKS_PATH = "scripts/scrapers/nfl/athlete_links.json"
+
+# Cross-sport linking: minimum score (given-name similarity 0-100 within a
+# surname, plus position hints) for two records to be the same athlete, and
+# the widest gap between known careers (years) that still counts as one era
+LINK_MIN_SCORE = 92
+LINK_MAX_ERA_GAP_YEARS = 12
+
+# Score adjustments by position: positions multi-sport athletes have tended
+# to play get a bump, positions they almost never played a penalty
+LINK_POSITION_HINTS = {
+    "NFL": {
+        "QB": 3, "RB": 3, "WR": 3, "TE": 2, "CB": 3, "S": 3, "DB": 3, "E": 3, "P": 2, "K": 2,
+        "OT": -5, "OG": -5, "C": -5, "OL": -5, "DT": -3, "NT": -5, "LS": -5,
+    },
+    "MLB": {"OF": 3, "LF": 3, "CF": 3, "RF": 3, "DH": -2},
+    "NBA": {},
+}
 
 # Position mappings from PFR abbreviations to standardized format
 POSITION_MAPPINGS = {
@@ -67,6 +131,10 @@ POSITION_MAPPINGS = {
     "LCB": "CB",
     "RCB": "CB",
     "NB": "CB",  # Nickelback
+    "LLB": "LB",
+    "RLB": "LB",
+    "MG": "NT",  # Middle guard
+    "DG": "DT",  # Defensive guard
 
     # Special Teams
     "K": "K",
@@ -78,6 +146,11 @@ POSITION_MAPPINGS = {
 
     # Historical/Generic
     "E": "E",  # End (historical)
+    "LE": "E",
+    "RE": "E",
+    "OE": "E",
+    "LH": "RB",  # Left/right halfback
+    "RH": "RB",
     "FL": "WR",  # Flanker -> WR
     "SE": "WR",  # Split End -> WR
     "BB": "RB",  # Blocking Back -> RB
@@ -99,4 +172,26 @@ TEAM_MAPPINGS = {
     "RAI": "LV", "OAK": "LV", "SDG": "LAC", "STL": "LAR",
     "RAM": "LAR", "PHO": "ARI", "CRD": "ARI", "BOS": "NE",
     "CLT": "IND", "HST": "TEN", "OIL": "TEN",
+    "SD": "LAC", "LA": "LAR", "DTX": "KC", "NYT": "NYJ",
+}
+
+# Era-aware team labels: franchise (a TEAM_MAPPINGS value) -> (last year, label)
+# spans in order; a last year of None runs to the present
+TEAM_ERAS = {
+    "LV": [(1981, "OAK"), (1994, "RAI"), (2019, "OAK"), (None, "LV")],  # RAI: Los Angeles Raiders
+    "LAC": [(1960, "LAC"), (2016, "SD"), (None, "LAC")],
+    "LAR": [(1994, "LAR"), (2015, "STL"), (None, "LAR")],
+    "ARI": [(1959, "CRD"), (1987, "STL"), (1993, "PHO"), (None, "ARI")],  # CRD: Chicago Cardinals
+    "IND": [(1983, "BAL"), (None, "IND")],
+    "TEN": [(1996, "HOU"), (None, "TEN")],
+    "NE": [(1970, "BOS"), (None, "NE")],
+    "KC": [(1962, "DTX"), (None, "KC")],  # Dallas Texans
+    "NYJ": [(1962, "NYT"), (None, "NYJ")],  # New York Titans
+}
+
+# Codes that named different franchises over time: code -> (last year, franchise)
+TEAM_CODE_ERAS = {
+    "STL": [(1987, "ARI"), (None, "LAR")],
+    "BAL": [(1983, "IND"), (None, "BAL")],
+    "HOU": [(1996, "TEN"), (None, "HOU")],
 }
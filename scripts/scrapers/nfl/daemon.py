@@ -0,0 +1,239 @@
+"""Long-running watch mode: poll the current season and apply changes in place.
+
+A one-shot ``run_scraper.py all`` builds a fresh cloudscraper session (and has
+to clear the Cloudflare challenge again), re-reads every JSON file and exits.
+``ScraperDaemon`` instead keeps one ``ProBowlScraper`` alive, so the session
+cookies and pooled connections stay warm, and keeps the player DB in the
+``player_db`` cache between polls. Each poll is a single conditional GET of
+the current season's Pro Bowl page; a 304 or an unchanged roster costs nothing
+more, and new players are merged into the in-memory records and written out
+without re-parsing the database.
+
+A small JSON status endpoint on localhost reports what the daemon is doing:
+
+    curl http://127.0.0.1:8787/health
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import (
+    PFR_BASE_URL,
+    MOBILE_JSON_PATH,
+    PRO_BOWL_YEARS_PATH,
+    RAW_FIELDS_PATH,
+    DAEMON_POLL_INTERVAL_SECONDS,
+    DAEMON_HEALTH_PORT,
+)
+import player_db
+from fetch import FetchError, CircuitOpenError
+from merger import PlayerMerger
+from normalize import load_raw_fields, remember_raw
+from parser import parse_probowl_year_page
+from profiling import stage
+from scraper import ProBowlScraper, write_json_atomic
+from transaction import db_lock
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperDaemon:
+    """Polls one season's Pro Bowl page and merges new players as they appear."""
+
+    def __init__(
+        self,
+        project_root: Path,
+        base_url: str = PFR_BASE_URL,
+        season: Optional[int] = None,
+        interval: float = DAEMON_POLL_INTERVAL_SECONDS,
+        port: int = DAEMON_HEALTH_PORT,
+        compact: bool = False,
+    ):
+        """
+        Args:
+            project_root: Repository root used to resolve data paths
+            base_url: Site to fetch from; point at a replay server for offline runs
+            season: Pro Bowl year to watch (default: the latest on the Pro Bowl index)
+            interval: Seconds between polls
+            port: Localhost port for the status endpoint (0 picks a free one)
+            compact: Also rewrite the compact binary variants on each update
+        """
+        self.project_root = project_root
+        self.season = season
+        self.interval = interval
+        self.compact = compact
+        self.scraper = ProBowlScraper(project_root, base_url=base_url, request_delay=0)
+        self.merger = PlayerMerger(project_root)
+        self.validators: Dict[str, str] = {}  # conditional request headers for the season page
+        self.raw_fields: Dict[str, dict] = {}  # URL -> raw roster strings, see normalize.py
+        self.stop_event = threading.Event()
+
+        self.started_at = time.time()
+        self.polls = 0
+        self.not_modified = 0
+        self.updates = 0
+        self.players_added = 0
+        self.last_poll: Optional[float] = None
+        self.last_update: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_poll_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def season_url(self) -> str:
+        return f"{self.scraper.base_url}/years/{self.season}/probowl.htm"
+
+    @property
+    def status_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/health"
+
+    def poll_once(self) -> int:
+        """Fetch the season page if it changed and merge any new players. Returns count added."""
+        db_path = self.project_root / MOBILE_JSON_PATH
+        start = time.monotonic()
+
+        response = self.scraper.fetcher.get(self.season_url, headers=self.validators)
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+            logger.debug(f"{self.season} Pro Bowl page not modified")
+            return 0
+
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self.validators = validators
+
+        with stage("parse"):
+            players = parse_probowl_year_page(response.text, self.season)
+
+        existing_urls = player_db.load(db_path, "urls") if db_path.exists() else frozenset()
+        new_players = [p for p in players if p["url"] not in existing_urls]
+        if new_players:
+            for player in players:
+                years = self.merger.pro_bowl_years.setdefault(player["url"], [])
+                if self.season not in years:
+                    years.append(self.season)
+                    years.sort()
+                remember_raw(self.raw_fields, player["url"], player.get("raw"))
+            write_json_atomic(self.project_root / PRO_BOWL_YEARS_PATH, self.merger.pro_bowl_years)
+            write_json_atomic(self.project_root / RAW_FIELDS_PATH, self.raw_fields)
+
+            # Merge into the DB as it is under the lock, so concurrent writers' changes survive
+            with db_lock(self.project_root):
+                self.merger.existing_players = player_db.load(db_path, "records") if db_path.exists() else []
+                self.merger.scraped_players = new_players
+                self.merger.scraped_photos = {}
+                merged = self.merger.merge_loaded()
+                # save_merged primes the cache, so the next poll reads nothing from disk
+                self.merger.save_merged(merged, compact=self.compact)
+            logger.info(f"Added {len(new_players)} new {self.season} Pro Bowl players")
+
+        with self._lock:
+            self.last_poll_seconds = time.monotonic() - start
+            if new_players:
+                self.updates += 1
+                self.players_added += len(new_players)
+                self.last_update = time.time()
+        return len(new_players)
+
+    def run(self):
+        """Poll every ``interval`` seconds until ``stop`` is called."""
+        if self.season is None:
+            self.scraper.discover_years()
+            self.season = self.scraper.available_years[-1]
+
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.season_url} every {self.interval:.0f}s; "
+                    f"status at {self.status_url}")
+
+        # Warm the cache before the first poll rather than during it
+        db_path = self.project_root / MOBILE_JSON_PATH
+        if db_path.exists():
+            player_db.load_many(db_path, ["urls", "records"])
+        self.merger.load_pro_bowl_years()
+        self.merger.load_hof_inductees()
+        self.raw_fields = load_raw_fields(self.project_root)
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    self.poll_once()
+                    error = None
+                except CircuitOpenError as e:
+                    # The breaker's cooldown outlasts a poll or two; just keep polling
+                    error = str(e)
+                    logger.warning(f"Skipping poll: {e}")
+                except FetchError as e:
+                    error = f"{e} ({e.url})"
+                    logger.error(f"Poll failed: {error}")
+                except Exception as e:
+                    error = str(e)
+                    logger.exception("Poll failed")
+                with self._lock:
+                    self.polls += 1
+                    self.last_poll = time.time()
+                    self.last_error = error
+                self.stop_event.wait(self.interval)
+        finally:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self._thread.join()
+            logger.info("Daemon stopped")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def get_status(self) -> dict:
+        """State reported by the health endpoint."""
+        with self._lock:
+            return {
+                "status": "error" if self.last_error else "ok",
+                "season": self.season,
+                "interval_seconds": self.interval,
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "polls": self.polls,
+                "not_modified": self.not_modified,
+                "updates": self.updates,
+                "players_added": self.players_added,
+                "last_poll": self.last_poll,
+                "last_poll_seconds": round(self.last_poll_seconds, 3) if self.last_poll_seconds else None,
+                "last_update": self.last_update,
+                "last_error": self.last_error,
+                "fetch": self.scraper.fetcher.get_stats(),
+            }
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/health"):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps(daemon.get_status(), indent=2).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("health: " + format, *args)
+
+        return Handler
@@ -0,0 +1,216 @@
+"""Inverted facet indexes written as a sidecar to the player DB.
+
+For each facet the sidecar maps a value to the sorted list of player IDs that
+have it, so "how many TEs" or "Pro Bowl TEs for KC" is a lookup and a list
+intersection instead of a scan of every record::
+
+    {
+      "version": 1,
+      "source_sha1": "<sha1 of the JSON file this index describes>",
+      "count": 2801,
+      "facets": {
+        "team": {"KC": [4, 17, ...], ...},
+        "position": {"TE": [...], ...},
+        "hall_of_fame": {"true": [...]},
+        "pro_bowl": {"true": [...]},
+        "pro_bowl_year": {"2023": [...], ...},
+        "decade": {"2020s": [...], ...}
+      }
+    }
+
+NFL positions are normalized as in ``normalize.py``, and a compound position
+(``OT/LB``) is listed under each of its parts. Pro Bowl years (and their
+decades) are only known for players the scraper has seen on a roster page.
+
+``save_merged`` renumbers IDs by name, so an update after a merge takes the
+old -> new ID map plus the added players and patches the existing lists
+rather than re-faceting every record. If the sidecar does not describe the
+file that was just replaced, it is rebuilt from scratch instead.
+"""
+
+import json
+import logging
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from normalize import normalize_position, position_parts
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+FACETS = ("team", "position", "hall_of_fame", "pro_bowl", "pro_bowl_year", "decade")
+
+# Record fields the facets are computed from; changing one needs a rebuild
+RECORD_FIELDS = {"id", "team", "position", "sport", "hallOfFame", "sportsReferenceUrl"}
+
+
+def facets_path(json_path: Path) -> Path:
+    """Sidecar path for a player JSON file (``x.json`` -> ``x.facets.json``)."""
+    return json_path.with_suffix(".facets.json")
+
+
+def facet_values(player: dict, years: Iterable[int] = ()) -> Iterator[Tuple[str, str]]:
+    """(facet, value) pairs for one player record."""
+    team = (player.get("team") or "").strip()
+    if team:
+        yield "team", team
+    position = player.get("position") or ""
+    # The position mappings are PFR's; other sports' files keep their own labels
+    position = normalize_position(position) if player.get("sport", "NFL") == "NFL" else position.strip()
+    for part in position_parts(position):
+        yield "position", part
+    if player.get("hallOfFame", False):
+        yield "hall_of_fame", "true"
+    if years:
+        yield "pro_bowl", "true"
+    for decade in sorted({year // 10 * 10 for year in years}):
+        yield "decade", f"{decade}s"
+    for year in sorted(set(years)):
+        yield "pro_bowl_year", str(year)
+
+
+def _add(facets: Dict[str, Dict[str, List[int]]], facet: str, value: str, player_id: int):
+    ids = facets[facet].setdefault(value, [])
+    i = bisect_left(ids, player_id)
+    if i == len(ids) or ids[i] != player_id:
+        ids.insert(i, player_id)
+
+
+def build_index(players: List[dict], years_by_url: Optional[Mapping[str, List[int]]] = None,
+                source_sha1: str = "") -> dict:
+    """Facet index over every record in ``players``."""
+    years_by_url = years_by_url or {}
+    facets: Dict[str, Dict[str, List[int]]] = {facet: {} for facet in FACETS}
+    for player in players:
+        player_id = int(player["id"])
+        years = years_by_url.get(player.get("sportsReferenceUrl", ""), ())
+        for facet, value in facet_values(player, years):
+            facets[facet].setdefault(value, []).append(player_id)
+    for values in facets.values():
+        for ids in values.values():
+            ids.sort()
+    return {"version": INDEX_VERSION, "source_sha1": source_sha1,
+            "count": len(players), "facets": facets}
+
+
+def apply_delta(index: dict, id_map: Mapping[int, int], added: List[dict],
+                years_by_url: Optional[Mapping[str, List[int]]] = None,
+                url_to_id: Optional[Mapping[str, int]] = None) -> dict:
+    """
+    Update ``index`` in place after a merge.
+
+    Args:
+        id_map: Old ID -> new ID for every player that was already indexed
+        added: Records (with their new IDs) that were not in the old index
+        years_by_url: Pro Bowl years to fold in; years already indexed are skipped
+        url_to_id: New ID by sportsReferenceUrl, needed to place ``years_by_url``
+    """
+    facets = index["facets"]
+    for values in facets.values():
+        for value, ids in values.items():
+            remapped = [id_map[i] for i in ids]
+            # IDs follow name order, so usually this is already sorted
+            if any(a > b for a, b in zip(remapped, remapped[1:])):
+                remapped.sort()
+            values[value] = remapped
+
+    years_by_url = years_by_url or {}
+    for player in added:
+        years = years_by_url.get(player.get("sportsReferenceUrl", ""), ())
+        for facet, value in facet_values(player, years):
+            _add(facets, facet, value, int(player["id"]))
+
+    if url_to_id:
+        for url, years in years_by_url.items():
+            player_id = url_to_id.get(url)
+            if player_id is None:
+                continue
+            for facet, value in facet_values({}, years):
+                _add(facets, facet, value, player_id)
+
+    index["count"] = len(id_map) + len(added)
+    return index
+
+
+def load_index(json_path: Path) -> Optional[dict]:
+    """The sidecar for ``json_path``, or None if missing, unreadable or outdated."""
+    path = facets_path(json_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable facet index {path}: {e}")
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def write_index(json_path: Path, index: dict) -> int:
+    """Write the sidecar next to ``json_path``. Returns its size in bytes."""
+    path = facets_path(json_path)
+    data = json.dumps(index, separators=(",", ":")).encode()
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def update_index(json_path: Path, players: List[dict], previous_sha1: Optional[str],
+                 source_sha1: str, id_map: Mapping[int, int], added: List[dict],
+                 years_by_url: Optional[Mapping[str, List[int]]] = None) -> dict:
+    """
+    Bring the sidecar for ``json_path`` up to date with ``players``, which
+    replaced the file whose hash was ``previous_sha1``. Patches the old index
+    when it describes that file and every indexed ID is in ``id_map``;
+    otherwise rebuilds. Returns the new index.
+    """
+    index = load_index(json_path)
+    incremental = (
+        index is not None
+        and previous_sha1 is not None
+        and index.get("source_sha1") == previous_sha1
+        and index.get("count") == len(id_map)
+    )
+    if incremental:
+        url_to_id = {p["sportsReferenceUrl"]: int(p["id"])
+                     for p in players if p.get("sportsReferenceUrl")}
+        apply_delta(index, id_map, added, years_by_url, url_to_id)
+        index["source_sha1"] = source_sha1
+        logger.info(f"Facet index updated: {len(added)} added")
+    else:
+        index = build_index(players, years_by_url, source_sha1)
+        logger.info(f"Facet index rebuilt for {len(players)} players")
+    write_index(json_path, index)
+    return index
+
+
+def counts(index: dict, facet: str) -> Dict[str, int]:
+    """Value -> player count for one facet, largest first."""
+    values = index["facets"][facet]
+    return dict(sorted(((v, len(ids)) for v, ids in values.items()), key=lambda x: -x[1]))
+
+
+def select(index: dict, **filters: str) -> List[int]:
+    """
+    Sorted IDs matching every ``facet=value`` filter, e.g.
+    ``select(index, team="KC", position="TE")``. No filters selects nobody.
+    """
+    result: Optional[List[int]] = None
+    for facet, value in filters.items():
+        if facet not in FACETS:
+            raise ValueError(f"Unknown facet {facet!r}; choose from {list(FACETS)}")
+        if facet == "position":
+            value = normalize_position(value)
+        ids = index["facets"][facet].get(str(value), [])
+        if result is None:
+            result = list(ids)
+        else:
+            members = set(ids)
+            result = [i for i in result if i in members]
+    return result or []
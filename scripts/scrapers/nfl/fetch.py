@@ -0,0 +1,290 @@
+"""HTTP fetching with classified retries and a per-host circuit breaker.
+
+Every response or exception is classified before deciding what to do:
+
+- permanent: 404/410 and other client errors -- never retried
+- throttled: 429 -- wait for Retry-After (capped), then retry
+- transient: 5xx, timeouts and connection errors -- exponential backoff
+- blocked: Cloudflare challenge pages -- not retried; retrying won't solve it
+
+Throttled, transient and blocked outcomes count as failures for the host's
+circuit breaker. After ``CIRCUIT_FAILURE_THRESHOLD`` consecutive failures the
+breaker opens and further requests to that host fail fast with
+``CircuitOpenError`` until the cooldown passes, so an outage stops the run
+instead of being hammered.
+"""
+
+import logging
+import random
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from cloudscraper.exceptions import CloudflareException
+
+from config import (
+    MAX_RETRIES,
+    RETRY_DELAY_SECONDS,
+    RETRY_BACKOFF_MAX_SECONDS,
+    MAX_RETRY_AFTER_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+PERMANENT = "permanent"
+THROTTLED = "throttled"
+TRANSIENT = "transient"
+BLOCKED = "blocked"
+
+_CHALLENGE_MARKERS = ("Just a moment...", "cf-chl", "challenge-platform", "cf_chl_opt")
+
+
+class FetchError(Exception):
+    """A fetch that failed for good, tagged with its failure class."""
+
+    kind = ""
+
+    def __init__(self, message: str, url: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+
+class PermanentError(FetchError):
+    """Client error such as 404/410; the page will not appear on retry."""
+    kind = PERMANENT
+
+
+class ThrottledError(FetchError):
+    """Still rate limited after the allowed retries."""
+    kind = THROTTLED
+
+
+class TransientError(FetchError):
+    """Server error or timeout that persisted through the allowed retries."""
+    kind = TRANSIENT
+
+
+class BlockedError(FetchError):
+    """Cloudflare challenge the session could not get past."""
+    kind = BLOCKED
+
+
+class CircuitOpenError(FetchError):
+    """The host's circuit breaker is open; no request was sent."""
+    kind = "circuit_open"
+
+
+def is_challenge(response: requests.Response) -> bool:
+    """Whether a response is a Cloudflare challenge page rather than content."""
+    if response.headers.get("cf-mitigated") == "challenge":
+        return True
+    if response.status_code not in (403, 503):
+        return False
+    if "cloudflare" not in response.headers.get("Server", "").lower():
+        return False
+    body = response.text[:4096]
+    return any(marker in body for marker in _CHALLENGE_MARKERS)
+
+
+def classify(response: requests.Response) -> Optional[str]:
+    """Failure class for a response, or None if it succeeded."""
+    if is_challenge(response):
+        return BLOCKED
+    status = response.status_code
+    if status == 429:
+        return THROTTLED
+    if status >= 500:
+        return TRANSIENT
+    if status >= 400:
+        return PERMANENT
+    return None
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def read_until(response: requests.Response, done: Callable[[bytes], bool],
+               chunk_size: int = 8192) -> Tuple[bytes, bool]:
+    """
+    Read a streamed response until ``done(body_so_far)`` is true, then close
+    the connection without downloading the rest. Returns the bytes read and
+    whether the body was cut short.
+    """
+    buf = bytearray()
+    try:
+        for chunk in response.iter_content(chunk_size):
+            buf += chunk
+            if done(buf):
+                return bytes(buf), True
+        return bytes(buf), False
+    finally:
+        response.close()
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one host."""
+
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown: float = CIRCUIT_COOLDOWN_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent (half-open lets a probe through)."""
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        # A failed half-open probe reopens at once; otherwise wait for the threshold
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.trips += 1
+            self.opened_at = self.clock()
+
+
+class FetchPolicy:
+    """
+    Fetches URLs through a session, applying the retry rules for each failure
+    class and a circuit breaker per host. ``get_stats`` reports the requests,
+    retries and sleep time spent for the run summary.
+    """
+
+    def __init__(self, session: requests.Session, max_attempts: int = MAX_RETRIES,
+                 timeout: float = 30, sleep: Callable[[float], None] = time.sleep,
+                 breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker):
+        self.session = session
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.sleep = sleep
+        self.breaker_factory = breaker_factory
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.requests = 0
+        self.retries = 0
+        self.wasted_retries = 0
+        self.sleep_seconds = 0.0
+        self.outcomes: Counter = Counter()
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        if host not in self.breakers:
+            self.breakers[host] = self.breaker_factory()
+        return self.breakers[host]
+
+    def _wait(self, seconds: float):
+        self.sleep_seconds += seconds
+        self.sleep(seconds)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            stream: bool = False) -> requests.Response:
+        """
+        Fetch ``url``, raising a FetchError subclass if it ultimately fails.
+        A 304 Not Modified (for conditional ``headers``) counts as success.
+        With ``stream`` the body is left unread (see ``read_until``).
+        """
+        breaker = self.breaker(url)
+        retries = 0
+
+        for attempt in range(1, self.max_attempts + 1):
+            if not breaker.allow():
+                self.outcomes["circuit_open"] += 1
+                self.wasted_retries += retries
+                raise CircuitOpenError(f"Circuit open for {urlsplit(url).netloc}", url)
+
+            self.requests += 1
+            response = None
+            try:
+                response = self.session.get(url, timeout=self.timeout, headers=headers,
+                                            stream=stream)
+                kind = classify(response)
+                error = f"HTTP {response.status_code}"
+            except CloudflareException as e:
+                kind, error = BLOCKED, str(e)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                kind, error = TRANSIENT, str(e)
+
+            status = response.status_code if response is not None else None
+            if kind is None:
+                breaker.record_success()
+                self.outcomes["not_modified" if status == 304 else "ok"] += 1
+                return response
+
+            self.outcomes[kind] += 1
+            if kind == PERMANENT:
+                # The host answered; a 404 says nothing about its health
+                breaker.record_success()
+                self.wasted_retries += retries
+                raise PermanentError(error, url, status)
+
+            breaker.record_failure()
+            if kind == BLOCKED:
+                self.wasted_retries += retries
+                raise BlockedError(f"Cloudflare challenge: {error}", url, status)
+
+            if attempt == self.max_attempts:
+                break
+
+            if kind == THROTTLED:
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if delay > MAX_RETRY_AFTER_SECONDS:
+                    self.wasted_retries += retries
+                    raise ThrottledError(f"Retry-After {delay:.0f}s exceeds limit", url, status)
+            else:
+                delay = self._backoff(attempt)
+
+            logger.debug(f"{kind} ({error}) for {url}; retry {attempt} in {delay:.1f}s")
+            retries += 1
+            self.retries += 1
+            self._wait(delay)
+
+        self.wasted_retries += retries
+        error_class = ThrottledError if kind == THROTTLED else TransientError
+        raise error_class(f"{error} after {self.max_attempts} attempts", url, status)
+
+    def get_stats(self) -> dict:
+        """Request, retry and sleep totals for the run summary."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "wasted_retries": self.wasted_retries,
+            "sleep_seconds": round(self.sleep_seconds, 1),
+            "outcomes": dict(self.outcomes),
+            "circuit_trips": sum(b.trips for b in self.breakers.values()),
+        }
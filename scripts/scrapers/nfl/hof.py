@@ -0,0 +1,74 @@
+"""Hall of Fame status for the whole player DB from one page.
+
+PFR lists every inductee on its Hall of Fame index (``/hof/``). ``sync_hall_of_fame``
+fetches that single page, parses the inductee URLs into a set and flags every
+matching record in one pass, instead of one player page request per player.
+Inductees with no record in the DB are reported (and saved with the rest of
+the index to ``HOF_INDUCTEES_PATH``) so they can be queued for scraping;
+``merge`` also reads that file to flag inductees among newly added players.
+
+Records are only ever flagged, never unflagged: a page that failed to parse
+fully must not strip Hall of Fame status from anyone.
+"""
+
+import logging
+import time
+from pathlib import Path
+
+from config import PFR_BASE_URL, PFR_HOF_INDEX, MOBILE_JSON_PATH, HOF_INDUCTEES_PATH
+import player_db
+from parser import parse_hof_index_page
+from profiling import stage
+from scraper import ProBowlScraper, write_json_atomic
+from transaction import db_lock, patch_players
+
+logger = logging.getLogger(__name__)
+
+
+def sync_hall_of_fame(project_root: Path, base_url: str = PFR_BASE_URL) -> dict:
+    """
+    Flag every inductee in the player DB and return sync stats.
+
+    Args:
+        project_root: Repository root used to resolve data paths
+        base_url: Site to fetch from; point at a replay server for offline runs
+    """
+    scraper = ProBowlScraper(project_root, base_url=base_url, request_delay=0)
+    html = scraper.fetch_page(PFR_HOF_INDEX.replace(PFR_BASE_URL, scraper.base_url, 1))
+    with stage("parse"):
+        inductees = parse_hof_index_page(html)
+    if not inductees:
+        raise ValueError("No inductees found on the Hall of Fame index; page layout changed?")
+    logger.info(f"Hall of Fame index lists {len(inductees)} inductees")
+
+    db_path = project_root / MOBILE_JSON_PATH
+    with db_lock(project_root):
+        players = player_db.load(db_path, "records") if db_path.exists() else []
+        present = set()
+        patches = {}
+        for player in players:
+            url = player.get("sportsReferenceUrl", "")
+            if url in inductees:
+                present.add(url)
+                if not player.get("hallOfFame", False):
+                    patches[url] = {"hallOfFame": True}
+        flagged = patch_players(project_root, patches)
+
+        missing = sorted((url for url in inductees if url not in present),
+                         key=lambda url: (inductees[url]["year"] or 0, url))
+        write_json_atomic(project_root / HOF_INDUCTEES_PATH, {
+            "fetched_at": time.time(),
+            "inductees": inductees,
+            "missing": missing,
+        }, indent=2)
+
+    not_listed = sum(1 for p in players
+                     if p.get("hallOfFame", False) and p.get("sportsReferenceUrl", "") not in inductees)
+    return {
+        "inductees": len(inductees),
+        "in_db": len(present),
+        "flagged": flagged,
+        "missing": [{"url": url, **inductees[url]} for url in missing],
+        "not_listed": not_listed,
+        "requests": scraper.fetcher.get_stats()["requests"],
+    }
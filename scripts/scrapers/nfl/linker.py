@@ -0,0 +1,381 @@
+"""Find the same athlete across the NFL, MLB and NBA player databases.
+
+Each sport's file numbers and names its players independently, so a
+multi-sport athlete shows up as unrelated records. ``link`` connects them:
+
+1. every name is normalized (accents, punctuation and Jr./III suffixes
+   dropped, lower case) and blocked on its surname, so only players sharing
+   a surname are ever compared
+2. each surname block is scored against the same block of the other sport
+   in one ``rapidfuzz.process.cdist`` call over the given names (the shared
+   surname would otherwise lift every pair in a block); position hints
+   (``LINK_POSITION_HINTS``) adjust the score, and pairs whose known careers
+   are more than ``LINK_MAX_ERA_GAP_YEARS`` apart are dropped
+3. a name match is only a candidate: it becomes a link when both records'
+   player pages give the same birth date (``--verify`` reads each
+   candidate's ``#meta`` from the page archive, or fetches it), and is
+   dropped when the birth dates differ
+4. pairs are accepted best-first into athletes holding at most one record
+   per sport, separately for links and for candidates still unverified
+
+Careers are only known where the tooling has years for a record (Pro Bowl
+years for NFL players); elsewhere the era check is skipped. Common names
+match across sports all the time, so ``athlete_links.json`` keeps unverified
+matches under ``candidates``, never under ``links``. Records sharing a
+sportsReferenceUrl (duplicates in a sport's file) are indexed once.
+"""
+
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from itertools import combinations, count
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from config import (
+    PFR_BASE_URL,
+    REQUEST_DELAY_SECONDS,
+    SPORT_JSON_PATHS,
+    ATHLETE_LINKS_PATH,
+    PRO_BOWL_YEARS_PATH,
+    LINK_MIN_SCORE,
+    LINK_MAX_ERA_GAP_YEARS,
+    LINK_POSITION_HINTS,
+)
+import player_db
+from fetch import FetchError
+from normalize import normalize_position, position_parts
+from parser import parse_player_meta
+from profiling import profiled, stage
+from scraper import ProBowlScraper, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+_DROP_RE = re.compile(r"[.'’]")
+_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
+# A career span of (first, last) year; (-1, -1) when unknown
+Span = Tuple[int, int]
+# (score, sport a, index a, sport b, index b)
+ScoredPair = Tuple[float, str, int, str, int]
+
+
+def normalize_name(name: str) -> str:
+    """Lower-case ASCII name without punctuation or generational suffixes."""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    # "J.J." -> "jj", "O'Neal" -> "oneal", "Gilgeous-Alexander" -> "gilgeous alexander"
+    tokens = _SEPARATOR_RE.sub(" ", _DROP_RE.sub("", text)).split()
+    while len(tokens) > 1 and tokens[-1] in _SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+class SportIndex:
+    """One sport's players as parallel arrays, grouped into surname blocks."""
+
+    def __init__(self, sport: str, players: List[dict],
+                 spans: Optional[Mapping[str, Span]] = None):
+        self.sport = sport
+        # A sport's file can hold the same player twice; index each URL once
+        seen: Set[str] = set()
+        self.players = []
+        for player in players:
+            url = player.get("sportsReferenceUrl", "")
+            if url and url in seen:
+                continue
+            seen.add(url)
+            self.players.append(player)
+        self.duplicates = len(players) - len(self.players)
+        spans = spans or {}
+        hints = LINK_POSITION_HINTS.get(sport, {})
+        self.names: List[str] = []
+        self.given: List[str] = []  # name without the surname it is blocked on
+        self.blocks: Dict[str, List[int]] = defaultdict(list)
+        bonus, first, last = [], [], []
+        for i, player in enumerate(self.players):
+            name = normalize_name(player.get("name", ""))
+            self.names.append(name)
+            given, _, surname = name.rpartition(" ")
+            self.given.append(given or name)
+            if name:
+                self.blocks[surname].append(i)
+            position = player.get("position") or ""
+            position = normalize_position(position) if sport == "NFL" else position.strip().upper()
+            # A two-way player (e.g. QB/DB) gets the best hint of their positions
+            bonus.append(max((hints.get(part, 0) for part in position_parts(position)), default=0))
+            span = spans.get(player.get("sportsReferenceUrl", ""), (-1, -1))
+            first.append(span[0])
+            last.append(span[1])
+        self.bonus = np.array(bonus, dtype=np.float32)
+        self.first = np.array(first, dtype=np.int32)
+        self.last = np.array(last, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def url(self, i: int) -> str:
+        return self.players[i].get("sportsReferenceUrl", "")
+
+
+# (sport a, sport b, [(score, index in a, index in b), ...])
+SportPairs = Tuple[SportIndex, SportIndex, List[Tuple[float, int, int]]]
+
+
+def candidate_pairs(a: SportIndex, b: SportIndex,
+                    min_score: float = LINK_MIN_SCORE) -> List[Tuple[float, int, int]]:
+    """(score, index in a, index in b) for every pair in a shared block scoring >= min_score."""
+    # The name score alone may fall short by as much as the hints can add
+    max_bonus = max(a.bonus.max(initial=0), 0) + max(b.bonus.max(initial=0), 0)
+    cutoff = max(min_score - max_bonus, 0)
+    pairs = []
+    for key, rows in a.blocks.items():
+        cols = b.blocks.get(key)
+        if not cols:
+            continue
+        scores = process.cdist([a.given[i] for i in rows], [b.given[j] for j in cols],
+                               scorer=fuzz.ratio, score_cutoff=cutoff)
+        r, c = np.nonzero(scores)
+        if not len(r):
+            continue
+        ia, ib = np.asarray(rows)[r], np.asarray(cols)[c]
+        total = scores[r, c] + a.bonus[ia] + b.bonus[ib]
+        known = (a.first[ia] >= 0) & (b.first[ib] >= 0)
+        gap = np.maximum(b.first[ib] - a.last[ia], a.first[ia] - b.last[ib])
+        keep = (total >= min_score) & ~(known & (gap > LINK_MAX_ERA_GAP_YEARS))
+        pairs.extend(zip(total[keep].tolist(), ia[keep].tolist(), ib[keep].tolist()))
+    return pairs
+
+
+def _group(scored: Iterable[ScoredPair]) -> List[dict]:
+    """
+    Greedy best-first: join two groups only if they share no sport, so each
+    athlete keeps at most one record per sport.
+    """
+    group_of: Dict[Tuple[str, int], int] = {}
+    groups: Dict[int, dict] = {}
+    next_id = count()
+    for score, sport_a, i, sport_b, j in sorted(scored, key=lambda pair: -pair[0]):
+        ga, gb = group_of.get((sport_a, i)), group_of.get((sport_b, j))
+        if ga is not None and ga == gb:
+            continue
+        members_a = groups[ga]["members"] if ga is not None else {sport_a: i}
+        members_b = groups[gb]["members"] if gb is not None else {sport_b: j}
+        if members_a.keys() & members_b.keys():
+            continue
+        merged = {"members": {**members_a, **members_b},
+                  "score": min([score] + [groups[g]["score"] for g in (ga, gb) if g is not None])}
+        for g in (ga, gb):
+            groups.pop(g, None)
+        gid = next(next_id)
+        groups[gid] = merged
+        for key in merged["members"].items():
+            group_of[key] = gid
+    return list(groups.values())
+
+
+def _rows(groups: List[dict], indexes: List[SportIndex],
+          birth_dates: Mapping[str, str]) -> List[dict]:
+    """One cross-reference row per group, sorted by name."""
+    by_sport = {index.sport: index for index in indexes}
+    rows = []
+    for group in groups:
+        members = group["members"]
+        first = next(s for s in by_sport if s in members)
+        row = {"name": by_sport[first].players[members[first]].get("name", ""),
+               "score": round(group["score"], 1)}
+        born = {birth_dates.get(by_sport[s].url(i)) for s, i in members.items()}
+        if len(born) == 1 and None not in born:
+            row["birthDate"] = born.pop()
+        for sport in by_sport:
+            if sport in members:
+                player = by_sport[sport].players[members[sport]]
+                row[sport] = {"id": player.get("id", ""),
+                              "url": player.get("sportsReferenceUrl", "")}
+        rows.append(row)
+    rows.sort(key=lambda row: (normalize_name(row["name"]), row["name"]))
+    return rows
+
+
+def sport_pairs(indexes: List[SportIndex], min_score: float = LINK_MIN_SCORE) -> List[SportPairs]:
+    """``candidate_pairs`` for every two sports, computed once for both verifying and linking."""
+    result = []
+    for a, b in combinations(indexes, 2):
+        with stage(f"link_{a.sport}_{b.sport}".lower()):
+            result.append((a, b, candidate_pairs(a, b, min_score)))
+    return result
+
+
+def link(indexes: List[SportIndex], pairs_by_sport: List[SportPairs],
+         birth_dates: Optional[Mapping[str, str]] = None) -> Tuple[List[dict], List[dict], dict]:
+    """
+    Link records across sports. A name match is a link only when both
+    records have the same known birth date; matches whose birth dates differ
+    are dropped, and the rest are returned as unverified candidates. Returns
+    (links, candidates, counts), one row per athlete found in two or more
+    sports.
+
+    Args:
+        indexes: One SportIndex per sport
+        pairs_by_sport: Name matches from ``sport_pairs``
+        birth_dates: sportsReferenceUrl -> YYYY-MM-DD, see ``lookup_birth_dates``
+    """
+    birth_dates = birth_dates or {}
+    verified: List[ScoredPair] = []
+    unverified: List[ScoredPair] = []
+    counts = {"candidates": {}, "verified": 0, "rejected": 0}
+    for a, b, pairs in pairs_by_sport:
+        counts["candidates"][f"{a.sport}-{b.sport}"] = len(pairs)
+        for score, i, j in pairs:
+            born_a, born_b = birth_dates.get(a.url(i)), birth_dates.get(b.url(j))
+            if born_a and born_b:
+                if born_a != born_b:
+                    counts["rejected"] += 1
+                    continue
+                verified.append((score, a.sport, i, b.sport, j))
+            else:
+                unverified.append((score, a.sport, i, b.sport, j))
+    counts["verified"] = len(verified)
+
+    links = _group(verified)
+    linked = {key for group in links for key in group["members"].items()}
+    # A record already linked is not offered again as a candidate
+    candidates = _group(pair for pair in unverified
+                        if (pair[1], pair[2]) not in linked and (pair[3], pair[4]) not in linked)
+
+    counts["linked"] = defaultdict(int)
+    for group in links:
+        for a, b in combinations([index.sport for index in indexes
+                                  if index.sport in group["members"]], 2):
+            counts["linked"][f"{a}-{b}"] += 1
+    counts["linked"] = dict(counts["linked"])
+    return _rows(links, indexes, birth_dates), _rows(candidates, indexes, birth_dates), counts
+
+
+def candidate_urls(pairs_by_sport: List[SportPairs]) -> Set[str]:
+    """URLs of every record in a candidate pair, i.e. the pages verification needs."""
+    urls = set()
+    for a, b, pairs in pairs_by_sport:
+        for _, i, j in pairs:
+            urls.update(url for url in (a.url(i), b.url(j)) if url)
+    return urls
+
+
+def lookup_birth_dates(project_root: Path, urls: Iterable[str], base_url: str = PFR_BASE_URL,
+                       request_delay: float = REQUEST_DELAY_SECONDS) -> Dict[str, str]:
+    """
+    URL -> birth date from each player page's ``#meta``. Pages already in the
+    page archive are read from it; the rest are fetched only as far as
+    ``#meta`` and archived, so a second run makes no requests.
+
+    Args:
+        project_root: Repository root used to resolve data paths
+        urls: Player pages on any Sports Reference site
+        base_url: Site PFR pages are fetched from; point at a replay server for
+            offline runs. While it is overridden, other sites' pages are read
+            from the archive only
+        request_delay: Seconds to sleep between fetched pages
+    """
+    scraper = ProBowlScraper(project_root, base_url=base_url, request_delay=request_delay)
+    # An override stands in for PFR only; other sites' pages must not go live
+    overridden = scraper.base_url != PFR_BASE_URL
+    found, skipped = {}, 0
+    for url in sorted(urls):
+        offset = scraper.archive.index.get(url)
+        if offset is not None:
+            _, body = scraper.archive.read(offset)
+            meta = parse_player_meta(body)
+        elif overridden and not url.startswith(PFR_BASE_URL):
+            skipped += 1
+            continue
+        else:
+            try:
+                meta = scraper.fetch_player_meta(url.replace(PFR_BASE_URL, scraper.base_url, 1))
+            except FetchError as e:
+                # Includes an open circuit for one site; the other sites still get looked up
+                logger.warning(f"Could not read birth date from {url}: {e}")
+                meta = {}
+            time.sleep(scraper.request_delay)
+        if meta.get("birth_date"):
+            found[url] = meta["birth_date"]
+    if skipped:
+        logger.warning(f"Skipped {skipped} unarchived non-PFR pages: --base-url replaces PFR only")
+    logger.info(f"Found birth dates for {len(found)} of {len(urls)} candidate pages")
+    return found
+
+
+def career_spans(years_by_url: Mapping[str, List[int]]) -> Dict[str, Span]:
+    """URL -> (first, last) year from a URL -> years mapping."""
+    return {url: (min(years), max(years)) for url, years in years_by_url.items() if years}
+
+
+@profiled("link", memory=True)
+def run_link(project_root: Path, min_score: float = LINK_MIN_SCORE,
+             paths: Optional[Mapping[str, str]] = None, verify: bool = False,
+             base_url: str = PFR_BASE_URL, request_delay: float = REQUEST_DELAY_SECONDS) -> dict:
+    """
+    Link every available sport database and write the cross-reference table.
+
+    Args:
+        project_root: Repository root used to resolve data paths
+        min_score: Lowest name score (with position hints) to consider
+        paths: Sport -> player DB path (default: SPORT_JSON_PATHS)
+        verify: Look up candidates' birth dates so matches can become links;
+            without it every match stays an unverified candidate
+        base_url: Site PFR pages are fetched from when verifying
+        request_delay: Seconds between pages fetched when verifying
+    """
+    start = time.perf_counter()
+    paths = paths or SPORT_JSON_PATHS
+    spans = {}
+    years_path = project_root / PRO_BOWL_YEARS_PATH
+    if years_path.exists():
+        with open(years_path) as f:
+            spans["NFL"] = career_spans(json.load(f))
+
+    indexes = []
+    with stage("load_existing", memory=True):
+        for sport, rel_path in paths.items():
+            path = project_root / rel_path
+            if not path.exists():
+                logger.warning(f"No {sport} database at {path}; skipping")
+                continue
+            index = SportIndex(sport, player_db.load(path, "records"), spans.get(sport))
+            indexes.append(index)
+            logger.info(f"Loaded {len(index)} {sport} players ({index.duplicates} duplicate URLs skipped)")
+    if len(indexes) < 2:
+        raise RuntimeError("Need at least two sport databases to link")
+
+    pairs_by_sport = sport_pairs(indexes, min_score)
+    birth_dates = {}
+    if verify:
+        with stage("verify"):
+            birth_dates = lookup_birth_dates(project_root, candidate_urls(pairs_by_sport),
+                                             base_url, request_delay)
+
+    links, candidates, counts = link(indexes, pairs_by_sport, birth_dates)
+    out_path = project_root / ATHLETE_LINKS_PATH
+    write_json_atomic(out_path, {
+        "min_score": min_score,
+        "sports": {index.sport: paths[index.sport] for index in indexes},
+        "links": links,  # same name and same birth date
+        "candidates": candidates,  # same name only; not the same person until verified
+    }, indent=2)
+    return {
+        "players": {index.sport: len(index) for index in indexes},
+        "duplicates": {index.sport: index.duplicates for index in indexes},
+        **counts,
+        "athletes": len(links),
+        "rows": links,
+        "candidate_rows": candidates,
+        "birth_dates": len(birth_dates),
+        "path": out_path,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
@@ -3,12 +3,25 @@
 import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
 from rapidfuzz import fuzz
 
-from config import MOBILE_JSON_PATH, WEB_JSON_PATH, SCRAPED_DATA_PATH
+from config import (
+    MOBILE_JSON_PATH,
+    WEB_JSON_PATH,
+    SCRAPED_DATA_PATH,
+    SCRAPED_PHOTOS_PATH,
+    PRO_BOWL_YEARS_PATH,
+    HOF_INDUCTEES_PATH,
+)
+import facets
+import player_db
+from compact import write_compact
 from models import NFLPlayer, NFLPlayerStats
+from profiling import profiled
+from scraper import write_json_atomic
+from transaction import db_lock
 
 logger = logging.getLogger(__name__)
 
@@ -20,14 +33,20 @@ class PlayerMerger:
         self.project_root = project_root
         self.existing_players: List[dict] = []
         self.scraped_players: List[dict] = []
+        self.scraped_photos: Dict[str, str] = {}  # PFR URL -> photo URL
         self.url_to_existing: Dict[str, dict] = {}
+        self.pro_bowl_years: Dict[str, List[int]] = {}  # PFR URL -> Pro Bowl years
+        self.hof_urls: Set[str] = set()  # inductees from the last Hall of Fame sync
+        self.added_players: List[dict] = []
+        self.merge_stats: Dict[str, int] = {}
+        self.facet_index: Optional[dict] = None
 
+    @profiled("load_existing", memory=True)
     def load_existing(self) -> int:
         """Load existing player database. Returns count."""
         path = self.project_root / MOBILE_JSON_PATH
         if path.exists():
-            with open(path, "r") as f:
-                self.existing_players = json.load(f)
+            self.existing_players = player_db.load(path, "records")
 
             # Build URL index
             for player in self.existing_players:
@@ -49,24 +68,69 @@ class PlayerMerger:
             return len(self.scraped_players)
         return 0
 
+    def load_scraped_photos(self) -> int:
+        """Load photo URLs found for existing players. Returns count."""
+        path = self.project_root / SCRAPED_PHOTOS_PATH
+        if path.exists():
+            with open(path, "r") as f:
+                self.scraped_photos = json.load(f)
+            logger.info(f"Loaded {len(self.scraped_photos)} scraped photo URLs")
+        return len(self.scraped_photos)
+
+    def load_pro_bowl_years(self) -> int:
+        """Load the Pro Bowl years the scraper saw per player. Returns count."""
+        path = self.project_root / PRO_BOWL_YEARS_PATH
+        if path.exists():
+            with open(path, "r") as f:
+                self.pro_bowl_years = json.load(f)
+        return len(self.pro_bowl_years)
+
+    def load_hof_inductees(self) -> int:
+        """Load inductee URLs saved by the Hall of Fame sync. Returns count."""
+        path = self.project_root / HOF_INDUCTEES_PATH
+        if path.exists():
+            with open(path, "r") as f:
+                self.hof_urls = set(json.load(f)["inductees"])
+        return len(self.hof_urls)
+
     def merge(self) -> List[dict]:
         """
         Merge scraped Pro Bowl players with existing database.
 
         - Skip players that already exist (by URL)
+        - Fill in scraped photos for existing players that have none
         - Add new players with pro_bowl=True
+        - Flag new players listed by the last Hall of Fame sync
         """
         self.load_existing()
         self.load_scraped()
+        self.load_scraped_photos()
+        self.load_pro_bowl_years()
+        self.load_hof_inductees()
+        return self.merge_loaded()
+
+    @profiled("merge", memory=True)
+    def merge_loaded(self) -> List[dict]:
+        """
+        Merge the players, scraped players and photos already held in memory.
+
+        ``merge`` loads them from disk first; a long-running caller can set
+        them directly and skip the reload.
+        """
+        self.url_to_existing = {
+            p["sportsReferenceUrl"]: p for p in self.existing_players if p.get("sportsReferenceUrl")
+        }
 
         # Track seen URLs to prevent duplicates
         seen_urls: Set[str] = set()
         merged: List[dict] = []
+        self.added_players = []
 
         stats = {
             "existing_kept": 0,
             "new_added": 0,
             "duplicates_skipped": 0,
+            "photos_added": 0,
         }
 
         # First, keep all existing players
@@ -74,6 +138,9 @@ class PlayerMerger:
             url = player.get("sportsReferenceUrl", "")
             if url:
                 seen_urls.add(url)
+                if not player.get("photoUrl") and url in self.scraped_photos:
+                    player["photoUrl"] = self.scraped_photos[url]
+                    stats["photos_added"] += 1
             merged.append(player)
             stats["existing_kept"] += 1
 
@@ -105,46 +172,84 @@ class PlayerMerger:
                 number="",
                 photoUrl="",
                 sportsReferenceUrl=url,
-                hallOfFame=False,  # Pro Bowl != Hall of Fame
+                hallOfFame=url in self.hof_urls,  # from the last Hall of Fame sync (hof_inductees.json)
+                raw=scraped.get("raw"),
             )
             merged.append(new_player.to_dict())
+            self.added_players.append(merged[-1])
             seen_urls.add(url)
             next_id += 1
             stats["new_added"] += 1
 
+        self.merge_stats = stats
         logger.info(f"Merge stats: {stats}")
         logger.info(f"Total players after merge: {len(merged)}")
 
         return merged
 
-    def save_merged(self, players: List[dict]):
-        """Save merged database to both mobile and web locations."""
+    @profiled("save_merged", memory=True)
+    def save_merged(self, players: List[dict], compact: bool = False, refacet: bool = False):
+        """
+        Save merged database to both mobile and web locations, under the
+        player DB lock. ``players`` should be built from the version on disk
+        while the caller holds the lock (see ``transaction``).
+
+        Args:
+            compact: Also write the compact binary variants next to the JSON
+            refacet: Rebuild the facet index rather than patching it, for
+                changes to fields it is computed from
+        """
+        with db_lock(self.project_root):
+            self._save_merged(players, compact, refacet)
+
+    def _save_merged(self, players: List[dict], compact: bool, refacet: bool):
         # Sort by name for consistency
         players.sort(key=lambda p: p.get("name", "").lower())
 
-        # Re-assign IDs in order
+        # Re-assign IDs in order, remembering where existing players moved
+        added = {id(p) for p in self.added_players}
+        id_map: Dict[int, int] = {}
         for i, player in enumerate(players, 1):
+            if id(player) not in added:
+                id_map[int(player["id"])] = i
             player["id"] = str(i)
 
         # Save to mobile
         mobile_path = self.project_root / MOBILE_JSON_PATH
-        with open(mobile_path, "w") as f:
-            json.dump(players, f, indent=2)
+        previous_sha1 = None
+        if mobile_path.exists() and not refacet:
+            previous_sha1 = player_db.fingerprint(mobile_path)[2]
+        write_json_atomic(mobile_path, players, indent=2)
+        player_db.prime(mobile_path, players)
         logger.info(f"Saved to {mobile_path}")
 
+        self.facet_index = facets.update_index(
+            mobile_path, players, previous_sha1, player_db.fingerprint(mobile_path)[2],
+            id_map, [p for p in players if id(p) in added], self.pro_bowl_years,
+        )
+
         # Save to web
         web_path = self.project_root / WEB_JSON_PATH
-        with open(web_path, "w") as f:
-            json.dump(players, f, indent=2)
+        write_json_atomic(web_path, players, indent=2)
+        player_db.prime(web_path, players)
+        facets.write_index(web_path, self.facet_index)
         logger.info(f"Saved to {web_path}")
 
+        if compact:
+            write_compact(mobile_path, players)
+            write_compact(web_path, players)
+
     def get_stats(self, players: List[dict]) -> dict:
         """Get statistics about the merged database."""
-        hof_count = sum(1 for p in players if p.get("hallOfFame", False))
-        positions = {}
-        for p in players:
-            pos = p.get("position", "Unknown") or "Unknown"
-            positions[pos] = positions.get(pos, 0) + 1
+        if self.facet_index is not None:
+            hof_count = len(self.facet_index["facets"]["hall_of_fame"].get("true", []))
+            positions = facets.counts(self.facet_index, "position")
+        else:
+            hof_count = sum(1 for p in players if p.get("hallOfFame", False))
+            positions = {}
+            for p in players:
+                pos = p.get("position", "Unknown") or "Unknown"
+                positions[pos] = positions.get(pos, 0) + 1
 
         return {
             "total_players": len(players),
@@ -155,9 +260,11 @@ class PlayerMerger:
         }
 
 
-def run_merge(project_root: Path) -> dict:
+def run_merge(project_root: Path, compact: bool = False) -> dict:
     """Run the merge process and return stats."""
     merger = PlayerMerger(project_root)
-    merged = merger.merge()
-    merger.save_merged(merged)
+    # Merge into the version on disk now, not one read before another writer saved
+    with db_lock(project_root):
+        merged = merger.merge()
+        merger.save_merged(merged, compact=compact)
     return merger.get_stats(merged)
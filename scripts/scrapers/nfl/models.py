@@ -28,6 +28,7 @@ class NFLPlayer:
     sportsReferenceUrl: str = ""
     stats: NFLPlayerStats = None
     hallOfFame: bool = False
+    raw: Optional[Dict[str, Any]] = None  # position/team as scraped, see normalize.py
 
     def __post_init__(self):
         if self.stats is None:
@@ -35,7 +36,7 @@ class NFLPlayer:
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary matching JSON format."""
-        return {
+        data = {
             "id": self.id,
             "name": self.name,
             "sport": self.sport,
@@ -47,6 +48,9 @@ class NFLPlayer:
             "stats": self.stats.to_dict() if isinstance(self.stats, NFLPlayerStats) else self.stats,
             "hallOfFame": self.hallOfFame,
         }
+        if self.raw is not None:
+            data["raw"] = self.raw
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "NFLPlayer":
@@ -68,4 +72,5 @@ class NFLPlayer:
             sportsReferenceUrl=data.get("sportsReferenceUrl", ""),
             stats=stats,
             hallOfFame=data.get("hallOfFame", False),
+            raw=data.get("raw"),
         )
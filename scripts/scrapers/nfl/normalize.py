@@ -0,0 +1,189 @@
+"""Position and team normalization, applied at scrape time and in bulk.
+
+Roster pages give positions and teams as PFR writes them. Records keep those
+strings under ``raw`` (``{"position", "team", "year"}``) next to the
+normalized ``position`` and ``team``, so a mapping fix is applied to the
+whole DB by ``renormalize`` instead of a re-crawl. The scraper also keeps the
+raw strings of every player it sees, new or not, from their earliest Pro
+Bowl season in the ``RAW_FIELDS_PATH`` sidecar (the way
+``pro_bowl_years.json`` is kept), and ``renormalize`` backfills records that predate ``raw`` from it. An offline
+``rebuild`` regenerates the sidecar from the page archive.
+
+- Positions map through ``POSITION_MAPPINGS``. Compound positions of two-way
+  players (``LT/LLB``) are split, each part is mapped, and the parts are
+  rejoined (``OT/LB``).
+- Teams are era-aware: a code is resolved to its franchise for the record's
+  year (``TEAM_CODE_ERAS`` for codes that named different franchises, e.g.
+  STL), then labelled as the franchise was known that year (``TEAM_ERAS``),
+  so the 1975 Raiders stay OAK rather than becoming LV.
+
+Both lookups are memoized. ``renormalize`` maps each distinct raw value once
+and applies the results with one pass over the records.
+"""
+
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from config import (
+    POSITION_MAPPINGS,
+    TEAM_MAPPINGS,
+    TEAM_ERAS,
+    TEAM_CODE_ERAS,
+    MOBILE_JSON_PATH,
+    RAW_FIELDS_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+_COMPOUND_RE = re.compile(r"\s*[/,-]\s*")
+
+
+def _era_value(spans: Iterable[Tuple[Optional[int], str]], year: Optional[int]) -> str:
+    """The value of the first ``(last year, value)`` span covering ``year``."""
+    spans = list(spans)
+    if year is None:
+        return spans[-1][1]
+    for last, value in spans:
+        if last is None or year <= last:
+            return value
+    return spans[-1][1]
+
+
+@lru_cache(maxsize=None)
+def normalize_position(raw: str) -> str:
+    """Standard position for a PFR position string, e.g. ``LT/LLB`` -> ``OT/LB``."""
+    parts = []
+    for part in _COMPOUND_RE.split((raw or "").strip().upper()):
+        if part:
+            mapped = POSITION_MAPPINGS.get(part, part)
+            if mapped not in parts:
+                parts.append(mapped)
+    return "/".join(parts)
+
+
+def position_parts(position: str) -> List[str]:
+    """The positions in a normalized (possibly compound) position."""
+    return [part for part in position.split("/") if part]
+
+
+@lru_cache(maxsize=None)
+def franchise(raw: str, year: Optional[int] = None) -> str:
+    """Current franchise code for a team code as used in ``year``."""
+    code = (raw or "").strip().upper()
+    if code in TEAM_CODE_ERAS:
+        return _era_value(TEAM_CODE_ERAS[code], year)
+    return TEAM_MAPPINGS.get(code, code)
+
+
+@lru_cache(maxsize=None)
+def normalize_team(raw: str, year: Optional[int] = None) -> str:
+    """Team label for a PFR team code in ``year`` (the current label when no year is known)."""
+    team = franchise(raw, year)
+    if team in TEAM_ERAS:
+        return _era_value(TEAM_ERAS[team], year)
+    return team
+
+
+def raw_fields(position: str, team: str, year: Optional[int]) -> dict:
+    """The ``raw`` object stored on a record."""
+    return {"position": position, "team": team, "year": year}
+
+
+def remember_raw(raw_by_url: Dict[str, dict], url: str, raw: Optional[dict]):
+    """
+    Keep ``raw`` as the raw strings for ``url`` unless an earlier season's are
+    kept already. The earliest season does not depend on the order seasons
+    were crawled in, so every scrape and ``rebuild`` keeps the same one.
+    """
+    if not raw:
+        return
+    kept = raw_by_url.get(url)
+    if kept is None or (raw.get("year") or 0) < (kept.get("year") or 0):
+        raw_by_url[url] = raw
+
+
+def load_raw_fields(project_root: Path) -> Dict[str, dict]:
+    """The URL -> raw strings sidecar, or {} before the first scrape writes it."""
+    path = project_root / RAW_FIELDS_PATH
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def renormalize(players: List[dict],
+                raw_by_url: Optional[Mapping[str, dict]] = None) -> Dict[str, int]:
+    """
+    Re-derive ``position`` and ``team`` from each record's ``raw`` strings, in
+    place. Records without ``raw`` take it from ``raw_by_url`` when present
+    there (the ``RAW_FIELDS_PATH`` sidecar); otherwise they are left alone.
+    Returns counts of records backfilled, skipped and changed per field.
+    """
+    raw_by_url = raw_by_url or {}
+    stats = {"records": len(players), "backfilled": 0, "skipped": 0,
+             "position_changed": 0, "team_changed": 0}
+
+    raws = []
+    for player in players:
+        raw = player.get("raw")
+        if raw is None:
+            raw = raw_by_url.get(player.get("sportsReferenceUrl", ""))
+            if raw is not None:
+                player["raw"] = dict(raw)
+                stats["backfilled"] += 1
+            else:
+                stats["skipped"] += 1
+        raws.append(raw)
+
+    # Map each distinct raw value once; rosters repeat a few hundred of them
+    positions = {r["position"]: normalize_position(r["position"])
+                 for r in raws if r is not None and r.get("position") is not None}
+    teams = {(r["team"], r.get("year")): normalize_team(r["team"], r.get("year"))
+             for r in raws if r is not None and r.get("team") is not None}
+
+    for player, raw in zip(players, raws):
+        if raw is None:
+            continue
+        if raw.get("position") is not None:
+            position = positions[raw["position"]]
+            if player.get("position") != position:
+                player["position"] = position
+                stats["position_changed"] += 1
+        if raw.get("team") is not None:
+            team = teams[(raw["team"], raw.get("year"))]
+            if player.get("team") != team:
+                player["team"] = team
+                stats["team_changed"] += 1
+    return stats
+
+
+def run_renormalize(project_root: Path) -> dict:
+    """
+    Re-apply the mappings across the player DB and save it if anything
+    changed. Raw strings missing from older records are backfilled from the
+    sidecar that ``scrape`` and an offline ``rebuild`` keep for every roster
+    entry.
+    """
+    from merger import PlayerMerger
+    from transaction import db_lock
+    import player_db
+
+    raw_by_url = load_raw_fields(project_root)
+
+    db_path = project_root / MOBILE_JSON_PATH
+    with db_lock(project_root):
+        players = player_db.load(db_path, "records")
+        start = time.perf_counter()
+        stats = renormalize(players, raw_by_url)
+        stats["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Renormalized {len(players)} players in {stats['ms']} ms: {stats}")
+        if stats["backfilled"] or stats["position_changed"] or stats["team_changed"]:
+            merger = PlayerMerger(project_root)
+            merger.load_pro_bowl_years()
+            merger.save_merged(players, refacet=True)
+    return stats
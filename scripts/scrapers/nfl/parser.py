@@ -1,74 +1,178 @@
 """HTML parsing for Pro Football Reference Pro Bowl pages."""
 
 import re
-from typing import List, Optional
-from bs4 import BeautifulSoup
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from bs4 import BeautifulSoup, Tag
 
-from config import PFR_BASE_URL, POSITION_MAPPINGS, TEAM_MAPPINGS
+from config import PFR_BASE_URL
+from normalize import normalize_position, normalize_team, raw_fields
 
 
-def parse_probowl_year_page(html: str, year: int) -> List[dict]:
+_TABLE_ID_RE = re.compile(r'<table\b[^>]*?\bid="([^"]+)"')
+_TABLE_ID_RE_BYTES = re.compile(rb'<table\b[^>]*?\bid="([^"]+)"')
+_META_OPEN_RE = re.compile(r'<div\b[^>]*?\bid="meta"')
+_META_OPEN_RE_BYTES = re.compile(rb'<div\b[^>]*?\bid="meta"')
+_DIV_TAG_RE = re.compile(r"<(/?)div\b", re.IGNORECASE)
+_DIV_TAG_RE_BYTES = re.compile(rb"<(/?)div\b", re.IGNORECASE)
+
+
+class CommentedTables(Mapping):
+    """
+    Tables that PFR ships inside HTML comments, keyed by table ID.
+
+    Construction only scans the raw document for ``<!--`` ... ``-->`` blocks
+    that contain a ``<table`` and records where each table ID lives; nothing
+    is parsed. Looking up an ID parses just its comment block (once), so
+    asking for more tables never re-parses the whole document.
+    """
+
+    def __init__(self, html: Union[str, bytes]):
+        self.html = html
+        self._spans: Dict[str, Tuple[int, int]] = {}
+        self._blocks: Dict[Tuple[int, int], BeautifulSoup] = {}
+
+        if isinstance(html, bytes):
+            open_tag, close_tag, table_tag, id_re = b"<!--", b"-->", b"<table", _TABLE_ID_RE_BYTES
+        else:
+            open_tag, close_tag, table_tag, id_re = "<!--", "-->", "<table", _TABLE_ID_RE
+
+        pos = 0
+        while True:
+            start = html.find(open_tag, pos)
+            if start < 0:
+                break
+            end = html.find(close_tag, start + 4)
+            if end < 0:
+                break
+            table_at = html.find(table_tag, start, end)
+            if table_at >= 0:
+                span = (start + 4, end)
+                for match in id_re.finditer(html, table_at, end):
+                    table_id = match.group(1)
+                    if isinstance(table_id, bytes):
+                        table_id = table_id.decode("utf-8", "replace")
+                    self._spans.setdefault(table_id, span)
+            pos = end + 3
+
+    def __getitem__(self, table_id: str) -> Tag:
+        span = self._spans[table_id]
+        block = self._blocks.get(span)
+        if block is None:
+            start, end = span
+            block = self._blocks[span] = BeautifulSoup(self.html[start:end], "lxml")
+        return block.find("table", id=table_id)
+
+    def __iter__(self):
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+
+def find_table(soup: BeautifulSoup, commented: CommentedTables, table_id: str) -> Optional[Tag]:
+    """Find a table by ID in the live DOM, falling back to commented-out tables."""
+    table = soup.find("table", id=table_id)
+    if table is None and table_id in commented:
+        table = commented[table_id]
+    return table
+
+
+def table_rows(table: Tag) -> List[dict]:
+    """Body rows of a stats table as ``{data-stat: text}`` dicts (header rows skipped)."""
+    body = table.find("tbody") or table
+    rows = []
+    for row in body.find_all("tr"):
+        if "thead" in (row.get("class") or []):
+            continue
+        cells = {c.get("data-stat"): c.get_text(strip=True)
+                 for c in row.find_all(["th", "td"]) if c.get("data-stat")}
+        if cells:
+            rows.append(cells)
+    return rows
+
+
+def _players_from_table(table: Tag, year: int, seen_urls: set) -> List[dict]:
+    """Pro Bowl player entries from one roster table."""
+    players = []
+
+    # Look for player links in the table
+    for row in table.find_all("tr"):
+        cells = row.find_all(["td", "th"])
+
+        for cell in cells:
+            # Find player links
+            link = cell.find("a", href=re.compile(r"/players/[A-Z]/"))
+            if link and link.get("href"):
+                href = link.get("href")
+                url = f"{PFR_BASE_URL}{href}" if href.startswith("/") else href
+
+                # Skip duplicates within this page
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+
+                name = link.get_text(strip=True)
+                if not name:
+                    continue
+
+                # Try to get position and team from the row
+                raw_pos = ""
+                raw_team = ""
+
+                # Look for position in data-stat attribute or cell content
+                for c in cells:
+                    data_stat = c.get("data-stat", "")
+                    text = c.get_text(strip=True)
+
+                    if data_stat == "pos" or data_stat == "position":
+                        raw_pos = text
+                    elif data_stat == "team":
+                        raw_team = text
+
+                players.append({
+                    "name": name,
+                    "url": url,
+                    "position": normalize_position(raw_pos),
+                    "team": normalize_team(raw_team, year),
+                    "pro_bowl_year": year,
+                    # As printed, so a mapping fix can be re-applied later (see normalize.py)
+                    "raw": raw_fields(raw_pos, raw_team, year),
+                })
+
+    return players
+
+
+def parse_probowl_year_page(html: str, year: int, table_ids: Iterable[str] = ()) -> List[dict]:
     """
     Parse a Pro Bowl year page to extract player info.
 
     URL format: https://www.pro-football-reference.com/years/{year}/probowl.htm
 
+    Args:
+        table_ids: Comment-wrapped roster tables to include as well
+
     Returns list of player info dicts with:
     - name: Player's full name
     - url: Full URL to player's page
     - position: Position
     - team: Team abbreviation
+    - raw: Position and team as printed, and the year (see normalize.py)
     """
     soup = BeautifulSoup(html, "lxml")
     players = []
     seen_urls = set()
 
     # Find all player tables (AFC and NFC rosters)
-    tables = soup.find_all("table")
+    for table in soup.find_all("table"):
+        players.extend(_players_from_table(table, year, seen_urls))
 
-    for table in tables:
-        # Look for player links in the table
-        for row in table.find_all("tr"):
-            cells = row.find_all(["td", "th"])
-
-            for cell in cells:
-                # Find player links
-                link = cell.find("a", href=re.compile(r"/players/[A-Z]/"))
-                if link and link.get("href"):
-                    href = link.get("href")
-                    url = f"{PFR_BASE_URL}{href}" if href.startswith("/") else href
-
-                    # Skip duplicates within this page
-                    if url in seen_urls:
-                        continue
-                    seen_urls.add(url)
-
-                    name = link.get_text(strip=True)
-                    if not name:
-                        continue
-
-                    # Try to get position and team from the row
-                    position = ""
-                    team = ""
-
-                    # Look for position in data-stat attribute or cell content
-                    for c in cells:
-                        data_stat = c.get("data-stat", "")
-                        text = c.get_text(strip=True)
-
-                        if data_stat == "pos" or data_stat == "position":
-                            raw_pos = text.upper()
-                            position = POSITION_MAPPINGS.get(raw_pos, raw_pos)
-                        elif data_stat == "team":
-                            team = TEAM_MAPPINGS.get(text.upper(), text.upper())
-
-                    players.append({
-                        "name": name,
-                        "url": url,
-                        "position": position,
-                        "team": team,
-                        "pro_bowl_year": year,
-                    })
+    table_ids = list(table_ids)
+    if table_ids:
+        commented = CommentedTables(html)
+        for table_id in table_ids:
+            if table_id in commented:
+                players.extend(_players_from_table(commented[table_id], year, seen_urls))
 
     # Also check for standalone player links outside tables
     for link in soup.find_all("a", href=re.compile(r"/players/[A-Z]/[A-Za-z]+\d+\.htm")):
@@ -87,6 +191,7 @@ def parse_probowl_year_page(html: str, year: int) -> List[dict]:
                 "position": "",
                 "team": "",
                 "pro_bowl_year": year,
+                "raw": raw_fields("", "", year),
             })
 
     return players
@@ -113,15 +218,123 @@ def parse_probowl_index_page(html: str) -> List[int]:
     return sorted(years)
 
 
-def parse_player_page(html: str) -> dict:
+def parse_hof_index_page(html: str) -> Dict[str, dict]:
+    """
+    Parse the Hall of Fame index page (``/hof/``) for every inductee.
+
+    Returns player URL -> {"name", "year"} (year of induction, or None if the
+    row has none). Only the inductee table is read when present, so links
+    elsewhere on the page are not mistaken for inductees.
+    """
+    soup = BeautifulSoup(html, "lxml")
+    tables = [soup.find("table", id="hof_players")]
+    if tables[0] is None:
+        tables = soup.find_all("table")
+
+    inductees = {}
+    for table in tables:
+        for row in table.find_all("tr"):
+            link = row.find("a", href=re.compile(r"/players/[A-Z]/"))
+            if link is None:
+                continue
+            href = link["href"]
+            url = f"{PFR_BASE_URL}{href}" if href.startswith("/") else href
+            year = None
+            for cell in row.find_all(["th", "td"]):
+                if "year" in cell.get("data-stat", ""):
+                    text = cell.get_text(strip=True)
+                    year = int(text) if text.isdigit() else None
+                    break
+            inductees.setdefault(url, {"name": link.get_text(strip=True), "year": year})
+
+    return inductees
+
+
+def meta_span(html: Union[str, bytes, bytearray]) -> Optional[Tuple[int, int]]:
+    """
+    Start and end offsets of the ``div#meta`` block in a (possibly partial)
+    player page, or None until the block has closed. Works on bytes so a
+    streamed download can stop as soon as this returns.
+    """
+    if isinstance(html, (bytes, bytearray)):
+        open_re, div_re = _META_OPEN_RE_BYTES, _DIV_TAG_RE_BYTES
+    else:
+        open_re, div_re = _META_OPEN_RE, _DIV_TAG_RE
+
+    match = open_re.search(html)
+    if not match:
+        return None
+    depth = 0
+    for tag in div_re.finditer(html, match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = html.find(">" if isinstance(html, str) else b">", tag.end())
+            return (match.start(), end + 1) if end >= 0 else None
+    return None
+
+
+def _parse_meta(meta: Optional[Tag], result: dict):
+    """Fill Hall of Fame, photo, position and birth date from a player page's ``#meta`` block."""
+    if meta is None:
+        return
+
+    # Check for Hall of Fame indicator
+    if "Hall of Fame" in meta.get_text():
+        result["hall_of_fame"] = True
+
+    # Try to get player photo
+    media_item = meta.find("div", {"class": "media-item"})
+    if media_item:
+        img = media_item.find("img")
+        if img and img.get("src"):
+            result["photo_url"] = img["src"]
+
+    # Get position from meta info
+    for p in meta.find_all("p"):
+        text = p.get_text()
+        if "Position:" in text or "Position" in text:
+            # Extract position
+            pos_match = re.search(r"Position:\s*([A-Z]+(?:/[A-Z]+)*)", text)
+            if pos_match:
+                result["position"] = normalize_position(pos_match.group(1))
+
+    # Every Sports Reference site marks the birth date the same way
+    birth = meta.find("span", id="necro-birth")
+    if birth and birth.get("data-birth"):
+        result["birth_date"] = birth["data-birth"]
+
+
+def parse_player_meta(html: Union[str, bytes]) -> dict:
+    """
+    Like ``parse_player_page`` without tables, but only the ``#meta`` block is
+    parsed, so the page may be cut off anywhere after it (see ``meta_span``).
+    """
+    result = {"team": "", "position": "", "photo_url": "", "hall_of_fame": False,
+              "birth_date": "", "tables": {}}
+    span = meta_span(html)
+    if span is None:
+        return result
+    fragment = html[span[0]:span[1]]
+    if isinstance(fragment, (bytes, bytearray)):
+        fragment = bytes(fragment).decode("utf-8", errors="replace")
+    _parse_meta(BeautifulSoup(fragment, "lxml").find("div", id="meta"), result)
+    return result
+
+
+def parse_player_page(html: str, tables: Iterable[str] = ()) -> dict:
     """
     Parse a player's detail page for additional info.
 
+    Args:
+        tables: IDs of stats tables to extract, live or comment-wrapped
+
     Returns dict with:
     - team: Last/primary team
     - position: Position
     - photo_url: Player photo URL
     - hall_of_fame: Whether player is in Hall of Fame
+    - birth_date: YYYY-MM-DD, or "" if the page has none
+    - tables: table ID -> rows (see ``table_rows``) for each requested table found
     """
     soup = BeautifulSoup(html, "lxml")
     result = {
@@ -129,31 +342,18 @@ def parse_player_page(html: str) -> dict:
         "position": "",
         "photo_url": "",
         "hall_of_fame": False,
+        "birth_date": "",
+        "tables": {},
     }
 
-    # Check for Hall of Fame indicator
-    meta = soup.find("div", {"id": "meta"})
-    if meta:
-        meta_text = meta.get_text()
-        if "Hall of Fame" in meta_text:
-            result["hall_of_fame"] = True
+    tables = list(tables)
+    if tables:
+        commented = CommentedTables(html)
+        for table_id in tables:
+            table = find_table(soup, commented, table_id)
+            if table is not None:
+                result["tables"][table_id] = table_rows(table)
 
-    # Try to get player photo
-    media_item = soup.find("div", {"class": "media-item"})
-    if media_item:
-        img = media_item.find("img")
-        if img and img.get("src"):
-            result["photo_url"] = img["src"]
-
-    # Get position from meta info
-    if meta:
-        for p in meta.find_all("p"):
-            text = p.get_text()
-            if "Position:" in text or "Position" in text:
-                # Extract position
-                pos_match = re.search(r"Position:\s*([A-Z]+)", text)
-                if pos_match:
-                    raw_pos = pos_match.group(1)
-                    result["position"] = POSITION_MAPPINGS.get(raw_pos, raw_pos)
+    _parse_meta(soup.find("div", {"id": "meta"}), result)
 
     return result
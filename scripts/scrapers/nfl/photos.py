@@ -0,0 +1,289 @@
+"""Download player headshots once and serve small local thumbnails.
+
+``photoUrl`` points at the source sites' full-size images, which the apps
+would otherwise download just to draw list avatars. This stage:
+
+1. downloads each distinct ``photoUrl`` into a content-addressed store
+   (``PHOTO_STORE_DIR/<sha256[:2]>/<sha256><ext>``), recording URL -> hash in a
+   manifest that is saved as it goes, so an interrupted run resumes where it
+   stopped
+2. renders a square thumbnail per distinct image in a process pool; a
+   thumbnail is named after the image hash, so unchanged images (and the same
+   image under several URLs) are never resized twice
+3. writes ``thumbnailUrl`` back into the player records, as an absolute URL
+   under ``THUMBNAIL_BASE_URL`` so the mobile app can load it too (the
+   thumbnails themselves are deployed with the web app's public files)
+
+With ``refresh`` already-downloaded URLs are re-requested conditionally; a
+304 or identical bytes leaves the existing thumbnail in place.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import cloudscraper
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # only needed to render thumbnails
+    Image = ImageOps = None
+
+from config import (
+    MOBILE_JSON_PATH,
+    REQUEST_DELAY_SECONDS,
+    PHOTO_STORE_DIR,
+    PHOTO_MANIFEST_PATH,
+    THUMBNAIL_DIR,
+    THUMBNAIL_URL_PREFIX,
+    THUMBNAIL_BASE_URL,
+    THUMBNAIL_SIZE,
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_QUALITY,
+)
+import player_db
+from fetch import FetchPolicy, PermanentError, CircuitOpenError
+from merger import PlayerMerger
+from profiling import stage
+from scraper import write_json_atomic
+from transaction import db_lock
+
+logger = logging.getLogger(__name__)
+
+SAVE_EVERY = 25  # downloads between manifest saves
+
+_EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+
+
+def make_thumbnail(src: str, dest: str, size: int, fmt: str, quality: int) -> int:
+    """
+    Render a ``size`` x ``size`` thumbnail of ``src`` to ``dest``. Runs in a
+    worker process. Returns the thumbnail's size in bytes.
+    """
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)
+        # Headshots are portrait; keep the face rather than the chest
+        thumb = ImageOps.fit(img.convert("RGB"), (size, size), Image.LANCZOS, centering=(0.5, 0.3))
+    tmp = dest + ".tmp"
+    thumb.save(tmp, format=fmt.upper(), quality=quality)
+    os.replace(tmp, dest)
+    return os.path.getsize(dest)
+
+
+def rewrite_host(url: str, base_url: Optional[str]) -> str:
+    """Point ``url`` at ``base_url`` (e.g. a replay server), keeping its path."""
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    return base_url.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class PhotoPipeline:
+    """Downloads headshots, renders thumbnails and links them from player records."""
+
+    def __init__(
+        self,
+        project_root: Path,
+        base_url: Optional[str] = None,
+        size: int = THUMBNAIL_SIZE,
+        fmt: str = THUMBNAIL_FORMAT,
+        workers: Optional[int] = None,
+        request_delay: float = REQUEST_DELAY_SECONDS,
+        refresh: bool = False,
+        thumbnail_base_url: str = THUMBNAIL_BASE_URL,
+    ):
+        """
+        Args:
+            project_root: Repository root used to resolve data paths
+            base_url: Fetch images from this host instead (e.g. a replay server)
+            size: Thumbnail edge in pixels
+            fmt: "webp" or "jpeg"
+            workers: Resize processes (default: one per CPU)
+            request_delay: Seconds to sleep between image downloads
+            refresh: Re-request images already in the store
+            thumbnail_base_url: Absolute host/CDN URL that serves THUMBNAIL_DIR;
+                empty writes site-relative URLs that only the web app resolves
+        """
+        if fmt not in _EXTENSIONS:
+            raise ValueError(f"Unsupported thumbnail format {fmt!r}; use webp or jpeg")
+        parts = urlsplit(thumbnail_base_url)
+        if thumbnail_base_url and (parts.scheme not in ("http", "https") or not parts.netloc):
+            raise ValueError(f"Thumbnail base URL must be absolute (https://host/...): {thumbnail_base_url!r}")
+        self.project_root = project_root
+        self.base_url = base_url
+        self.size = size
+        self.fmt = fmt
+        self.workers = workers
+        self.request_delay = request_delay
+        self.refresh = refresh
+        self.thumbnail_base_url = thumbnail_base_url.rstrip("/")
+        self.store_dir = project_root / PHOTO_STORE_DIR
+        self.thumb_dir = project_root / THUMBNAIL_DIR
+        self.manifest_path = project_root / PHOTO_MANIFEST_PATH
+        self.fetcher = FetchPolicy(cloudscraper.create_scraper())
+        self.manifest: Dict[str, dict] = {}  # photo URL -> sha256, ext, validators or error
+        self.stats = {"downloaded": 0, "unchanged": 0, "failed": 0,
+                      "thumbnails": 0, "thumbnails_skipped": 0, "records_updated": 0}
+
+    def load_manifest(self):
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            logger.info(f"Loaded photo manifest: {len(self.manifest)} URLs")
+
+    def save_manifest(self):
+        write_json_atomic(self.manifest_path, self.manifest, indent=2)
+
+    def original_path(self, entry: dict) -> Path:
+        return self.store_dir / entry["sha256"][:2] / (entry["sha256"] + entry["ext"])
+
+    def thumbnail_name(self, sha256: str) -> str:
+        return f"{sha256[:20]}-{self.size}.{_EXTENSIONS[self.fmt]}"
+
+    def _needs_fetch(self, url: str) -> bool:
+        entry = self.manifest.get(url)
+        if entry is None:
+            return True
+        if "sha256" in entry and not self.original_path(entry).exists():
+            return True
+        return self.refresh
+
+    def fetch_one(self, url: str):
+        """Download one image into the store and record it in the manifest."""
+        entry = self.manifest.get(url, {})
+        headers = {}
+        if self.refresh and "sha256" in entry and self.original_path(entry).exists():
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.fetcher.get(rewrite_host(url, self.base_url), headers=headers)
+        except PermanentError as e:
+            self.manifest[url] = {"error": str(e)}
+            self.stats["failed"] += 1
+            return
+        if response.status_code == 304:
+            self.stats["unchanged"] += 1
+            return
+
+        body = response.content
+        sha256 = hashlib.sha256(body).hexdigest()
+        ext = PurePosixPath(urlsplit(url).path).suffix.lower() or ".img"
+        new_entry = {"sha256": sha256, "ext": ext, "bytes": len(body)}
+        if response.headers.get("ETag"):
+            new_entry["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            new_entry["last_modified"] = response.headers["Last-Modified"]
+
+        path = self.original_path(new_entry)
+        if entry.get("sha256") == sha256 and path.exists():
+            self.stats["unchanged"] += 1
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+            self.stats["downloaded"] += 1
+        self.manifest[url] = new_entry
+
+    def fetch_originals(self, urls: List[str]):
+        """Download every URL not yet in the store, saving the manifest as it goes."""
+        pending = [url for url in urls if self._needs_fetch(url)]
+        logger.info(f"{len(pending)} of {len(urls)} photo URLs to fetch")
+        try:
+            for i, url in enumerate(pending, 1):
+                try:
+                    with stage("fetch"):
+                        self.fetch_one(url)
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    # Left out of the manifest, so the next run retries it
+                    logger.warning(f"Error fetching photo {url}: {e}")
+                    self.stats["failed"] += 1
+                if i % SAVE_EVERY == 0:
+                    self.save_manifest()
+                if i < len(pending):
+                    time.sleep(self.request_delay)
+        finally:
+            self.save_manifest()
+
+    def make_thumbnails(self):
+        """Render missing thumbnails, one per distinct image, in a process pool."""
+        jobs = {}
+        for entry in self.manifest.values():
+            if "sha256" not in entry or entry["sha256"] in jobs:
+                continue
+            dest = self.thumb_dir / self.thumbnail_name(entry["sha256"])
+            if dest.exists():
+                self.stats["thumbnails_skipped"] += 1
+                continue
+            jobs[entry["sha256"]] = (str(self.original_path(entry)), str(dest))
+        if not jobs:
+            return
+        if Image is None:
+            raise RuntimeError("Pillow is required to render thumbnails (pip install Pillow)")
+
+        self.thumb_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Rendering {len(jobs)} thumbnails")
+        with stage("thumbnails"), ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(make_thumbnail, src, dest, self.size, self.fmt, THUMBNAIL_QUALITY): src
+                for src, dest in jobs.values()
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    self.stats["thumbnails"] += 1
+                except Exception as e:
+                    logger.warning(f"Could not render thumbnail for {futures[future]}: {e}")
+
+    def apply(self, players: List[dict]) -> int:
+        """Set ``thumbnailUrl`` on records whose photo has a thumbnail. Returns count changed."""
+        changed = 0
+        for player in players:
+            entry = self.manifest.get(player.get("photoUrl", ""), {})
+            thumb = ""
+            if "sha256" in entry:
+                name = self.thumbnail_name(entry["sha256"])
+                if (self.thumb_dir / name).exists():
+                    thumb = f"{self.thumbnail_base_url}{THUMBNAIL_URL_PREFIX}/{name}"
+            if player.get("thumbnailUrl", "") != thumb:
+                if thumb:
+                    player["thumbnailUrl"] = thumb
+                else:
+                    player.pop("thumbnailUrl", None)
+                changed += 1
+        return changed
+
+    def run(self) -> dict:
+        """Run all three steps against the player DB and return stats."""
+        db_path = self.project_root / MOBILE_JSON_PATH
+        players = player_db.load(db_path, "records")
+        urls = list(dict.fromkeys(p["photoUrl"] for p in players if p.get("photoUrl")))
+
+        if not self.thumbnail_base_url:
+            logger.warning("No thumbnail base URL set; thumbnailUrl will be site-relative "
+                           "and the mobile app cannot load it")
+        self.load_manifest()
+        self.fetch_originals(urls)
+        self.make_thumbnails()
+
+        # Downloads and resizing ran unlocked; link thumbnails into the DB as it is now
+        with db_lock(self.project_root):
+            players = player_db.load(db_path, "records")
+            self.stats["records_updated"] = self.apply(players)
+            if self.stats["records_updated"]:
+                PlayerMerger(self.project_root).save_merged(players)
+
+        self.stats["photos"] = len(urls)
+        self.stats["fetch"] = self.fetcher.get_stats()
+        return self.stats
@@ -0,0 +1,282 @@
+"""Streaming, cached access to the app-facing player database.
+
+The player DB is a JSON array of player objects. ``iter_players`` decodes it
+one record at a time from fixed-size chunks, so memory stays bounded by the
+chunk size plus the largest record. ``load`` feeds that stream through one or
+more named projections (e.g. just the URL set) and caches each result in
+process, keyed by the file's size, mtime and content hash. A run that chains
+scrape, merge and validate therefore parses the file once; writers call
+``prime`` after saving so later readers see the new contents without a
+re-parse.
+"""
+
+import codecs
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 16
+
+_SCALAR_END = re.compile(r"[\s,\]]")
+
+# (size, mtime_ns, sha1 hexdigest)
+Fingerprint = Tuple[int, int, str]
+
+
+class UrlSet:
+    """All non-empty sportsReferenceUrl values, as a frozenset."""
+
+    def __init__(self):
+        self.urls = set()
+
+    def add(self, player: dict):
+        url = player.get("sportsReferenceUrl", "")
+        if url:
+            self.urls.add(url)
+
+    def result(self) -> frozenset:
+        return frozenset(self.urls)
+
+
+class IdToName:
+    """Read-only mapping of player ID -> name."""
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}
+
+    def add(self, player: dict):
+        self.names[player.get("id", "")] = player.get("name", "")
+
+    def result(self):
+        return MappingProxyType(self.names)
+
+
+class Summary:
+    """Record and Hall of Fame counts."""
+
+    def __init__(self):
+        self.total = 0
+        self.hall_of_fame = 0
+
+    def add(self, player: dict):
+        self.total += 1
+        if player.get("hallOfFame", False):
+            self.hall_of_fame += 1
+
+    def result(self) -> dict:
+        return {"total": self.total, "hall_of_fame": self.hall_of_fame}
+
+
+class HofMissingPhoto:
+    """URLs of Hall of Famers with no photoUrl, in file order."""
+
+    def __init__(self):
+        self.urls = []
+
+    def add(self, player: dict):
+        url = player.get("sportsReferenceUrl", "")
+        if url and player.get("hallOfFame", False) and not player.get("photoUrl"):
+            self.urls.append(url)
+
+    def result(self) -> tuple:
+        return tuple(self.urls)
+
+
+class Records:
+    """Every record in file order."""
+
+    def __init__(self):
+        self.players = []
+
+    def add(self, player: dict):
+        self.players.append(player)
+
+    def result(self) -> list:
+        return self.players
+
+
+PROJECTIONS = {
+    "urls": UrlSet,
+    "id_to_name": IdToName,
+    "summary": Summary,
+    "hof_missing_photo": HofMissingPhoto,
+    "records": Records,
+}
+
+_cache: Dict[Tuple[str, str], Tuple[Fingerprint, Any]] = {}
+
+
+def iter_players(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yield each element of a top-level JSON array without reading the whole
+    file into memory. Raises json.JSONDecodeError on malformed input,
+    including a root that is not an array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+
+    with open(path, "rb") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        # Where buf sits in the whole document: characters and newlines
+        # already dropped, and the offset of the last dropped newline
+        base = 0
+        lines = 0
+        line_start = -1
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof, base, lines, line_start
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            dropped = buf[:pos]
+            newline = dropped.rfind("\n")
+            if newline >= 0:
+                lines += dropped.count("\n")
+                line_start = base + newline
+            base += pos
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
+            return bool(chunk)
+
+        def error(msg: str, at: int) -> json.JSONDecodeError:
+            """A JSONDecodeError positioned in the whole document, not the buffer."""
+            newline = buf.rfind("\n", 0, at)
+            lineno = lines + buf.count("\n", 0, at) + 1
+            colno = at - newline if newline >= 0 else base + at - line_start
+            err = json.JSONDecodeError(msg, buf, at)
+            err.pos, err.lineno, err.colno = base + at, lineno, colno
+            err.args = (f"{msg}: line {lineno} column {colno} (char {base + at})",)
+            return err
+
+        def skip_ws() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\n\r":
+                    pos += 1
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        if skip_ws() != "[":
+            raise error("Expected a JSON array", pos)
+        pos += 1
+
+        if skip_ws() == "]":
+            pos += 1
+        else:
+            while True:
+                if skip_ws() not in '{["':
+                    # A bare number cut at a chunk boundary would still decode,
+                    # so make sure its terminator is buffered first
+                    while not _SCALAR_END.search(buf, pos) and fill():
+                        pass
+                while True:
+                    try:
+                        value, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError as e:
+                        before = base
+                        if fill():
+                            continue
+                        # fill() dropped the consumed prefix, shifting buf
+                        raise error(e.msg, e.pos - (base - before)) from None
+                    break
+                pos = end
+                yield value
+
+                sep = skip_ws()
+                pos += 1
+                if sep == "]":
+                    break
+                if sep != ",":
+                    raise error("Expected ',' or ']'", pos - 1)
+
+        if skip_ws():
+            raise error("Extra data", pos)
+
+
+def fingerprint(path: Path) -> Fingerprint:
+    """Size, mtime and content hash identifying one version of a file."""
+    stat = path.stat()
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+def _export(name: str, value: Any) -> Any:
+    # Callers may edit top-level fields of records (e.g. save_merged renumbers
+    # IDs), so hand out per-record copies; nested dicts are shared.
+    if name == "records":
+        return [dict(p) for p in value]
+    if name == "summary":
+        return dict(value)
+    return value
+
+
+def load_many(path: Path, projections: Iterable[str]) -> Dict[str, Any]:
+    """
+    Return the requested projections of the player DB at ``path``, parsing
+    the file at most once for all projections not already cached.
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    fp = fingerprint(path)
+    results: Dict[str, Any] = {}
+    missing = []
+
+    for name in projections:
+        if name not in PROJECTIONS:
+            raise ValueError(f"Unknown projection {name!r}; choose from {sorted(PROJECTIONS)}")
+        cached = _cache.get((key, name))
+        if cached is not None and cached[0] == fp:
+            results[name] = cached[1]
+        else:
+            missing.append(name)
+
+    if missing:
+        accumulators = {name: PROJECTIONS[name]() for name in missing}
+        for player in iter_players(path):
+            for acc in accumulators.values():
+                acc.add(player)
+        for name, acc in accumulators.items():
+            results[name] = acc.result()
+            _cache[(key, name)] = (fp, results[name])
+        logger.debug(f"Parsed {path.name} for projections {missing}")
+
+    return {name: _export(name, value) for name, value in results.items()}
+
+
+def load(path: Path, projection: str = "records") -> Any:
+    """Return one projection of the player DB at ``path`` (see ``load_many``)."""
+    return load_many(path, [projection])[projection]
+
+
+def prime(path: Path, players: list):
+    """
+    Record that ``path`` now holds ``players`` (call right after writing it),
+    so every projection is served from memory until the file changes again.
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    fp = fingerprint(path)
+    players = [dict(p) for p in players]
+    for name, projection in PROJECTIONS.items():
+        acc = projection()
+        for player in players:
+            acc.add(player)
+        _cache[(key, name)] = (fp, acc.result())
+
+
+def clear_cache():
+    _cache.clear()
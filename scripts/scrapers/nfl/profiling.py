@@ -0,0 +1,202 @@
+"""Opt-in per-stage CPU and memory profiling for the scraper pipeline.
+
+Pipeline code marks its stages with ``stage("parse")`` or ``@profiled("merge")``.
+While profiling is disabled (the default) these cost a single flag check. When
+``enable()`` has been called, each stage name gets its own ``cProfile.Profile``
+that accumulates across calls, and stages marked ``memory=True`` also record
+tracemalloc snapshots so allocation sites and peak usage can be reported.
+
+Stages may nest: entering an inner stage pauses the outer one, so every
+function call is attributed to exactly one stage. Time outside any stage is
+reported as ``other``.
+"""
+
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NULL = nullcontext()
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements for one pipeline stage."""
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    calls: int = 0
+    wall_seconds: float = 0.0
+    memory: bool = False
+    # (filename, lineno) -> [net bytes, net blocks] across all calls
+    memory_sites: Dict[Tuple[str, int], List[int]] = field(default_factory=dict)
+    peak_bytes: int = 0
+
+
+class Profiler:
+    """Collects per-stage cProfile and tracemalloc data for one run."""
+
+    def __init__(self):
+        self.enabled = False
+        self.stages: Dict[str, StageStats] = {}
+        self._stack: List[StageStats] = []
+
+    def enable(self):
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._enter(self._get("other"))
+
+    def disable(self):
+        while self._stack:
+            self._stack.pop().profile.disable()
+        self.enabled = False
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _get(self, name: str) -> StageStats:
+        if name not in self.stages:
+            self.stages[name] = StageStats()
+        return self.stages[name]
+
+    def _enter(self, stats: StageStats):
+        if self._stack:
+            self._stack[-1].profile.disable()
+        self._stack.append(stats)
+        stats.profile.enable()
+
+    def _exit(self):
+        self._stack.pop().profile.disable()
+        if self._stack:
+            self._stack[-1].profile.enable()
+
+    @contextmanager
+    def _paused(self):
+        """Suspend the active profile so bookkeeping is not charged to any stage."""
+        if self._stack:
+            self._stack[-1].profile.disable()
+        try:
+            yield
+        finally:
+            if self._stack:
+                self._stack[-1].profile.enable()
+
+    def _note_peak(self):
+        """Fold the current traced peak into every open memory stage."""
+        _, peak = tracemalloc.get_traced_memory()
+        for stats in self._stack:
+            if stats.memory:
+                stats.peak_bytes = max(stats.peak_bytes, peak)
+
+    @contextmanager
+    def _stage(self, name: str, memory: bool):
+        stats = self._get(name)
+        stats.calls += 1
+        before = None
+        if memory:
+            with self._paused():
+                # Resetting the peak would hide it from enclosing memory stages
+                self._note_peak()
+                tracemalloc.reset_peak()
+                before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        self._enter(stats)
+        try:
+            yield
+        finally:
+            stats.wall_seconds += time.perf_counter() - start
+            if before is not None:
+                with self._paused():
+                    stats.memory = True
+                    self._note_peak()
+                    after = tracemalloc.take_snapshot()
+                    for diff in after.compare_to(before, "lineno"):
+                        frame = diff.traceback[0]
+                        site = stats.memory_sites.setdefault((frame.filename, frame.lineno), [0, 0])
+                        site[0] += diff.size_diff
+                        site[1] += diff.count_diff
+            self._exit()
+
+    def stage(self, name: str, memory: bool = False):
+        """Context manager attributing the enclosed work to ``name``."""
+        if not self.enabled:
+            return _NULL
+        return self._stage(name, memory)
+
+    def report(self, out_dir: Path, top: int = 15) -> str:
+        """
+        Write one ``<stage>.pstats`` per stage plus ``summary.txt`` to
+        ``out_dir`` and return the summary text.
+        """
+        out_dir.mkdir(parents=True, exist_ok=True)
+        lines = ["=" * 50, "Profile Summary", "=" * 50]
+
+        for name, stats in sorted(self.stages.items(), key=lambda s: -s[1].wall_seconds):
+            stats.profile.create_stats()
+            if not stats.profile.stats:
+                continue
+            stats.profile.dump_stats(out_dir / f"{name}.pstats")
+
+            header = f"\n[{name}]"
+            if name != "other":
+                header += f" {stats.calls} call(s), {stats.wall_seconds:.3f}s wall"
+            lines.append(header)
+
+            buf = io.StringIO()
+            pstats.Stats(stats.profile, stream=buf).sort_stats("tottime").print_stats(top)
+            body = buf.getvalue()
+            # Skip pstats' preamble; keep the column header and rows
+            lines.append(body[body.find("   ncalls"):].rstrip() if "   ncalls" in body else body.rstrip())
+
+            if stats.peak_bytes:
+                lines.append(f"  peak traced memory: {stats.peak_bytes / 1024 / 1024:.1f} MiB")
+                sites = sorted(stats.memory_sites.items(), key=lambda s: -abs(s[1][0]))[:top]
+                lines.append("  top allocation sites (net change):")
+                for (filename, lineno), (size, count) in sites:
+                    lines.append(f"    {size / 1024:+10.1f} KiB  {count:+8d} blocks  {filename}:{lineno}")
+
+        summary = "\n".join(lines + ["=" * 50])
+        (out_dir / "summary.txt").write_text(summary + "\n")
+        logger.info(f"Profile written to {out_dir}")
+        return summary
+
+
+_profiler = Profiler()
+
+
+def enable():
+    """Turn on profiling for the rest of the process."""
+    _profiler.enable()
+
+
+def stage(name: str, memory: bool = False):
+    """Attribute the enclosed work to a pipeline stage (no-op unless enabled)."""
+    return _profiler.stage(name, memory)
+
+
+def profiled(name: str, memory: bool = False):
+    """Decorator form of ``stage`` for whole functions or methods."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return fn(*args, **kwargs)
+            with _profiler._stage(name, memory):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def finish(out_dir: Path, top: int = 15) -> Optional[str]:
+    """Stop profiling and write reports. Returns the summary, or None if disabled."""
+    if not _profiler.enabled:
+        return None
+    _profiler.disable()
+    return _profiler.report(out_dir, top)
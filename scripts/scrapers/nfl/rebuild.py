@@ -0,0 +1,88 @@
+"""Regenerate scraped data from the page archive, with no network access.
+
+After a parser fix, ``run_rebuild`` re-parses every archived Pro Bowl year
+page and player page across a process pool and rewrites the scraper's output
+files (scraped players, photos, Pro Bowl years and the checkpoint) exactly as
+a full crawl over the same pages would have.
+"""
+
+import logging
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+
+from config import PFR_BASE_URL, PAGE_ARCHIVE_PATH
+from archive import PageArchive
+from parser import parse_probowl_index_page, parse_probowl_year_page, parse_player_meta
+from scraper import ProBowlScraper
+
+logger = logging.getLogger(__name__)
+
+_YEAR_RE = re.compile(r"/years/(\d{4})/probowl\.htm$")
+_PLAYER_RE = re.compile(r"/players/[A-Z]/[^/]+\.htm$")
+_INDEX_URL = f"{PFR_BASE_URL}/probowl/"
+
+_archive: Optional[PageArchive] = None  # opened once per worker process
+
+
+def _init_worker(archive_path: str):
+    global _archive
+    _archive = PageArchive(Path(archive_path))
+
+
+def _parse_record(task: Tuple[str, str, int, int]) -> tuple:
+    """Parse one archived page in a worker. Returns (kind, url, year, result)."""
+    kind, url, offset, year = task
+    header, body = _archive.read(offset)
+    html = body.decode(header.get("encoding") or "utf-8", errors="replace")
+    if kind == "year":
+        return kind, url, year, parse_probowl_year_page(html, year)
+    return kind, url, year, parse_player_meta(html)["photo_url"]
+
+
+def run_rebuild(project_root: Path, workers: Optional[int] = None) -> dict:
+    """Rebuild the scraper's output files from the archive and return stats."""
+    start = time.perf_counter()
+    archive = PageArchive(project_root / PAGE_ARCHIVE_PATH)
+    offsets = archive.latest()
+
+    scraper = ProBowlScraper(project_root)
+    scraper.load_existing_players()
+    if _INDEX_URL in offsets:
+        years = parse_probowl_index_page(archive.get(_INDEX_URL))
+        if years:
+            scraper.available_years = years
+
+    tasks = []
+    for url, offset in offsets.items():
+        match = _YEAR_RE.search(url)
+        if match:
+            tasks.append(("year", url, offset, int(match.group(1))))
+        elif _PLAYER_RE.search(url):
+            tasks.append(("player", url, offset, 0))
+    logger.info(f"Rebuilding from {len(tasks)} archived pages")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(archive.path),)) as pool:
+        results = list(pool.map(_parse_record, tasks, chunksize=16))
+
+    # Apply in the order a crawl would have (newest season first) so output is stable
+    years = sorted((r for r in results if r[0] == "year"), key=lambda r: -r[2])
+    for _, _, year, players in years:
+        scraper.record_year(year, players)
+    for _, url, _, photo_url in sorted(r for r in results if r[0] == "player"):
+        if photo_url:
+            scraper.scraped_photos[url] = photo_url
+        scraper.photos_checked.add(url)
+
+    scraper.save_checkpoint()
+    return {
+        "pages": len(tasks),
+        "year_pages": len(years),
+        "player_pages": len(tasks) - len(years),
+        "unique_players": len(scraper.scraped_players),
+        "photos_found": len(scraper.scraped_photos),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""Local stand-in for pro-football-reference.com serving recorded pages.
+
+Pages live in a fixtures directory mirroring PFR URL paths, e.g.
+``years/2020/probowl.htm`` or ``players/B/BradTo00.htm``; a path ending in
+``/`` is served from ``index.htm``. Latency, jitter, 429 and 5xx responses can
+be injected so throughput and retry behavior are measurable offline. Pages
+carry Last-Modified (the fixture's mtime) and honor If-Modified-Since:
+
+    python replay_server.py generate fixtures/
+    python replay_server.py serve fixtures/pfr   # small bundled fixture set
+    python replay_server.py serve fixtures/ --latency 0.05 --rate-429 0.02
+    python run_scraper.py --base-url http://127.0.0.1:8765 scrape --fresh
+"""
+
+import argparse
+import logging
+import mimetypes
+import random
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from config import PROBOWL_START_YEAR, PROBOWL_END_YEAR
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplayConfig:
+    """Fault and latency injection settings for the replay server."""
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # extra random seconds in [0, jitter)
+    rate_429: float = 0.0  # probability of answering 429 Too Many Requests
+    rate_5xx: float = 0.0  # probability of answering 503 Service Unavailable
+    retry_after: int = 1  # Retry-After header value sent with 429s
+    seed: Optional[int] = None
+
+
+class ReplayServer:
+    """Threaded HTTP server serving a fixtures directory with fault injection."""
+
+    def __init__(self, fixtures_dir: Path, config: ReplayConfig = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.fixtures_dir = Path(fixtures_dir).resolve()
+        self.config = config or ReplayConfig()
+        self.random = random.Random(self.config.seed)
+        self.status_counts: Counter = Counter()
+        self.path_counts: Counter = Counter()
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def resolve(self, url_path: str) -> Optional[Path]:
+        """Map a request path to a fixture file, refusing paths outside the directory."""
+        url_path = url_path.split("?", 1)[0].split("#", 1)[0]
+        if url_path.endswith("/"):
+            url_path += "index.htm"
+        path = (self.fixtures_dir / url_path.lstrip("/")).resolve()
+        if self.fixtures_dir not in path.parents or not path.is_file():
+            return None
+        return path
+
+    def _record(self, path: str, status: int, size: int = 0):
+        with self._lock:
+            self.status_counts[status] += 1
+            self.path_counts[path] += 1
+            self.bytes_sent += size
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                config = server.config
+                with server._lock:
+                    delay = config.latency + server.random.uniform(0, config.jitter)
+                    roll = server.random.random()
+                if delay:
+                    time.sleep(delay)
+
+                if roll < config.rate_429:
+                    self.send_response(429)
+                    self.send_header("Retry-After", str(config.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    server._record(self.path, 429)
+                    return
+                if roll < config.rate_429 + config.rate_5xx:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    server._record(self.path, 503)
+                    return
+
+                fixture = server.resolve(self.path)
+                if fixture is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    server._record(self.path, 404)
+                    return
+
+                mtime = int(fixture.stat().st_mtime)
+                since = self.headers.get("If-Modified-Since")
+                if since:
+                    try:
+                        not_modified = parsedate_to_datetime(since).timestamp() >= mtime
+                    except (TypeError, ValueError):
+                        not_modified = False
+                    if not_modified:
+                        self.send_response(304)
+                        self.end_headers()
+                        server._record(self.path, 304)
+                        return
+
+                body = fixture.read_bytes()
+                self.send_response(200)
+                self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+                if fixture.suffix in (".htm", ".html"):
+                    content_type = "text/html; charset=utf-8"
+                else:
+                    content_type = mimetypes.guess_type(fixture.name)[0] or "application/octet-stream"
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server._record(self.path, 200, len(body))
+
+            def log_message(self, format, *args):
+                logger.debug("replay: " + format, *args)
+
+        return Handler
+
+    def start(self) -> "ReplayServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Replay server on {self.base_url} serving {self.fixtures_dir}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def get_stats(self) -> dict:
+        """Request counts for the run so far."""
+        with self._lock:
+            return {
+                "requests": sum(self.status_counts.values()),
+                "unique_paths": len(self.path_counts),
+                "by_status": dict(sorted(self.status_counts.items())),
+                "bytes_sent": self.bytes_sent,
+            }
+
+
+def _player_href(n: int) -> str:
+    return f"/players/P/Plyr{n:04d}00.htm"
+
+
+def _year_page(year: int, roster: list) -> str:
+    positions = ["QB", "RB", "WR", "TE", "T", "G", "C", "DE", "DT", "OLB", "CB", "S", "K", "P"]
+    teams = ["KAN", "GNB", "NWE", "SFO", "DAL", "PIT", "RAI", "SDG", "CLT", "HST"]
+    rows = "\n".join(
+        f'<tr><th data-stat="pos">{positions[n % len(positions)]}</th>'
+        f'<td data-stat="player"><a href="{_player_href(n)}">Player {n}</a></td>'
+        f'<td data-stat="team">{teams[n % len(teams)]}</td></tr>'
+        for n in roster
+    )
+    return (
+        f"<html><head><title>{year} Pro Bowl</title></head><body>"
+        f'<div id="content"><h1>{year} Pro Bowl Rosters</h1>'
+        f'<table id="pro_bowl"><thead><tr><th>Pos</th><th>Player</th><th>Tm</th></tr></thead>'
+        f"<tbody>\n{rows}\n</tbody></table></div></body></html>"
+    )
+
+
+# Secondary tables PFR ships inside HTML comments, with their data-stat columns
+_COMMENTED_TABLES = {
+    "rushing_and_receiving": ["rush_att", "rush_yds", "rush_td", "rec", "rec_yds", "rec_td"],
+    "defense": ["tackles_combined", "sacks", "def_int", "fumbles_forced"],
+    "returns": ["punt_ret", "punt_ret_yds", "kick_ret", "kick_ret_yds"],
+    "scoring": ["all_td", "two_pt_md", "scoring"],
+    "snap_counts": ["offense", "off_pct", "defense", "def_pct", "special_teams"],
+}
+
+
+def _stat_table(table_id: str, columns: list, n: int, seasons: int) -> str:
+    rows = "\n".join(
+        f'<tr><th scope="row" data-stat="year_id">{1990 + s}</th>'
+        f'<td data-stat="team">KAN</td><td data-stat="g">16</td>'
+        + "".join(f'<td data-stat="{col}">{(n * 31 + s * 17 + i * 7) % 1000}</td>'
+                  for i, col in enumerate(columns))
+        + "</tr>"
+        for s in range(seasons)
+    )
+    head = "".join(f'<th data-stat="{col}">{col}</th>' for col in ["year_id", "team", "g"] + columns)
+    return (
+        f'<div class="table_container" id="div_{table_id}">'
+        f'<table class="stats_table" id="{table_id}"><thead><tr>{head}</tr></thead>'
+        f"<tbody>\n{rows}\n</tbody></table></div>"
+    )
+
+
+def _hof_page(inductees: list) -> str:
+    rows = "\n".join(
+        f'<tr><th data-stat="year_induction">{1963 + n % 60}</th>'
+        f'<td data-stat="player"><a href="{_player_href(n)}">Player {n}</a></td>'
+        f'<td data-stat="pos">QB</td></tr>'
+        for n in inductees
+    )
+    return (
+        "<html><head><title>Hall of Fame</title></head><body>"
+        '<div id="content"><h1>Pro Football Hall of Fame</h1>'
+        '<table id="hof_players"><thead><tr><th>Year</th><th>Player</th><th>Pos</th></tr></thead>'
+        f"<tbody>\n{rows}\n</tbody></table></div></body></html>"
+    )
+
+
+def _player_page(n: int, seasons: int = 12) -> str:
+    """A PFR-shaped player page: #meta, a live passing table, commented tables."""
+    stat_rows = "\n".join(
+        f'<tr><th data-stat="year_id">{1990 + s}</th><td data-stat="team">KAN</td>'
+        f'<td data-stat="g">16</td><td data-stat="pass_yds">{(n * 37 + s * 101) % 5000}</td>'
+        f'<td data-stat="rush_yds">{(n * 13 + s * 7) % 1500}</td>'
+        f'<td data-stat="pass_td">{(n + s) % 40}</td></tr>'
+        for s in range(seasons)
+    )
+    hof = "<p><strong>Hall of Fame</strong> Inducted 2010</p>" if n % 10 == 0 else ""
+    born = f"{1960 + n % 30}-{1 + n % 12:02d}-{1 + n % 28:02d}"
+    commented = "\n".join(
+        f'<div id="all_{table_id}" class="table_wrapper"><div class="placeholder"></div>\n'
+        f"<!--\n{_stat_table(table_id, columns, n, seasons)}\n-->\n</div>"
+        for table_id, columns in _COMMENTED_TABLES.items()
+    )
+    return (
+        f"<html><head><title>Player {n} Stats</title></head><body>"
+        f"<!-- page chrome comment -->"
+        f'<div id="meta"><div class="media-item">'
+        f'<img src="https://www.pro-football-reference.com/{_headshot_path(n)}">'
+        f"</div><div><h1>Player {n}</h1><p><strong>Position</strong>: QB</p>"
+        f'<p><strong>Born:</strong> <span id="necro-birth" data-birth="{born}">{born}</span></p>'
+        f"{hof}</div></div>"
+        f'<div id="content"><table id="passing"><tbody>\n{stat_rows}\n</tbody></table>\n'
+        f"{commented}</div></body></html>"
+    )
+
+
+def _headshot_path(n: int) -> str:
+    return f"req/20230307/images/headshots/Plyr{n:04d}00.jpg"
+
+
+def _headshot_png(n: int, width: int = 120, height: int = 180) -> bytes:
+    """A solid-color PNG standing in for a headshot (PIL opens it despite the .jpg name)."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    color = bytes(((n * 53) % 256, (n * 97) % 256, (n * 151) % 256))
+    raw = (b"\x00" + color * width) * height
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+def generate_fixtures(out_dir: Path, players_per_year: int = 88, seed: int = 0,
+                      start_year: int = PROBOWL_START_YEAR,
+                      end_year: int = PROBOWL_END_YEAR) -> dict:
+    """
+    Write synthetic PFR-shaped pages so the replay server works without
+    recordings. Rosters overlap across years like real Pro Bowl selections.
+    """
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    years = list(range(start_year, end_year + 1))
+    pool_size = max(players_per_year, len(years) * players_per_year // 3)
+    players = set()
+
+    index_links = []
+    for year in years:
+        roster = sorted(rng.sample(range(pool_size), players_per_year))
+        players.update(roster)
+        path = out_dir / "years" / str(year) / "probowl.htm"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_year_page(year, roster))
+        index_links.append(f'<a href="/years/{year}/probowl.htm">{year}</a>')
+
+    index = out_dir / "probowl" / "index.htm"
+    index.parent.mkdir(parents=True, exist_ok=True)
+    index.write_text(f"<html><body>{' '.join(index_links)}</body></html>")
+
+    # Inductees match the players whose pages say Hall of Fame, plus a few
+    # who never made a Pro Bowl roster and so are not in the DB
+    hof = out_dir / "hof" / "index.htm"
+    hof.parent.mkdir(parents=True, exist_ok=True)
+    hof.write_text(_hof_page(sorted(n for n in players if n % 10 == 0)
+                             + [pool_size + 10 * k for k in range(1, 4)]))
+
+    for n in players:
+        path = out_dir / _player_href(n).lstrip("/")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(_player_page(n))
+        headshot = out_dir / _headshot_path(n)
+        headshot.parent.mkdir(parents=True, exist_ok=True)
+        headshot.write_bytes(_headshot_png(n))
+
+    return {"years": len(years), "players": len(players)}
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Local PFR stand-in for offline scraping")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    serve_parser = subparsers.add_parser("serve", help="Serve a fixtures directory")
+    serve_parser.add_argument("fixtures_dir", type=Path)
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response")
+    serve_parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds")
+    serve_parser.add_argument("--rate-429", type=float, default=0.0, help="Probability of a 429")
+    serve_parser.add_argument("--rate-5xx", type=float, default=0.0, help="Probability of a 503")
+    serve_parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds")
+    serve_parser.add_argument("--seed", type=int, default=None)
+
+    generate_parser = subparsers.add_parser("generate", help="Write synthetic fixtures")
+    generate_parser.add_argument("out_dir", type=Path)
+    generate_parser.add_argument("--players-per-year", type=int, default=88)
+    generate_parser.add_argument("--seed", type=int, default=0)
+    generate_parser.add_argument("--start-year", type=int, default=PROBOWL_START_YEAR)
+    generate_parser.add_argument("--end-year", type=int, default=PROBOWL_END_YEAR)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        config = ReplayConfig(
+            latency=args.latency, jitter=args.jitter, rate_429=args.rate_429,
+            rate_5xx=args.rate_5xx, retry_after=args.retry_after, seed=args.seed,
+        )
+        server = ReplayServer(args.fixtures_dir, config, port=args.port)
+        print(f"Serving {args.fixtures_dir} on {server.base_url} (Ctrl+C to stop)")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+            print(f"Stats: {server.get_stats()}")
+    elif args.command == "generate":
+        stats = generate_fixtures(args.out_dir, args.players_per_year, args.seed,
+                                  args.start_year, args.end_year)
+        print(f"Generated {stats['years']} year pages and {stats['players']} player pages")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
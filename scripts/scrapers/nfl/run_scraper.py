@@ -11,7 +11,22 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from scraper import ProBowlScraper
 from merger import run_merge, PlayerMerger
-from config import PROBOWL_START_YEAR, PROBOWL_END_YEAR
+import profiling
+from config import (
+    PFR_BASE_URL,
+    PROBOWL_START_YEAR,
+    DAEMON_POLL_INTERVAL_SECONDS,
+    DAEMON_HEALTH_PORT,
+    MOBILE_JSON_PATH,
+    REQUEST_DELAY_SECONDS,
+    LINK_MIN_SCORE,
+    THUMBNAIL_SIZE,
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_BASE_URL,
+    THUMBNAIL_URL_PREFIX,
+)
+import facets
+from scheduler import parse_budget
 
 
 def setup_logging(verbose: bool = False):
@@ -41,10 +56,29 @@ def cmd_scrape(args):
     """Run the Pro Bowl scraper."""
     project_root = find_project_root()
     logging.info(f"Project root: {project_root}")
-    logging.info(f"Scraping Pro Bowl rosters from {PROBOWL_START_YEAR} to {PROBOWL_END_YEAR}")
 
-    scraper = ProBowlScraper(project_root)
-    players = scraper.scrape_all(resume=not args.fresh)
+    budget = parse_budget(args.budget) if args.budget else None
+    if budget:
+        logging.info(f"Budget: {budget}")
+
+    scraper = ProBowlScraper(project_root, base_url=args.base_url)
+    if getattr(args, "plan", False):
+        plan = scraper.plan(resume=not args.fresh)
+        years = plan.available_years
+        eta = plan.eta_seconds(scraper.request_delay, scraper.index_latency)
+        print("\n" + "=" * 50)
+        print("Scrape Plan (dry run)")
+        print("=" * 50)
+        print(f"Pro Bowl years: {years[0]}-{years[-1]} ({len(years)} pages, from {plan.source})")
+        print(f"Season pages to fetch: {len(plan.years)} ({plan.skipped_years} already final)")
+        print(f"Hall of Famer pages to check for photos: {len(plan.photos)}")
+        print(f"Requests: {plan.requests}")
+        print(f"ETA: {eta / 60:.1f} min ({scraper.request_delay:.0f}s delay + "
+              f"{scraper.index_latency:.2f}s latency per request)")
+        print("=" * 50)
+        return
+
+    players = scraper.scrape_all(resume=not args.fresh, budget=budget)
 
     stats = scraper.get_stats()
     print("\n" + "=" * 50)
@@ -53,6 +87,34 @@ def cmd_scrape(args):
     print(f"Unique Pro Bowlers scraped: {stats['total_unique_players']}")
     print(f"Years scraped: {stats['years_scraped']}")
     print(f"Existing players skipped: {stats['existing_players_skipped']}")
+    print(f"Hall of Fame photos found: {stats['photos_found']}")
+    if stats["stop_reason"]:
+        print(f"Stopped early: {stats['stop_reason']} ({stats['work_remaining']} items left)")
+    fetch = stats["fetch"]
+    print(f"Requests: {fetch['requests']} ({fetch['retries']} retries, "
+          f"{fetch['wasted_retries']} wasted)")
+    print(f"Time spent waiting on retries: {fetch['sleep_seconds']}s")
+    print(f"Outcomes: {fetch['outcomes']}")
+    if fetch["circuit_trips"]:
+        print(f"Circuit breaker trips: {fetch['circuit_trips']}")
+    print("=" * 50)
+    print("\nRun 'python run_scraper.py merge' to add new players to the database.")
+
+
+def cmd_rebuild(args):
+    """Re-parse the page archive into scraped data without fetching anything."""
+    from rebuild import run_rebuild
+
+    stats = run_rebuild(find_project_root(), workers=args.workers)
+
+    print("\n" + "=" * 50)
+    print("Rebuild From Archive Complete!")
+    print("=" * 50)
+    print(f"Pages parsed: {stats['pages']} ({stats['year_pages']} year, "
+          f"{stats['player_pages']} player)")
+    print(f"Unique Pro Bowlers scraped: {stats['unique_players']}")
+    print(f"Hall of Fame photos found: {stats['photos_found']}")
+    print(f"Time: {stats['seconds']}s")
     print("=" * 50)
     print("\nRun 'python run_scraper.py merge' to add new players to the database.")
 
@@ -62,7 +124,7 @@ def cmd_merge(args):
     project_root = find_project_root()
     logging.info(f"Project root: {project_root}")
 
-    stats = run_merge(project_root)
+    stats = run_merge(project_root, compact=args.compact)
 
     print("\n" + "=" * 50)
     print("Merge Complete!")
@@ -81,19 +143,36 @@ def cmd_stats(args):
     """Show current stats without running anything."""
     project_root = find_project_root()
 
+    import player_db
+
+    mobile_path = project_root / MOBILE_JSON_PATH
+    summary = {"total": 0, "hall_of_fame": 0}
+    if mobile_path.exists():
+        summary = player_db.load(mobile_path, "summary")
+
     merger = PlayerMerger(project_root)
-    existing_count = merger.load_existing()
     scraped_count = merger.load_scraped()
 
     print("\n" + "=" * 50)
     print("Current Statistics")
     print("=" * 50)
-    print(f"Existing players in database: {existing_count}")
+    print(f"Existing players in database: {summary['total']}")
     print(f"Scraped Pro Bowlers (pending merge): {scraped_count}")
 
-    if merger.existing_players:
-        hof = sum(1 for p in merger.existing_players if p.get("hallOfFame", False))
-        print(f"Current Hall of Famers: {hof}")
+    if summary["total"]:
+        print(f"Current Hall of Famers: {summary['hall_of_fame']}")
+
+    index = facets.load_index(mobile_path) if mobile_path.exists() else None
+    if index is not None:
+        if index["source_sha1"] != player_db.fingerprint(mobile_path)[2]:
+            print("\nFacet index is stale; run export to rebuild it")
+        else:
+            print("\nTop positions:")
+            for pos, count in list(facets.counts(index, "position").items())[:5]:
+                print(f"  {pos}: {count}")
+            print("Top teams:")
+            for team, count in list(facets.counts(index, "team").items())[:5]:
+                print(f"  {team}: {count}")
 
     # Check for checkpoint
     checkpoint_path = project_root / "scripts/scrapers/nfl/checkpoint.json"
@@ -107,71 +186,280 @@ def cmd_stats(args):
     print("=" * 50)
 
 
-def cmd_validate(args):
-    """Validate the merged JSON file."""
+def cmd_export(args):
+    """Write compact binary variants and facet indexes of app-facing JSON files."""
     project_root = find_project_root()
 
     import json
-    from config import MOBILE_JSON_PATH, WEB_JSON_PATH
-
-    errors = []
-    warnings = []
+    import player_db
+    from compact import write_compact
 
-    for path_str in [MOBILE_JSON_PATH, WEB_JSON_PATH]:
-        path = project_root / path_str
-        print(f"\nValidating: {path}")
+    paths = [Path(p) for p in args.files] or [project_root / MOBILE_JSON_PATH]
+    merger = PlayerMerger(project_root)
+    merger.load_pro_bowl_years()
+    years_by_url = merger.pro_bowl_years
 
+    print("\n" + "=" * 50)
+    print("Compact Export")
+    print("=" * 50)
+    for path in paths:
         if not path.exists():
-            errors.append(f"File not found: {path}")
+            print(f"{path}: not found, skipped")
             continue
+        with open(path) as f:
+            players = json.load(f)
+        sizes = write_compact(path, players)
+        index = facets.build_index(players, years_by_url, player_db.fingerprint(path)[2])
+        sizes["facets.json"] = facets.write_index(path, index)
+        json_size = path.stat().st_size
+        print(f"{path.name}: json {json_size:,} bytes")
+        for variant, size in sizes.items():
+            print(f"  .{variant}: {size:,} bytes ({size / json_size:.1%})")
+    print("=" * 50)
 
-        try:
-            with open(path) as f:
-                players = json.load(f)
-        except json.JSONDecodeError as e:
-            errors.append(f"Invalid JSON in {path}: {e}")
-            continue
 
-        # Check structure
-        if not isinstance(players, list):
-            errors.append(f"{path}: Root should be an array")
-            continue
+def cmd_photos(args):
+    """Download headshots and generate local thumbnails."""
+    from photos import PhotoPipeline
+
+    # --base-url defaults to PFR itself; only rewrite image hosts when overridden
+    base_url = args.base_url if args.base_url != PFR_BASE_URL else None
+    pipeline = PhotoPipeline(
+        find_project_root(),
+        base_url=base_url,
+        size=args.size,
+        fmt=args.format,
+        workers=args.workers,
+        request_delay=args.delay,
+        refresh=args.refresh,
+        thumbnail_base_url=args.thumbnail_base_url,
+    )
+    stats = pipeline.run()
+
+    print("\n" + "=" * 50)
+    print("Headshot Thumbnails")
+    print("=" * 50)
+    print(f"Photo URLs: {stats['photos']}")
+    print(f"Downloaded: {stats['downloaded']} ({stats['unchanged']} unchanged, {stats['failed']} failed)")
+    print(f"Thumbnails rendered: {stats['thumbnails']} ({stats['thumbnails_skipped']} up to date)")
+    print(f"Records updated: {stats['records_updated']}")
+    print(f"Thumbnail URLs: {pipeline.thumbnail_base_url or '(site-relative, web only)'}{THUMBNAIL_URL_PREFIX}/")
+    print("=" * 50)
+
+
+def cmd_facets(args):
+    """Facet counts, or the players matching every given facet filter."""
+    project_root = find_project_root()
+
+    import player_db
+
+    mobile_path = project_root / MOBILE_JSON_PATH
+    index = facets.load_index(mobile_path) if mobile_path.exists() else None
+    if index is None:
+        print(f"No facet index for {mobile_path}; run merge or export first")
+        return
+
+    filters = {}
+    if args.team:
+        filters["team"] = args.team
+    if args.position:
+        filters["position"] = args.position
+    if args.hof:
+        filters["hall_of_fame"] = "true"
+    if args.pro_bowl:
+        filters["pro_bowl"] = "true"
+    if args.year:
+        filters["pro_bowl_year"] = str(args.year)
+    if args.decade:
+        filters["decade"] = f"{args.decade // 10 * 10}s"
+
+    print("\n" + "=" * 50)
+    if not filters:
+        print("Facet Counts")
+        print("=" * 50)
+        for facet in facets.FACETS:
+            top = list(facets.counts(index, facet).items())[:args.limit]
+            print(f"{facet}: " + ", ".join(f"{value} {count}" for value, count in top))
+    else:
+        ids = facets.select(index, **filters)
+        id_to_name = player_db.load(mobile_path, "id_to_name")
+        print(f"{len(ids)} players matching {filters}")
+        print("=" * 50)
+        for player_id in ids[:args.limit]:
+            print(f"  {id_to_name.get(str(player_id), '?')}")
+        if len(ids) > args.limit:
+            print(f"  ... and {len(ids) - args.limit} more")
+    print("=" * 50)
+
+
+def cmd_hof(args):
+    """Flag Hall of Famers from the PFR Hall of Fame index (one request)."""
+    from hof import sync_hall_of_fame
+    from fetch import FetchError
+
+    try:
+        stats = sync_hall_of_fame(find_project_root(), base_url=args.base_url)
+    except FetchError as e:
+        sys.exit(f"Could not fetch the Hall of Fame index: {e}")
+
+    print("\n" + "=" * 50)
+    print("Hall of Fame Sync")
+    print("=" * 50)
+    print(f"Inductees on PFR: {stats['inductees']} ({stats['requests']} request)")
+    print(f"In database: {stats['in_db']}")
+    print(f"Newly flagged: {stats['flagged']}")
+    if stats["not_listed"]:
+        print(f"Flagged in database but not on the index: {stats['not_listed']}")
+    print(f"Missing from database: {len(stats['missing'])}")
+    for inductee in stats["missing"][:args.limit]:
+        print(f"  {inductee['name']} ({inductee['year'] or '?'}): {inductee['url']}")
+    if len(stats["missing"]) > args.limit:
+        print(f"  ... and {len(stats['missing']) - args.limit} more")
+    print("=" * 50)
+
 
-        seen_ids = set()
-        seen_urls = set()
-        required_fields = ["id", "name", "sport", "team", "position", "number",
-                         "photoUrl", "sportsReferenceUrl", "stats", "hallOfFame"]
-
-        for i, player in enumerate(players):
-            # Check required fields
-            for field in required_fields:
-                if field not in player:
-                    errors.append(f"Player {i}: Missing field '{field}'")
-
-            # Check for duplicate IDs
-            pid = player.get("id")
-            if pid in seen_ids:
-                errors.append(f"Duplicate ID: {pid}")
-            seen_ids.add(pid)
-
-            # Check for duplicate URLs
-            url = player.get("sportsReferenceUrl")
-            if url and url in seen_urls:
-                warnings.append(f"Duplicate URL: {url}")
-            if url:
-                seen_urls.add(url)
-
-            # Check stats structure
-            stats = player.get("stats", {})
-            if not isinstance(stats, dict):
-                errors.append(f"Player {pid}: stats should be an object")
-
-        # Summary
-        hof_count = sum(1 for p in players if p.get("hallOfFame", False))
-        print(f"  Total players: {len(players)}")
-        print(f"  Hall of Famers: {hof_count}")
-        print(f"  Unique IDs: {len(seen_ids)}")
-        print(f"  Players with URLs: {len(seen_urls)}")
+def cmd_career_stats(args):
+    """Fill career stats in the player DB from full player pages."""
+    from career import fill_career_stats
+
+    stats = fill_career_stats(
+        find_project_root(),
+        base_url=args.base_url,
+        limit=args.limit,
+        refresh=args.refresh,
+        offline=args.offline,
+        request_delay=args.delay,
+    )
+
+    print("\n" + "=" * 50)
+    print("Career Stats")
+    print("=" * 50)
+    print(f"Players: {stats['players']} ({stats['seconds']}s)")
+    print(f"Pages from archive: {stats['archived']}")
+    print(f"Pages fetched: {stats['fetched']} ({stats['requests']} requests, {stats['failed']} failed)")
+    if stats["not_archived"]:
+        print(f"Not archived (skipped offline): {stats['not_archived']}")
+    print(f"Records updated: {stats['updated']}")
+    if stats["stopped"]:
+        print(f"Stopped early: {stats['stopped']}")
+    print("=" * 50)
+
+
+def cmd_renormalize(args):
+    """Re-apply position and team mappings to the whole player DB."""
+    from normalize import run_renormalize
+
+    stats = run_renormalize(find_project_root())
+
+    print("\n" + "=" * 50)
+    print("Renormalize")
+    print("=" * 50)
+    print(f"Players: {stats['records']} ({stats['ms']} ms)")
+    print(f"Raw strings backfilled: {stats['backfilled']}")
+    print(f"Without raw strings (left as is): {stats['skipped']}")
+    print(f"Positions changed: {stats['position_changed']}")
+    print(f"Teams changed: {stats['team_changed']}")
+    print("=" * 50)
+
+
+def cmd_link(args):
+    """Link athletes who appear in more than one sport's database."""
+    from linker import run_link
+
+    result = run_link(find_project_root(), min_score=args.min_score, verify=args.verify,
+                      base_url=args.base_url, request_delay=args.delay)
+
+    print("\n" + "=" * 50)
+    print("Cross-Sport Athlete Links")
+    print("=" * 50)
+    print("Players: " + ", ".join(f"{sport} {n}" for sport, n in result["players"].items()))
+    duplicates = {sport: n for sport, n in result["duplicates"].items() if n}
+    if duplicates:
+        print("Duplicate URLs skipped: " + ", ".join(f"{sport} {n}" for sport, n in duplicates.items()))
+    for pair, n in result["candidates"].items():
+        print(f"{pair}: {n} name matches, {result['linked'].get(pair, 0)} linked")
+    if args.verify:
+        print(f"Birth dates found: {result['birth_dates']}")
+        print(f"Verified: {result['verified']}, rejected (birth dates differ): {result['rejected']}")
+    print(f"Athletes in 2+ sports: {result['athletes']} ({result['seconds']}s)")
+    for row in result["rows"][:args.limit]:
+        sports = "/".join(sport for sport in result["players"] if sport in row)
+        print(f"  {row['name']} ({sports}, born {row.get('birthDate', '?')})")
+    if len(result["rows"]) > args.limit:
+        print(f"  ... and {len(result['rows']) - args.limit} more")
+    print(f"Unverified candidates: {len(result['candidate_rows'])}")
+    if not args.verify and result["candidate_rows"]:
+        print("  Run 'link --verify' to check their birth dates")
+    print(f"Written to {result['path']}")
+    print("=" * 50)
+
+
+def cmd_validate(args):
+    """Validate the merged JSON file."""
+    project_root = find_project_root()
+
+    import json
+    import player_db
+    from config import MOBILE_JSON_PATH, WEB_JSON_PATH
+    from transaction import db_lock
+
+    errors = []
+    warnings = []
+
+    # Writers are held off while both files are read, so they are checked as one version
+    with db_lock(project_root, shared=True):
+        for path_str in [MOBILE_JSON_PATH, WEB_JSON_PATH]:
+            path = project_root / path_str
+            print(f"\nValidating: {path}")
+
+            if not path.exists():
+                errors.append(f"File not found: {path}")
+                continue
+
+            try:
+                players = player_db.load(path, "records")
+            except json.JSONDecodeError as e:
+                if e.msg == "Expected a JSON array":
+                    errors.append(f"{path}: Root should be an array")
+                else:
+                    errors.append(f"Invalid JSON in {path}: {e}")
+                continue
+
+            seen_ids = set()
+            seen_urls = set()
+            required_fields = ["id", "name", "sport", "team", "position", "number",
+                             "photoUrl", "sportsReferenceUrl", "stats", "hallOfFame"]
+
+            for i, player in enumerate(players):
+                # Check required fields
+                for field in required_fields:
+                    if field not in player:
+                        errors.append(f"Player {i}: Missing field '{field}'")
+
+                # Check for duplicate IDs
+                pid = player.get("id")
+                if pid in seen_ids:
+                    errors.append(f"Duplicate ID: {pid}")
+                seen_ids.add(pid)
+
+                # Check for duplicate URLs
+                url = player.get("sportsReferenceUrl")
+                if url and url in seen_urls:
+                    warnings.append(f"Duplicate URL: {url}")
+                if url:
+                    seen_urls.add(url)
+
+                # Check stats structure
+                stats = player.get("stats", {})
+                if not isinstance(stats, dict):
+                    errors.append(f"Player {pid}: stats should be an object")
+
+            # Summary
+            hof_count = sum(1 for p in players if p.get("hallOfFame", False))
+            print(f"  Total players: {len(players)}")
+            print(f"  Hall of Famers: {hof_count}")
+            print(f"  Unique IDs: {len(seen_ids)}")
+            print(f"  Players with URLs: {len(seen_urls)}")
 
     print("\n" + "=" * 50)
     if errors:
@@ -194,6 +482,50 @@ def cmd_validate(args):
     return len(errors) == 0
 
 
+def cmd_all(args):
+    """Scrape, merge and validate in one process, parsing the player DB once."""
+    import player_db
+    from config import MOBILE_JSON_PATH
+
+    mobile_path = find_project_root() / MOBILE_JSON_PATH
+    if mobile_path.exists():
+        # One streaming pass serves both the scraper's URL set and the merge
+        player_db.load_many(mobile_path, ["urls", "hof_missing_photo", "records"])
+
+    cmd_scrape(args)
+    cmd_merge(args)
+    return cmd_validate(args)
+
+
+def cmd_daemon(args):
+    """Poll the current season with a warm session until interrupted."""
+    import signal
+    from daemon import ScraperDaemon
+
+    daemon = ScraperDaemon(
+        find_project_root(),
+        base_url=args.base_url,
+        season=args.season,
+        interval=args.interval,
+        port=args.port,
+        compact=args.compact,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+
+    status = daemon.get_status()
+    print("\n" + "=" * 50)
+    print("Daemon Stopped")
+    print("=" * 50)
+    print(f"Polls: {status['polls']} ({status['not_modified']} not modified)")
+    print(f"Updates: {status['updates']} ({status['players_added']} players added)")
+    print(f"Requests: {status['fetch']['requests']}")
+    print("=" * 50)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="NFL Pro Bowl Player Scraper for StatCheck",
@@ -202,14 +534,38 @@ def main():
 Examples:
   python run_scraper.py scrape          # Start/resume scraping Pro Bowl rosters
   python run_scraper.py scrape --fresh  # Start fresh, ignore checkpoint
+  python run_scraper.py scrape --budget 20m  # Most valuable work first, stop at 20 min
+  python run_scraper.py scrape --plan   # Show request count and ETA without scraping
+  python run_scraper.py rebuild         # Re-run parsers over archived pages (offline)
   python run_scraper.py merge           # Merge scraped data with existing
+  python run_scraper.py merge --compact # Also write compact binary variants
+  python run_scraper.py export FILE...  # Write compact variants of any player JSON
   python run_scraper.py stats           # Show current statistics
+  python run_scraper.py photos          # Download headshots, write thumbnailUrl
+  python run_scraper.py photos --thumbnail-base-url https://cdn.example.com  # Absolute thumbnailUrl for mobile
+  python run_scraper.py facets --team KC --position TE --pro-bowl  # Indexed lookup
+  python run_scraper.py hof             # Flag Hall of Famers from the PFR HOF index
+  python run_scraper.py career-stats    # Fill career stats from full player pages
+  python run_scraper.py renormalize     # Re-apply position/team mappings, no re-scrape
+  python run_scraper.py link            # Name matches across NFL/MLB/NBA, as candidates
+  python run_scraper.py link --verify   # Link only matches whose birth dates agree
   python run_scraper.py validate        # Validate JSON files
+  python run_scraper.py all             # Scrape, merge and validate in one run
+  python run_scraper.py daemon          # Watch the current season; status on :8787/health
+  python run_scraper.py --profile merge # Write per-stage profiles to ./profile
 
-Estimated time: ~4 minutes (75 years × 3s delay)
+Years come from the PFR Pro Bowl index; see 'scrape --plan' for the request count and ETA.
         """
     )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
+    parser.add_argument("--base-url", default=PFR_BASE_URL,
+                        help="Site to fetch from (e.g. a local replay server)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile CPU and memory per pipeline stage")
+    parser.add_argument("--profile-dir", type=Path, default=Path("profile"),
+                        help="Where to write .pstats files and summary.txt (default: ./profile)")
+    parser.add_argument("--profile-top", type=int, default=15,
+                        help="Hot functions / allocation sites to list per stage")
 
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
@@ -217,20 +573,119 @@ Estimated time: ~4 minutes (75 years × 3s delay)
     scrape_parser = subparsers.add_parser("scrape", help="Scrape Pro Bowl players from PFR")
     scrape_parser.add_argument("--fresh", action="store_true",
                                help="Start fresh, ignore checkpoint")
+    scrape_parser.add_argument("--budget",
+                               help="Stop cleanly after this much time (30m, 2h) or requests (500req)")
+    scrape_parser.add_argument("--plan", action="store_true",
+                               help="Print the pages a run would fetch and its ETA, then exit")
     scrape_parser.set_defaults(func=cmd_scrape)
 
+    # Rebuild command
+    rebuild_parser = subparsers.add_parser("rebuild", help="Re-parse archived pages, no network")
+    rebuild_parser.add_argument("--workers", type=int, help="Parser processes (default: CPU count)")
+    rebuild_parser.set_defaults(func=cmd_rebuild)
+
     # Merge command
     merge_parser = subparsers.add_parser("merge", help="Merge scraped data with existing")
+    merge_parser.add_argument("--compact", action="store_true",
+                              help="Also write compact binary + precompressed variants")
     merge_parser.set_defaults(func=cmd_merge)
 
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Write compact binary variants of player JSON")
+    export_parser.add_argument("files", nargs="*",
+                               help="Player JSON files (default: mobile NFL database)")
+    export_parser.set_defaults(func=cmd_export)
+
     # Stats command
     stats_parser = subparsers.add_parser("stats", help="Show current statistics")
     stats_parser.set_defaults(func=cmd_stats)
 
+    # Photos command
+    photos_parser = subparsers.add_parser("photos", help="Download headshots and build thumbnails")
+    photos_parser.add_argument("--size", type=int, default=THUMBNAIL_SIZE,
+                               help=f"Thumbnail edge in pixels (default: {THUMBNAIL_SIZE})")
+    photos_parser.add_argument("--format", choices=["webp", "jpeg"], default=THUMBNAIL_FORMAT)
+    photos_parser.add_argument("--thumbnail-base-url", default=THUMBNAIL_BASE_URL,
+                               help="Absolute host/CDN URL serving the thumbnails, so the mobile "
+                                    "app can load them (default: THUMBNAIL_BASE_URL in config.py)")
+    photos_parser.add_argument("--workers", type=int, help="Resize processes (default: CPU count)")
+    photos_parser.add_argument("--delay", type=float, default=REQUEST_DELAY_SECONDS,
+                               help="Seconds between image downloads")
+    photos_parser.add_argument("--refresh", action="store_true",
+                               help="Re-check images already downloaded")
+    photos_parser.set_defaults(func=cmd_photos)
+
+    # Facets command
+    facets_parser = subparsers.add_parser("facets", help="Query the team/position/era facet index")
+    facets_parser.add_argument("--team", help="Team as stored in the player DB (e.g. KC)")
+    facets_parser.add_argument("--position", help="Position (PFR abbreviations are normalized)")
+    facets_parser.add_argument("--hof", action="store_true", help="Hall of Famers only")
+    facets_parser.add_argument("--pro-bowl", action="store_true", help="Known Pro Bowlers only")
+    facets_parser.add_argument("--year", type=int, help="Pro Bowl year")
+    facets_parser.add_argument("--decade", type=int, help="Pro Bowl decade (e.g. 1990)")
+    facets_parser.add_argument("--limit", type=int, default=20, help="Rows to print")
+    facets_parser.set_defaults(func=cmd_facets)
+
+    # Hall of Fame command
+    hof_parser = subparsers.add_parser("hof", help="Flag Hall of Famers from the PFR HOF index page")
+    hof_parser.add_argument("--limit", type=int, default=20, help="Missing inductees to print")
+    hof_parser.set_defaults(func=cmd_hof)
+
+    # Career stats command
+    career_parser = subparsers.add_parser(
+        "career-stats", help="Fill career passing/rushing/TD stats from full player pages")
+    career_parser.add_argument("--limit", type=int, help="Process at most N players")
+    career_parser.add_argument("--refresh", action="store_true",
+                               help="Recompute every player, not just those with zeroed stats")
+    career_parser.add_argument("--offline", action="store_true",
+                               help="Use archived pages only; never fetch")
+    career_parser.add_argument("--delay", type=float, default=REQUEST_DELAY_SECONDS,
+                               help="Seconds between page fetches")
+    career_parser.set_defaults(func=cmd_career_stats)
+
+    # Renormalize command
+    renormalize_parser = subparsers.add_parser(
+        "renormalize", help="Re-apply position/team mappings to the player DB from raw strings")
+    renormalize_parser.set_defaults(func=cmd_renormalize)
+
+    # Link command
+    link_parser = subparsers.add_parser("link", help="Link athletes across NFL, MLB and NBA databases")
+    link_parser.add_argument("--min-score", type=float, default=LINK_MIN_SCORE,
+                             help=f"Lowest match score to link (default: {LINK_MIN_SCORE})")
+    link_parser.add_argument("--limit", type=int, default=20, help="Rows to print")
+    link_parser.add_argument("--verify", action="store_true",
+                             help="Read candidates' birth dates from their player pages "
+                                  "(archived or fetched); only matching ones are linked")
+    link_parser.add_argument("--delay", type=float, default=REQUEST_DELAY_SECONDS,
+                             help="Seconds between page fetches when verifying")
+    link_parser.set_defaults(func=cmd_link)
+
     # Validate command
     validate_parser = subparsers.add_parser("validate", help="Validate JSON files")
     validate_parser.set_defaults(func=cmd_validate)
 
+    # All command
+    all_parser = subparsers.add_parser("all", help="Scrape, merge and validate in one run")
+    all_parser.add_argument("--fresh", action="store_true",
+                            help="Start fresh, ignore checkpoint")
+    all_parser.add_argument("--budget",
+                            help="Stop scraping after this much time (30m, 2h) or requests (500req)")
+    all_parser.add_argument("--compact", action="store_true",
+                            help="Also write compact binary + precompressed variants")
+    all_parser.set_defaults(func=cmd_all)
+
+    # Daemon command
+    daemon_parser = subparsers.add_parser("daemon", help="Poll the current season and apply updates")
+    daemon_parser.add_argument("--season", type=int,
+                               help="Pro Bowl year to watch (default: latest on the Pro Bowl index)")
+    daemon_parser.add_argument("--interval", type=float, default=DAEMON_POLL_INTERVAL_SECONDS,
+                               help="Seconds between polls")
+    daemon_parser.add_argument("--port", type=int, default=DAEMON_HEALTH_PORT,
+                               help="Localhost port for the /health status endpoint")
+    daemon_parser.add_argument("--compact", action="store_true",
+                               help="Also write compact binary + precompressed variants")
+    daemon_parser.set_defaults(func=cmd_daemon)
+
     args = parser.parse_args()
 
     if not args.command:
@@ -238,7 +693,14 @@ Estimated time: ~4 minutes (75 years × 3s delay)
         return
 
     setup_logging(args.verbose)
-    args.func(args)
+    if args.profile:
+        profiling.enable()
+    try:
+        args.func(args)
+    finally:
+        summary = profiling.finish(args.profile_dir, args.profile_top)
+        if summary:
+            print("\n" + summary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+"""Priority-ordered work scheduling under a wall-clock or request budget."""
+
+import heapq
+import logging
+import re
+import time
+from typing import Any, Callable, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+PRIORITY_RECENT_SEASONS = 0
+PRIORITY_HOF_PHOTOS = 1
+PRIORITY_OLDER_SEASONS = 2
+
+_BUDGET_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(s|m|h|req|r)?\s*$", re.IGNORECASE)
+_SECONDS_PER_UNIT = {"s": 1, "m": 60, "h": 3600}
+
+
+class Budget:
+    """
+    Wall-clock and/or request limit for a run.
+
+    Before each work item the scheduler asks whether the *average* cost of an
+    item still fits, so a run stops before the deadline rather than after it.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, requests: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self.requests = requests
+        self.clock = clock
+        self.started_at: Optional[float] = None
+
+    def start(self):
+        self.started_at = self.clock()
+
+    @property
+    def elapsed(self) -> float:
+        return self.clock() - self.started_at if self.started_at is not None else 0.0
+
+    def allows(self, requests_used: int, avg_seconds: float, avg_requests: float) -> Optional[str]:
+        """None if another item fits, otherwise the reason the budget is spent."""
+        if self.seconds is not None and self.elapsed + avg_seconds > self.seconds:
+            return f"time budget of {self.seconds:.0f}s reached"
+        if self.requests is not None and requests_used + max(avg_requests, 1) > self.requests:
+            return f"request budget of {self.requests} reached"
+        return None
+
+    def __str__(self) -> str:
+        parts = []
+        if self.seconds is not None:
+            parts.append(f"{self.seconds:.0f}s")
+        if self.requests is not None:
+            parts.append(f"{self.requests} requests")
+        return " / ".join(parts) or "unlimited"
+
+
+def parse_budget(value: str) -> Budget:
+    """
+    Parse a CLI budget: ``90s``, ``30m``, ``2h`` (wall clock) or ``500req``
+    (requests). A bare number means seconds.
+    """
+    match = _BUDGET_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid budget {value!r}; use e.g. 30m, 2h, 900s or 500req")
+    amount, unit = float(match.group(1)), (match.group(2) or "s").lower()
+    if unit in ("req", "r"):
+        return Budget(requests=int(amount))
+    return Budget(seconds=amount * _SECONDS_PER_UNIT[unit])
+
+
+class PriorityScheduler:
+    """Runs queued work items in priority order until done or out of budget."""
+
+    def __init__(self, budget: Optional[Budget] = None,
+                 request_count: Callable[[], int] = lambda: 0):
+        self.budget = budget
+        self.request_count = request_count
+        self._queue: List[tuple] = []
+        self._seq = 0
+
+    def add(self, priority: Any, key: Hashable, fn: Callable[[], Any]):
+        """Queue ``fn``; lower ``priority`` runs first, ties in insertion order."""
+        heapq.heappush(self._queue, (priority, self._seq, key, fn))
+        self._seq += 1
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def run(self, on_complete: Callable[[Hashable], None] = None) -> dict:
+        """
+        Run items until the queue is empty or the budget is spent. Exceptions
+        from an item propagate with that item left at the head of the queue.
+        """
+        if self.budget is not None:
+            self.budget.start()
+        completed = 0
+        stop_reason = None
+        total_seconds = 0.0
+        total_requests = 0
+
+        while self._queue:
+            if self.budget is not None:
+                avg_seconds = total_seconds / completed if completed else 0.0
+                avg_requests = total_requests / completed if completed else 1.0
+                stop_reason = self.budget.allows(self.request_count(), avg_seconds, avg_requests)
+                if stop_reason:
+                    break
+
+            priority, _, key, fn = self._queue[0]
+            start = time.monotonic()
+            requests_before = self.request_count()
+            fn()
+            heapq.heappop(self._queue)
+            total_seconds += time.monotonic() - start
+            total_requests += self.request_count() - requests_before
+            completed += 1
+            if on_complete:
+                on_complete(key)
+
+        if stop_reason:
+            logger.info(f"Stopping: {stop_reason} ({len(self._queue)} items left)")
+        return {
+            "completed": completed,
+            "remaining": len(self._queue),
+            "stop_reason": stop_reason,
+        }
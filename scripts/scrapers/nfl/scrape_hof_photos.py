@@ -1,6 +1,6 @@
 """Scrape photo URLs for Hall of Fame players missing photos."""
 
-import json
+import argparse
 import time
 import socket
 import logging
@@ -9,10 +9,14 @@ from pathlib import Path
 
 import cloudscraper
 import urllib3.util.connection as urllib3_connection
-from bs4 import BeautifulSoup
 from tqdm import tqdm
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-import requests
+
+import player_db
+import profiling
+from config import PFR_BASE_URL
+from fetch import FetchPolicy, FetchError, PermanentError, ThrottledError, CircuitOpenError, read_until
+from parser import meta_span, parse_player_meta
+from transaction import patch_players
 
 # Force IPv4 to avoid network issues in WSL
 urllib3_connection.allowed_gai_family = lambda: socket.AF_INET
@@ -27,58 +31,34 @@ logger = logging.getLogger(__name__)
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 MOBILE_JSON = PROJECT_ROOT / "apps/mobile/data/nfl_players.json"
-WEB_JSON = PROJECT_ROOT / "apps/web/src/data/nfl_players.json"
 
 # Rate limiting - more conservative
 REQUEST_DELAY = 3.5  # seconds between requests (increased)
 REQUEST_DELAY_JITTER = 1.0  # random jitter
 
 
-def extract_photo_url(html: str) -> str | None:
-    """Extract photo URL from PFR player page."""
-    soup = BeautifulSoup(html, 'html.parser')
-    meta = soup.find('div', id='meta')
-    if not meta:
-        return None
-
-    media_item = meta.find('div', class_='media-item')
-    if not media_item:
-        return None
-
-    img = media_item.find('img')
-    if img:
-        return img.get('src')
-    return None
+def extract_photo_url(html: str | bytes) -> str | None:
+    """Extract photo URL from a PFR player page, or any prefix of one that includes #meta."""
+    return parse_player_meta(html)["photo_url"] or None
 
 
-class RateLimitError(Exception):
-    """Raised when rate limited."""
-    pass
-
-
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=10, min=30, max=120),
-    retry=retry_if_exception_type(RateLimitError)
-)
-def fetch_with_retry(session, url):
-    """Fetch URL with retry on rate limit."""
-    response = session.get(url, timeout=30)
-    if response.status_code == 429:
-        raise RateLimitError("Rate limited")
-    response.raise_for_status()
-    return response
+def scrape_hof_photos(base_url: str = PFR_BASE_URL, request_delay: float = REQUEST_DELAY):
+    """
+    Scrape photos for HOF players missing them.
 
-
-def scrape_hof_photos():
-    """Scrape photos for HOF players missing them."""
+    Args:
+        base_url: Site to fetch player pages from; player URLs in the database
+            are rewritten onto it, so a replay server can stand in for PFR
+        request_delay: Base seconds to sleep between requests (jitter is added)
+    """
+    base_url = base_url.rstrip("/")
     # Load players
-    with open(MOBILE_JSON, 'r') as f:
-        players = json.load(f)
+    with profiling.stage("load_existing", memory=True):
+        players = player_db.load(MOBILE_JSON, "records")
 
     # Find HOF players without photos
     hof_no_photo = [
-        (i, p) for i, p in enumerate(players)
+        p for p in players
         if p.get('hallOfFame') == True and not p.get('photoUrl')
     ]
 
@@ -86,58 +66,85 @@ def scrape_hof_photos():
 
     # Create session
     session = cloudscraper.create_scraper()
+    fetcher = FetchPolicy(session)
 
-    # Track results
+    # Track results; photos are patched into the DB on disk at the end
+    patches = {}
     found = 0
     not_found = 0
     errors = 0
 
     # Scrape each player
-    for idx, player in tqdm(hof_no_photo, desc="Scraping HOF photos"):
+    for player in tqdm(hof_no_photo, desc="Scraping HOF photos"):
         url = player.get('sportsReferenceUrl')
         if not url:
             not_found += 1
             continue
 
         try:
-            response = fetch_with_retry(session, url)
+            with profiling.stage("fetch"):
+                # The photo is in #meta near the top; stop reading once it has closed
+                response = fetcher.get(url.replace(PFR_BASE_URL, base_url, 1), stream=True)
+                html, _ = read_until(response, lambda data: meta_span(data) is not None)
 
-            photo_url = extract_photo_url(response.text)
+            with profiling.stage("parse"):
+                photo_url = extract_photo_url(html)
 
             if photo_url:
-                # Update player in list
-                players[idx]['photoUrl'] = photo_url
+                patches[url] = {'photoUrl': photo_url}
                 found += 1
                 logger.debug(f"Found photo for {player['name']}: {photo_url}")
             else:
                 not_found += 1
                 logger.debug(f"No photo available for {player['name']}")
 
-        except RateLimitError:
+        except PermanentError:
+            not_found += 1
+            logger.debug(f"No page for {player['name']}")
+        except ThrottledError:
             errors += 1
             logger.warning(f"Rate limited for {player['name']} after retries")
-        except Exception as e:
+        except CircuitOpenError as e:
+            errors += 1
+            logger.error(f"Stopping: {e}; rerun later to pick up remaining players")
+            break
+        except FetchError as e:
             errors += 1
             logger.warning(f"Error fetching {player['name']}: {e}")
+        except Exception:
+            # Not a fetch problem (a parser bug, say); log it with the traceback
+            errors += 1
+            logger.exception(f"Error processing {player['name']}")
 
         # Rate limiting with jitter
-        delay = REQUEST_DELAY + random.uniform(0, REQUEST_DELAY_JITTER)
+        delay = request_delay + random.uniform(0, REQUEST_DELAY_JITTER) if request_delay else 0
         time.sleep(delay)
 
     logger.info(f"Results: {found} found, {not_found} not available, {errors} errors")
+    logger.info(f"Fetch stats: {fetcher.get_stats()}")
 
-    # Save to mobile JSON
-    with open(MOBILE_JSON, 'w') as f:
-        json.dump(players, f, indent=2)
-    logger.info(f"Saved to {MOBILE_JSON}")
-
-    # Save to web JSON
-    with open(WEB_JSON, 'w') as f:
-        json.dump(players, f, indent=2)
-    logger.info(f"Saved to {WEB_JSON}")
+    with profiling.stage("save_merged", memory=True):
+        # Other commands may have saved the DB during the scrape; patch the
+        # latest version rather than overwriting it with our stale copy
+        patch_players(PROJECT_ROOT, patches)
 
     return found, not_found, errors
 
 
 if __name__ == "__main__":
-    scrape_hof_photos()
+    arg_parser = argparse.ArgumentParser(description="Scrape photos for HOF players missing them")
+    arg_parser.add_argument("--base-url", default=PFR_BASE_URL,
+                            help="Site to fetch from (e.g. a local replay server)")
+    arg_parser.add_argument("--delay", type=float, default=REQUEST_DELAY,
+                            help="Seconds between requests")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="Profile CPU and memory per stage into ./profile")
+    cli_args = arg_parser.parse_args()
+    if cli_args.profile:
+        profiling.enable()
+    try:
+        scrape_hof_photos(base_url=cli_args.base_url, request_delay=cli_args.delay)
+    finally:
+        summary = profiling.finish(Path("profile"))
+        if summary:
+            print("\n" + summary)
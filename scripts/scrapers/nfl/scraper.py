@@ -1,15 +1,16 @@
 """Pro Bowl player scraper with rate limiting."""
 
 import json
+import os
 import time
 import socket
 import logging
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Set, Dict
+from typing import List, Set, Dict, Optional
 
 import cloudscraper
 import urllib3.util.connection as urllib3_connection
-from tenacity import retry, stop_after_attempt, wait_exponential
 from tqdm import tqdm
 
 # Force IPv4 to avoid network issues in WSL
@@ -21,13 +22,28 @@ from config import (
     PROBOWL_START_YEAR,
     PROBOWL_END_YEAR,
     REQUEST_DELAY_SECONDS,
-    MAX_RETRIES,
-    CHECKPOINT_EVERY,
+    RECENT_SEASONS,
     CHECKPOINT_PATH,
     SCRAPED_DATA_PATH,
+    SCRAPED_PHOTOS_PATH,
+    PRO_BOWL_YEARS_PATH,
+    RAW_FIELDS_PATH,
+    PAGE_ARCHIVE_PATH,
     MOBILE_JSON_PATH,
 )
-from parser import parse_probowl_year_page
+import player_db
+from archive import PageArchive
+from fetch import FetchError, FetchPolicy, PermanentError, CircuitOpenError, read_until
+from normalize import load_raw_fields, remember_raw
+from parser import parse_probowl_index_page, parse_probowl_year_page, parse_player_meta, meta_span
+from profiling import profiled, stage
+from scheduler import (
+    Budget,
+    PriorityScheduler,
+    PRIORITY_RECENT_SEASONS,
+    PRIORITY_HOF_PHOTOS,
+    PRIORITY_OLDER_SEASONS,
+)
 
 # Setup logging
 logging.basicConfig(
@@ -37,37 +53,88 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class FetchPlan:
+    """The pages a run will request, worked out before any of them are fetched."""
+    available_years: List[int]  # years with a Pro Bowl page
+    source: str  # "index" if read from the Pro Bowl index, else "config"
+    years: List[int] = field(default_factory=list)  # season pages to fetch
+    photos: List[str] = field(default_factory=list)  # player pages to check for a photo
+    skipped_years: int = 0  # already scraped and no longer changing
+
+    @property
+    def requests(self) -> int:
+        return len(self.years) + len(self.photos)
+
+    def eta_seconds(self, request_delay: float, latency: float) -> float:
+        """Expected wall time if every request succeeds first time."""
+        return self.requests * (request_delay + latency)
+
+
 class ProBowlScraper:
     """Scraper for Pro Football Reference Pro Bowl data."""
 
-    def __init__(self, project_root: Path):
+    def __init__(
+        self,
+        project_root: Path,
+        base_url: str = PFR_BASE_URL,
+        request_delay: float = REQUEST_DELAY_SECONDS,
+    ):
+        """
+        Args:
+            project_root: Repository root used to resolve data paths
+            base_url: Site to fetch from; point at a replay server for offline runs
+            request_delay: Seconds to sleep between year pages
+        """
         self.project_root = project_root
+        self.base_url = base_url.rstrip("/")
+        self.request_delay = request_delay
         self.session = cloudscraper.create_scraper()
+        self.fetcher = FetchPolicy(self.session)
+        self.archive = PageArchive(project_root / PAGE_ARCHIVE_PATH)
         self.scraped_players: Dict[str, dict] = {}  # url -> player data
         self.current_year = PROBOWL_START_YEAR
         self.existing_urls: Set[str] = set()
-
-    @retry(
-        stop=stop_after_attempt(MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=4, max=60)
-    )
+        self.completed_years: Set[int] = set()
+        self.scraped_photos: Dict[str, str] = {}  # url -> photo URL
+        self.photos_checked: Set[str] = set()
+        self.pro_bowl_years: Dict[str, List[int]] = {}  # url -> Pro Bowl years seen
+        self.raw_fields: Dict[str, dict] = {}  # url -> raw roster strings, earliest season seen
+        self.available_years: List[int] = list(range(PROBOWL_START_YEAR, PROBOWL_END_YEAR + 1))
+        self.index_latency = 0.0
+        self.total_new = 0
+        self.run_result: dict = {}
+
+    @profiled("fetch")
     def fetch_page(self, url: str) -> str:
-        """Fetch a page with retry logic."""
+        """Fetch a page, retrying only failures that can succeed on retry."""
         logger.debug(f"Fetching: {url}")
-        response = self.session.get(url, timeout=30)
-        response.raise_for_status()
+        response = self.fetcher.get(url)
+        with stage("archive"):
+            # Archived under the real PFR URL even when fetched from a replay server
+            self.archive.append(url.replace(self.base_url, PFR_BASE_URL, 1), response.content,
+                                response.status_code, response.encoding)
         return response.text
 
+    def fetch_player_meta(self, url: str) -> dict:
+        """
+        Fetch a player page only as far as the end of its ``#meta`` block and
+        parse that. The stats tables after it are never downloaded.
+        """
+        logger.debug(f"Fetching meta: {url}")
+        response = self.fetcher.get(url, stream=True)
+        body, partial = read_until(response, lambda data: meta_span(data) is not None)
+        with stage("archive"):
+            self.archive.append(url.replace(self.base_url, PFR_BASE_URL, 1), body,
+                                response.status_code, response.encoding, complete=not partial)
+        with stage("parse"):
+            return parse_player_meta(body)
+
     def load_existing_players(self):
         """Load existing player database to get URLs for deduplication."""
         path = self.project_root / MOBILE_JSON_PATH
         if path.exists():
-            with open(path, "r") as f:
-                players = json.load(f)
-            for player in players:
-                url = player.get("sportsReferenceUrl", "")
-                if url:
-                    self.existing_urls.add(url)
+            self.existing_urls = set(player_db.load(path, "urls"))
             logger.info(f"Loaded {len(self.existing_urls)} existing player URLs for deduplication")
 
     def load_checkpoint(self) -> bool:
@@ -78,6 +145,12 @@ class ProBowlScraper:
                 with open(checkpoint_path, "r") as f:
                     checkpoint = json.load(f)
                 self.current_year = checkpoint.get("current_year", PROBOWL_START_YEAR)
+                if "completed_years" in checkpoint:
+                    self.completed_years = set(checkpoint["completed_years"])
+                else:
+                    # Older checkpoints only recorded an ascending cursor
+                    self.completed_years = set(range(PROBOWL_START_YEAR, self.current_year))
+                self.photos_checked = set(checkpoint.get("photos_checked", []))
 
                 # Load existing scraped data
                 scraped_path = self.project_root / SCRAPED_DATA_PATH
@@ -87,69 +160,93 @@ class ProBowlScraper:
                         self.scraped_players = {p["url"]: p for p in data}
                     logger.info(f"Loaded {len(self.scraped_players)} previously scraped players")
 
-                logger.info(f"Loaded checkpoint: year {self.current_year}")
+                photos_path = self.project_root / SCRAPED_PHOTOS_PATH
+                if photos_path.exists():
+                    with open(photos_path, "r") as f:
+                        self.scraped_photos = json.load(f)
+
+                years_path = self.project_root / PRO_BOWL_YEARS_PATH
+                if years_path.exists():
+                    with open(years_path, "r") as f:
+                        self.pro_bowl_years = json.load(f)
+                self.raw_fields = load_raw_fields(self.project_root)
+
+                logger.info(f"Loaded checkpoint: {len(self.completed_years)} years done, "
+                            f"next year {self.current_year}")
                 return True
             except Exception as e:
                 logger.warning(f"Failed to load checkpoint: {e}")
         return False
 
+    @profiled("serialize")
     def save_checkpoint(self):
-        """Save current progress."""
-        checkpoint_path = self.project_root / CHECKPOINT_PATH
-        checkpoint = {
+        """Save current progress. Each file is replaced atomically."""
+        pending = [y for y in self.available_years if y not in self.completed_years]
+        self.current_year = min(pending, default=max(self.available_years) + 1)
+
+        # Data files first, so the checkpoint never points past saved data
+        write_json_atomic(self.project_root / SCRAPED_DATA_PATH,
+                          list(self.scraped_players.values()), indent=2)
+        write_json_atomic(self.project_root / SCRAPED_PHOTOS_PATH, self.scraped_photos, indent=2)
+        write_json_atomic(self.project_root / PRO_BOWL_YEARS_PATH, self.pro_bowl_years)
+        write_json_atomic(self.project_root / RAW_FIELDS_PATH, self.raw_fields)
+        write_json_atomic(self.project_root / CHECKPOINT_PATH, {
             "current_year": self.current_year,
-        }
-        with open(checkpoint_path, "w") as f:
-            json.dump(checkpoint, f)
-
-        # Save scraped players
-        scraped_path = self.project_root / SCRAPED_DATA_PATH
-        with open(scraped_path, "w") as f:
-            json.dump(list(self.scraped_players.values()), f, indent=2)
+            "completed_years": sorted(self.completed_years),
+            "photos_checked": sorted(self.photos_checked),
+        })
 
         logger.info(f"Checkpoint saved: {len(self.scraped_players)} unique players")
 
-    def scrape_year(self, year: int) -> List[dict]:
-        """Scrape Pro Bowl roster for a specific year."""
-        url = f"{PFR_BASE_URL}/years/{year}/probowl.htm"
+    def scrape_year(self, year: int) -> Optional[List[dict]]:
+        """
+        Scrape Pro Bowl roster for a specific year. Returns [] when the year has
+        no page, or None when the fetch failed and the year should be retried.
+        """
+        url = f"{self.base_url}/years/{year}/probowl.htm"
         logger.info(f"Scraping Pro Bowl {year}")
 
         try:
             html = self.fetch_page(url)
-            players = parse_probowl_year_page(html, year)
+            with stage("parse"):
+                players = parse_probowl_year_page(html, year)
             logger.info(f"Found {len(players)} players in {year} Pro Bowl")
             return players
+        except PermanentError:
+            logger.warning(f"No Pro Bowl data for {year}")
+            return []
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            error_str = str(e)
-            if "404" in error_str or "Not Found" in error_str:
-                logger.warning(f"No Pro Bowl data for {year}")
-                return []
             logger.error(f"Error scraping year {year}: {e}")
-            return []
+            return None
 
-    def scrape_all(self, resume: bool = True) -> List[dict]:
-        """
-        Scrape all Pro Bowl rosters.
+    def process_year(self, year: int):
+        """Scrape one year and record its new players."""
+        players = self.scrape_year(year)
+        if players is None:
+            time.sleep(self.request_delay)
+            return
 
-        Args:
-            resume: If True, resume from checkpoint if available
-        """
-        # Load existing players for deduplication
-        self.load_existing_players()
+        self.record_year(year, players)
 
-        if resume:
-            self.load_checkpoint()
-
-        years = list(range(self.current_year, PROBOWL_END_YEAR + 1))
-        total_new = 0
-
-        # Progress bar for years
-        for year in tqdm(years, desc="Pro Bowl Years"):
-            players = self.scrape_year(year)
+        # Rate limiting between requests
+        time.sleep(self.request_delay)
 
+    def record_year(self, year: int, players: List[dict]):
+        """Record one year's roster: Pro Bowl years for everyone, and new players."""
+        with stage("dedup"):
             for player_info in players:
                 url = player_info["url"]
 
+                # Recorded for every roster entry; feeds the year/decade facets
+                years = self.pro_bowl_years.setdefault(url, [])
+                if year not in years:
+                    years.append(year)
+                    years.sort()
+                # Also for every entry, so renormalize can backfill records in the DB
+                remember_raw(self.raw_fields, url, player_info.get("raw"))
+
                 # Skip if already in existing database
                 if url in self.existing_urls:
                     continue
@@ -166,23 +263,124 @@ class ProBowlScraper:
                     "position": player_info.get("position", ""),
                     "team": player_info.get("team", ""),
                     "pro_bowl": True,
+                    "raw": player_info.get("raw"),
                 }
-                total_new += 1
+                self.total_new += 1
 
-            # Update year for checkpoint
-            self.current_year = year + 1
+        self.completed_years.add(year)
 
-            # Rate limiting between years
-            time.sleep(REQUEST_DELAY_SECONDS)
+    def process_photo(self, url: str):
+        """Look up the headshot for a Hall of Famer missing one."""
+        try:
+            photo_url = self.fetch_player_meta(url.replace(PFR_BASE_URL, self.base_url, 1))["photo_url"]
+            if photo_url:
+                self.scraped_photos[url] = photo_url
+            self.photos_checked.add(url)
+        except PermanentError:
+            self.photos_checked.add(url)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.warning(f"Error fetching photo page {url}: {e}")
 
-            # Save checkpoint after each year
-            if year % 5 == 0:
-                self.save_checkpoint()
+        time.sleep(self.request_delay)
+
+    def discover_years(self) -> str:
+        """
+        Read the years that have a Pro Bowl page from the index. Falls back to
+        the configured range if the index can't be fetched or parsed. Returns
+        where the years came from: "index" or "config".
+        """
+        start = time.monotonic()
+        try:
+            years = parse_probowl_index_page(self.fetch_page(
+                PFR_PROBOWL_INDEX.replace(PFR_BASE_URL, self.base_url, 1)))
+        except CircuitOpenError:
+            raise
+        except FetchError as e:
+            logger.warning(f"Pro Bowl index unavailable ({e}); using configured years")
+            return "config"
+        self.index_latency = time.monotonic() - start
+        if not years:
+            logger.warning("No years found on the Pro Bowl index; using configured years")
+            return "config"
+        self.available_years = years
+        logger.info(f"Pro Bowl index lists {len(years)} years ({years[0]}-{years[-1]})")
+        return "index"
+
+    def plan(self, resume: bool = True) -> FetchPlan:
+        """
+        Work out exactly which pages this run needs: the years on the index
+        minus those already scraped, plus Hall of Famer pages not yet checked
+        for a photo. The latest season is always refetched, since its roster
+        can still change; earlier completed seasons are final.
+        """
+        self.load_existing_players()
+        if resume:
+            self.load_checkpoint()
+        source = self.discover_years()
 
-        # Final save
-        self.save_checkpoint()
+        latest = self.available_years[-1]
+        plan = FetchPlan(available_years=self.available_years, source=source)
+        for year in reversed(self.available_years):
+            if year in self.completed_years and year != latest:
+                plan.skipped_years += 1
+            else:
+                plan.years.append(year)
 
-        logger.info(f"Scraping complete. Total new Pro Bowl players: {total_new}")
+        path = self.project_root / MOBILE_JSON_PATH
+        if path.exists():
+            plan.photos = [url for url in player_db.load(path, "hof_missing_photo")
+                           if url not in self.photos_checked and url not in self.scraped_photos]
+        return plan
+
+    def queue_work(self, scheduler: PriorityScheduler, plan: FetchPlan):
+        """
+        Queue the planned work by value: the most recent seasons first, then
+        Hall of Famers missing photos, then older seasons (newest first).
+        """
+        recent_cutoff = plan.available_years[-1] - RECENT_SEASONS
+        for year in plan.years:
+            tier = PRIORITY_RECENT_SEASONS if year > recent_cutoff else PRIORITY_OLDER_SEASONS
+            scheduler.add((tier, -year), ("year", year), lambda y=year: self.process_year(y))
+
+        for url in plan.photos:
+            scheduler.add((PRIORITY_HOF_PHOTOS, 0), ("photo", url),
+                          lambda u=url: self.process_photo(u))
+
+    def scrape_all(self, resume: bool = True, budget: Optional[Budget] = None) -> List[dict]:
+        """
+        Scrape Pro Bowl rosters and missing Hall of Fame photos in priority order.
+
+        Args:
+            resume: If True, resume from checkpoint if available
+            budget: Stop cleanly (with a checkpoint) once this is spent
+        """
+        plan = self.plan(resume)
+        logger.info(f"Plan: {len(plan.years)} season pages, {len(plan.photos)} player pages "
+                    f"({plan.skipped_years} finished seasons skipped)")
+
+        scheduler = PriorityScheduler(budget, request_count=lambda: self.fetcher.requests)
+        self.queue_work(scheduler, plan)
+        progress = tqdm(total=len(scheduler), desc="Scrape work")
+
+        def on_complete(key):
+            progress.update()
+            if progress.n % 5 == 0:
+                self.save_checkpoint()
+
+        try:
+            self.run_result = scheduler.run(on_complete=on_complete)
+        except CircuitOpenError as e:
+            logger.error(f"Stopping: {e}; resume later to continue")
+            self.run_result = {"completed": progress.n, "remaining": len(scheduler),
+                               "stop_reason": str(e)}
+        finally:
+            progress.close()
+            # Final save
+            self.save_checkpoint()
+
+        logger.info(f"Scraping complete. Total new Pro Bowl players: {self.total_new}")
         logger.info(f"Total unique Pro Bowlers scraped: {len(self.scraped_players)}")
 
         return list(self.scraped_players.values())
@@ -191,15 +389,28 @@ class ProBowlScraper:
         """Get scraping statistics."""
         return {
             "total_unique_players": len(self.scraped_players),
-            "years_scraped": self.current_year - PROBOWL_START_YEAR,
+            "years_scraped": len(self.completed_years),
             "existing_players_skipped": len(self.existing_urls),
+            "photos_found": len(self.scraped_photos),
+            "work_remaining": self.run_result.get("remaining", 0),
+            "stop_reason": self.run_result.get("stop_reason"),
+            "fetch": self.fetcher.get_stats(),
         }
 
 
-def run_scraper(project_root: Path, resume: bool = True) -> List[dict]:
+def write_json_atomic(path: Path, data, indent: Optional[int] = None):
+    """Write JSON via a temp file and rename, so readers never see a partial file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def run_scraper(project_root: Path, resume: bool = True, base_url: str = PFR_BASE_URL,
+                budget: Optional[Budget] = None) -> List[dict]:
     """Run the scraper and return results."""
-    scraper = ProBowlScraper(project_root)
-    players = scraper.scrape_all(resume=resume)
+    scraper = ProBowlScraper(project_root, base_url=base_url)
+    players = scraper.scrape_all(resume=resume, budget=budget)
 
     stats = scraper.get_stats()
     logger.info(f"Final stats: {stats}")
@@ -0,0 +1,235 @@
+"""Columnar extraction and aggregation of PFR stats tables with NumPy.
+
+``extract_table`` turns a stats table into one NumPy array per ``data-stat``
+column: numeric columns become float64 (empty cells are NaN, and the ``*``/
+``+`` Pro Bowl/All-Pro markers, ``%`` signs and thousands separators are
+stripped), anything else stays a string array. Cleaning and conversion run
+on whole columns rather than cell by cell.
+
+Tables from many players can be extracted together (``extract_many``) into
+one, with an owner index per row, so career totals, team splits and
+per-season rates for thousands of players are a handful of vectorized
+reductions. ``career_stats`` uses this to compute ``NFLPlayerStats`` for a
+batch of player pages; ``career.py`` runs it over the player DB.
+
+PFR lists a season split across teams as a ``2TM``/``3TM`` total row followed
+by one ``partial_table`` row per team. Season-level work uses the total rows;
+team splits use the per-team rows.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from bs4 import BeautifulSoup, Tag
+
+from models import NFLPlayerStats
+from parser import CommentedTables, find_table
+
+logger = logging.getLogger(__name__)
+
+# NFLPlayerStats field -> (table ID, data-stat) columns summed into it
+STAT_SOURCES: Dict[str, List[Tuple[str, str]]] = {
+    "passing_yards": [("passing", "pass_yds")],
+    "rushing_yards": [("rushing_and_receiving", "rush_yds")],
+    "touchdowns": [
+        ("passing", "pass_td"),
+        ("rushing_and_receiving", "rush_td"),
+        ("rushing_and_receiving", "rec_td"),
+    ],
+}
+
+
+@dataclass
+class StatsTable:
+    """Rows of one or more stats tables, stored column-wise."""
+    columns: Dict[str, np.ndarray]
+    partial: np.ndarray  # True for per-team rows of a multi-team season
+    owner: Optional[np.ndarray] = None  # row -> index into the stacked inputs
+
+    def __len__(self) -> int:
+        return len(self.partial)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def numeric(self, name: str) -> np.ndarray:
+        """A numeric column as float64; all NaN if absent or not numeric."""
+        values = self.columns.get(name)
+        if values is None or values.dtype.kind != "f":
+            return np.full(len(self), np.nan)
+        return values
+
+    def text(self, name: str) -> np.ndarray:
+        values = self.columns.get(name)
+        if values is None:
+            return np.full(len(self), "", dtype=str)
+        return values.astype(str)
+
+
+def _to_array(cells: List[str]) -> np.ndarray:
+    """Convert one column of cell text to float64 if every cell is numeric, else str."""
+    raw = np.array(cells, dtype=str)
+    cleaned = np.char.replace(np.char.strip(raw, "*+% "), ",", "")
+    empty = cleaned == ""
+    if empty.all():
+        return np.full(len(cells), np.nan)
+    try:
+        return np.where(empty, "nan", cleaned).astype(np.float64)
+    except ValueError:
+        return raw
+
+
+def _read_rows(table: Tag, cells: Dict[str, List[str]], partial: List[bool]):
+    """Append a table's body rows (header rows skipped) to column lists of cell text."""
+    body = table.find("tbody") or table
+    # Walk children directly: bs4's find_all matching costs more than the
+    # cell text itself on tables this regular
+    for row in body.children:
+        if getattr(row, "name", None) != "tr":
+            continue
+        classes = row.get("class") or []
+        if "thead" in classes:
+            continue
+        n = len(partial)
+        found = False
+        for cell in row.children:
+            if getattr(cell, "name", None) not in ("th", "td"):
+                continue
+            stat = cell.get("data-stat")
+            if not stat:
+                continue
+            column = cells.setdefault(stat, [])
+            if len(column) < n:
+                column.extend([""] * (n - len(column)))
+            column.append(cell.get_text(strip=True))
+            found = True
+        if found:
+            partial.append("partial_table" in classes)
+
+
+def _finish(cells: Dict[str, List[str]], partial: List[bool],
+            owner: Optional[List[int]] = None) -> StatsTable:
+    n = len(partial)
+    columns = {}
+    for stat, column in cells.items():
+        column.extend([""] * (n - len(column)))
+        columns[stat] = _to_array(column)
+    return StatsTable(columns, np.array(partial, dtype=bool),
+                      np.array(owner, dtype=np.int64) if owner is not None else None)
+
+
+def extract_table(table: Tag) -> StatsTable:
+    """Body rows of a stats table (header rows skipped) as typed columns."""
+    cells: Dict[str, List[str]] = {}
+    partial: List[bool] = []
+    _read_rows(table, cells, partial)
+    return _finish(cells, partial)
+
+
+def extract_many(tables: Sequence[Optional[Tag]]) -> StatsTable:
+    """
+    Extract the same table from many players into one stacked table, with
+    ``owner`` giving each row's index in ``tables`` (``None`` entries add no
+    rows). Each column is converted once for the whole batch, which is much
+    cheaper than converting per player and stacking.
+    """
+    cells: Dict[str, List[str]] = {}
+    partial: List[bool] = []
+    owner: List[int] = []
+    for i, table in enumerate(tables):
+        if table is None:
+            continue
+        before = len(partial)
+        _read_rows(table, cells, partial)
+        owner.extend([i] * (len(partial) - before))
+    return _finish(cells, partial, owner)
+
+
+def _season_rows(table: StatsTable) -> np.ndarray:
+    return ~table.partial
+
+
+def career_totals(table: StatsTable, names: Iterable[str],
+                  owners: Optional[int] = None) -> Union[Dict[str, float], np.ndarray]:
+    """
+    Sum ``names`` over season rows. For a single table returns name -> total;
+    for a stacked table pass ``owners`` (the number of inputs) to get an
+    ``(owners, len(names))`` array with one row per input.
+    """
+    names = list(names)
+    rows = _season_rows(table)
+    if owners is None:
+        return {name: float(np.nansum(table.numeric(name)[rows])) for name in names}
+
+    result = np.zeros((owners, len(names)))
+    owner = table.owner[rows]
+    for j, name in enumerate(names):
+        values = np.nan_to_num(table.numeric(name)[rows])
+        result[:, j] = np.bincount(owner, weights=values, minlength=owners)
+    return result
+
+
+def team_splits(table: StatsTable, names: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Totals of ``names`` per team, from single-team rows (``2TM`` rows excluded)."""
+    names = list(names)
+    teams = table.text("team")
+    rows = (teams != "") & ~np.char.endswith(teams, "TM")
+    labels, index = np.unique(teams[rows], return_inverse=True)
+    totals = {}
+    for name in names:
+        values = np.nan_to_num(table.numeric(name)[rows])
+        totals[name] = np.bincount(index, weights=values, minlength=len(labels))
+    return {str(team): {name: float(totals[name][i]) for name in names}
+            for i, team in enumerate(labels)}
+
+
+def per_season_rates(table: StatsTable, numerator: str,
+                     denominator: str = "g") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ``numerator / denominator`` for each season row (e.g. yards per game).
+    Returns ``(years, rates)``; a zero or missing denominator gives NaN.
+    """
+    rows = _season_rows(table)
+    num = table.numeric(numerator)[rows]
+    den = table.numeric(denominator)[rows]
+    rates = np.divide(num, den, out=np.full(len(num), np.nan), where=np.nan_to_num(den) != 0)
+    return table.numeric("year_id")[rows], rates
+
+
+def find_tables(html: Union[str, bytes], table_ids: Iterable[str]) -> Dict[str, Tag]:
+    """The given tables of one player page, live or comment-wrapped, by ID."""
+    soup = BeautifulSoup(html, "lxml")
+    commented = CommentedTables(html)
+    tables = {}
+    for table_id in table_ids:
+        table = find_table(soup, commented, table_id)
+        if table is not None:
+            tables[table_id] = table
+    return tables
+
+
+def career_stats(pages: Mapping[str, Union[str, bytes]]) -> Dict[str, NFLPlayerStats]:
+    """
+    Career ``NFLPlayerStats`` for a batch of player pages (key -> HTML).
+    Each page is parsed once; each table is then converted and summed for
+    the whole batch at once.
+    """
+    keys = list(pages)
+    table_ids = list(dict.fromkeys(t for sources in STAT_SOURCES.values() for t, _ in sources))
+    found = [find_tables(pages[key], table_ids) for key in keys]
+
+    totals = {field: np.zeros(len(keys)) for field in STAT_SOURCES}
+    for table_id in table_ids:
+        stacked = extract_many([tables.get(table_id) for tables in found])
+        wanted = [(field, stat) for field, sources in STAT_SOURCES.items()
+                  for t, stat in sources if t == table_id]
+        sums = career_totals(stacked, [stat for _, stat in wanted], owners=len(keys))
+        for j, (field, _) in enumerate(wanted):
+            totals[field] += sums[:, j]
+
+    return {
+        key: NFLPlayerStats(**{field: int(totals[field][i]) for field in STAT_SOURCES})
+        for i, key in enumerate(keys)
+    }
@@ -0,0 +1,147 @@
+"""Lock-protected updates to the player DB.
+
+Every writer of the player DB (merge, the daemon, the photo stages and
+``scrape_hof_photos``) makes its change inside ``db_lock``: an exclusive
+advisory lock (``fcntl.flock``) on ``PLAYER_DB_LOCK_PATH``. Under the lock the
+writer re-reads the latest version of the file, applies its change to that
+version and writes the result, so two commands that overlap no longer lose
+each other's changes. Slow work (fetching pages and images) happens before
+the lock is taken; only the short read-change-write is serialized. Readers
+that need the mobile and web files to agree (``validate``) take the lock
+shared.
+
+``patch_players`` covers the common case: field-level patches keyed by
+``record_key`` (the sportsReferenceUrl, which survives the renumbering in
+``save_merged``), applied to whatever is on disk when the lock is acquired.
+
+The lock is re-entrant within a thread, so a locked section can call
+``save_merged``, which locks too. Without ``fcntl`` (Windows) there is no
+lock and writers fall back to running unprotected.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, List, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; locking is skipped there
+    fcntl = None
+
+from config import MOBILE_JSON_PATH, PLAYER_DB_LOCK_PATH, LOCK_TIMEOUT_SECONDS
+import facets
+import player_db
+
+logger = logging.getLogger(__name__)
+
+LOCK_POLL_SECONDS = 0.1
+
+_held = threading.local()  # this thread's lock depth and mode
+
+
+def record_key(player: dict) -> str:
+    """Stable identity of a record across saves (IDs are renumbered by name)."""
+    return player.get("sportsReferenceUrl") or f"name:{player.get('name', '')}"
+
+
+@contextmanager
+def db_lock(project_root: Path, shared: bool = False,
+            timeout: Optional[float] = LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """
+    Hold the player DB lock for the duration of the block.
+
+    Args:
+        project_root: Repository root used to resolve the lock path
+        shared: Take a shared (read) lock; writers need the exclusive one
+        timeout: Seconds to wait before raising TimeoutError (None waits forever)
+    """
+    depth = getattr(_held, "depth", 0)
+    if depth:
+        if not shared and _held.shared:
+            raise RuntimeError("Cannot upgrade a shared player DB lock to exclusive")
+        _held.depth = depth + 1
+        try:
+            yield
+        finally:
+            _held.depth -= 1
+        return
+
+    if fcntl is None:
+        logger.debug("fcntl unavailable; player DB writes are not locked")
+        yield
+        return
+
+    path = project_root / PLAYER_DB_LOCK_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    with open(path, "a") as f:
+        start = time.monotonic()
+        waiting = False
+        while True:
+            try:
+                fcntl.flock(f, mode | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if not waiting:
+                    logger.info(f"Waiting for another command to release {path}")
+                    waiting = True
+                if timeout is not None and time.monotonic() - start > timeout:
+                    raise TimeoutError(f"Player DB still locked after {timeout:.0f}s: {path}")
+                time.sleep(LOCK_POLL_SECONDS)
+        _held.depth, _held.shared = 1, shared
+        try:
+            yield
+        finally:
+            _held.depth = 0
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def apply_patches(players: List[dict], patches: Mapping[str, Mapping[str, Any]]) -> int:
+    """
+    Apply ``record_key -> {field: value}`` patches in place; a value of None
+    removes the field. Keys with no matching record are skipped. Returns the
+    number of records changed.
+    """
+    changed = 0
+    for player in players:
+        patch = patches.get(record_key(player))
+        if not patch:
+            continue
+        before = dict(player)
+        for field, value in patch.items():
+            if value is None:
+                player.pop(field, None)
+            else:
+                player[field] = value
+        if player != before:
+            changed += 1
+    return changed
+
+
+def patch_players(project_root: Path, patches: Mapping[str, Mapping[str, Any]],
+                  compact: bool = False) -> int:
+    """
+    Apply field-level patches to the latest player DB on disk and save it,
+    all under the lock. Returns the number of records changed.
+    """
+    from merger import PlayerMerger
+
+    if not patches:
+        return 0
+    db_path = project_root / MOBILE_JSON_PATH
+    with db_lock(project_root):
+        players = player_db.load(db_path, "records")
+        changed = apply_patches(players, patches)
+        if changed:
+            fields = {field for patch in patches.values() for field in patch}
+            merger = PlayerMerger(project_root)
+            merger.load_pro_bowl_years()  # a facet rebuild needs them
+            merger.save_merged(players, compact=compact, refacet=bool(fields & facets.RECORD_FIELDS))
+    missing = len(patches) - sum(1 for p in players if record_key(p) in patches)
+    if missing:
+        logger.warning(f"{missing} patched players are no longer in {db_path}")
+    logger.info(f"Patched {changed} players")
+    return changed